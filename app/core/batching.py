@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Optional, Sequence, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Coalesce concurrent `submit` calls into batched calls of `fn`.
+
+    A batch is flushed as soon as `max_batch` items are pending, or `max_delay`
+    seconds after the first item arrived. `fn` must return one result per input
+    item, in order.
+    """
+
+    def __init__(
+        self,
+        fn: Callable[[List[T]], Awaitable[Sequence[R]]],
+        max_batch: int = 64,
+        max_delay: float = 0.002,
+    ) -> None:
+        self.fn = fn
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._pending: List[Tuple[List[T], asyncio.Future]] = []
+        self._pending_items = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+
+    async def submit(self, items: List[T]) -> List[R]:
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending.append((items, future))
+        self._pending_items += len(items)
+        if self._pending_items >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.max_delay, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending, self._pending_items = self._pending, [], 0
+        if pending:
+            task = asyncio.create_task(self._run(pending))
+            # keep a reference until done so the task is not garbage-collected mid-flight
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run(self, pending: List[Tuple[List[T], asyncio.Future]]) -> None:
+        flat: List[T] = [item for items, _ in pending for item in items]
+        try:
+            results = await self.fn(flat)
+        except Exception as err:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        offset = 0
+        for items, future in pending:
+            if not future.done():
+                future.set_result(list(results[offset:offset + len(items)]))
+            offset += len(items)
@@ -0,0 +1,103 @@
+"""
+How a Mongo recipe document maps onto its Qdrant point.
+
+The one definition of the embedding inputs, point id (`stable_id(slug)`) and
+payload, used by the change-stream sync worker (app.services.catalog_sync), the
+catalog loader (app.services.catalog_loader), vectorDB/data/generate_embeddings.py
+and the topic scripts (vectorDB/BERTopic/topic_data.py). The payload also carries `mongo_id`, so a
+point can be found from a Mongo delete event, and `input_hash`, a digest of
+the embedding inputs, so unchanged text is never re-embedded. `recipe_id` is
+the Mongo `_id` a JSONL document gets when loaded, so scripts that never talk to
+Mongo can still write the right `mongo_id`.
+
+Only depends on bson and the Qdrant models (no Settings), so the standalone
+scripts under vectorDB/ can import it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING, Any, Dict, List, Sequence
+
+from bson import ObjectId
+
+if TYPE_CHECKING:
+    from qdrant_client.models import PointStruct
+
+TEXT_VECTOR_NAME = "v_text"
+ING_VECTOR_NAME = "v_ingredients"
+
+
+def stable_id(slug: str) -> int:
+    """Qdrant point id of a recipe."""
+    h = hashlib.sha256((slug or "").encode("utf-8")).hexdigest()
+    return int(h[:15], 16)
+
+
+def recipe_id(doc: Dict[str, Any], line_no: int) -> ObjectId:
+    """Deterministic _id from the (slug, source_url) unique key, or the line number without a slug."""
+    key = f"{doc.get('slug')}\x00{doc.get('source_url')}" if doc.get("slug") else f"line:{line_no}"
+    return ObjectId(hashlib.sha256(key.encode("utf-8")).digest()[:12])
+
+
+def text_input(doc: Dict[str, Any]) -> str:
+    title = (doc.get("title") or "").strip()
+    steps = " ".join(doc.get("steps") or [])
+    return f"{title}. {steps}".strip()
+
+
+def ingredient_input(doc: Dict[str, Any]) -> str:
+    return " ".join(doc.get("ingredient_tags") or [])
+
+
+def input_hash(doc: Dict[str, Any]) -> str:
+    """Digest of both embedding inputs; equal hashes mean equal vectors."""
+    return hashlib.sha256(f"{text_input(doc)}\x00{ingredient_input(doc)}".encode("utf-8")).hexdigest()[:32]
+
+
+def point_id(doc: Dict[str, Any]) -> int:
+    return stable_id((doc.get("slug") or "").strip())
+
+
+def build_payload(doc: Dict[str, Any]) -> Dict[str, Any]:
+    rating = (doc.get("rating") or {}).get("value")
+    payload = {
+        "title": doc.get("title"),
+        "slug": doc.get("slug"),
+        "dietary_tags": doc.get("dietary_tags") or [],
+        "allergen_tags": doc.get("allergen_tags") or [],
+        "flavour_tags": doc.get("flavour_tags") or [],
+        "technique_tags": doc.get("technique_tags") or [],
+        "ingredient_tags": doc.get("ingredient_tags") or [],
+        "cuisine": doc.get("cuisine"),
+        "course": doc.get("course"),
+        "rating_value": rating,
+        "source_url": doc.get("source_url"),
+        "mongo_id": str(doc["_id"]) if doc.get("_id") is not None else None,
+        "input_hash": input_hash(doc),
+    }
+    # assigned by vectorDB/BERTopic/assign_topics.py; keep it across re-syncs
+    if doc.get("topic_id") is not None:
+        payload["topic_id"] = doc["topic_id"]
+    return payload
+
+
+def build_points(docs: Sequence[Dict[str, Any]], text_vecs: Sequence[Any], ing_vecs: Sequence[Any]) -> List[PointStruct]:
+    """Points for `docs` with their two embeddings (rows aligned with `docs`)."""
+    from qdrant_client.models import PointStruct
+
+    return [
+        PointStruct(
+            id=point_id(doc),
+            vector={TEXT_VECTOR_NAME: list(map(float, v_text)), ING_VECTOR_NAME: list(map(float, v_ing))},
+            payload=build_payload(doc),
+        )
+        for doc, v_text, v_ing in zip(docs, text_vecs, ing_vecs)
+    ]
+
+
+def embed_documents(model: Any, docs: Sequence[Dict[str, Any]], batch_size: int = 64) -> tuple[Any, Any]:
+    """(text vectors, ingredient vectors) for `docs`, normalized like the ingest script (blocking)."""
+    text_vecs = model.encode([text_input(d) for d in docs], batch_size=batch_size, normalize_embeddings=True)
+    ing_vecs = model.encode([ingredient_input(d) for d in docs], batch_size=batch_size, normalize_embeddings=True)
+    return text_vecs, ing_vecs
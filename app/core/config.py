@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -8,6 +10,12 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     PGHOST: str = "postgres"
     PGPORT: int = 55433
+    # prepared statements cached per pooled connection by the asyncpg dialect
+    PG_STATEMENT_CACHE_SIZE: int = 256
+    PG_POOL_SIZE: int = 10
+    PG_MAX_OVERFLOW: int = 10
+    PG_POOL_TIMEOUT_S: float = 10.0
+    PG_POOL_RECYCLE_S: int = 1800
 
     # MongoDB 
     MONGO_INITDB_ROOT_USERNAME: str | None = None
@@ -16,6 +24,8 @@ class Settings(BaseSettings):
     MONGO_HOST: str | None = "localhost"
     MONGO_PORT: int | None = 27017
     MONGO_AUTH_SOURCE: str | None = "admin"
+    MONGO_MIN_POOL_SIZE: int = 5
+    MONGO_MAX_POOL_SIZE: int = 50
 
     # Neo4j
     APP_NEO4J_URI: str | None = "bolt://localhost:7687"
@@ -26,7 +36,83 @@ class Settings(BaseSettings):
     QDRANT_URL: str | None = "http://localhost:6333"
     QDRANT_API_KEY: str | None = None
     QDRANT_COLLECTION: str = "recipes"
+    QDRANT_MAX_CONNECTIONS: int = 20
+    # In-process exact search over an exported copy of the collection (app.core.local_vectors):
+    # "local" always, "auto" when the export has at most LOCAL_VECTOR_MAX_POINTS points
+    VECTOR_BACKEND: Literal["qdrant", "local", "auto"] = "qdrant"
+    LOCAL_VECTOR_DIR: str | None = None
+    LOCAL_VECTOR_MAX_POINTS: int = 200_000
+    # Serve searches from the local index when Qdrant fails
+    LOCAL_VECTOR_FALLBACK: bool = True
     EMBEDDING_MODEL_NAME: str = "sentence-transformers/all-MiniLM-L6-v2"
+    # When set, workers send encode requests to the shared sidecar (app.core.embedding_server)
+    EMBEDDING_SERVICE_SOCKET: str | None = None
+    EMBEDDING_MAX_BATCH: int = 64
+    EMBEDDING_BATCH_DELAY_S: float = 0.002
+    # "onnx" serves the model with onnxruntime (see app.core.onnx_embedder); exported on first use
+    EMBEDDING_BACKEND: Literal["torch", "onnx"] = "torch"
+    EMBEDDING_ONNX_DIR: str = "models/onnx"
+    EMBEDDING_ONNX_QUANTIZE: bool = True
+    EMBEDDING_ONNX_THREADS: int = 0
+    # LRU of query embeddings (0 disables); with a path it is reloaded on startup and saved on shutdown
+    QUERY_VECTOR_CACHE_SIZE: int = 20_000
+    QUERY_VECTOR_CACHE_PATH: str | None = None
+
+    # Recommendations: identical concurrent searches share one computation;
+    # a TTL > 0 also caches results per (query, prefs, limit) for that long
+    RECOMMENDATION_CACHE_TTL_S: float = 0.0
+    RECOMMENDATION_CACHE_SIZE: int = 2048
+    # Tag bitmaps for /recommended (app.core.tag_index): built at startup, refreshed from
+    # `updated_at` every REFRESH interval and rebuilt in full every REBUILD interval
+    TAG_INDEX_ENABLED: bool = True
+    TAG_INDEX_REFRESH_INTERVAL_S: float = 30.0
+    TAG_INDEX_REBUILD_INTERVAL_S: float = 3600.0
+    TAG_INDEX_MAX_TAIL: int = 50_000
+
+    # Autocomplete (app.services.autocomplete): rebuilt from the catalog and recent searches
+    AUTOCOMPLETE_ENABLED: bool = True
+    AUTOCOMPLETE_REFRESH_INTERVAL_S: float = 900.0
+    AUTOCOMPLETE_QUERY_DAYS: int = 30
+    # distinct users who must have searched a query before it is suggested
+    AUTOCOMPLETE_MIN_QUERY_COUNT: int = 3
+    AUTOCOMPLETE_MAX_QUERIES: int = 50_000
+
+    # Taste vectors (app.services.taste): decayed sum of the vectors of viewed / liked recipes;
+    # /recommended ranks by it once the decayed weight reaches TASTE_MIN_WEIGHT
+    TASTE_HALF_LIFE_DAYS: float = 30.0
+    TASTE_VIEW_WEIGHT: float = 1.0
+    TASTE_LIKE_WEIGHT: float = 3.0
+    TASTE_MIN_WEIGHT: float = 0.5
+
+    # Catalog sync worker (app.services.catalog_sync): Mongo change stream -> Qdrant + recipe_metadata
+    SYNC_BATCH_SIZE: int = 256
+    SYNC_BATCH_DELAY_S: float = 1.0
+    SYNC_IDLE_CHECKPOINT_S: float = 60.0
+    SYNC_RETRY_DELAY_S: float = 5.0
+
+    # Analytics ingestion
+    ANALYTICS_BUFFER_SIZE: int = 50_000
+    ANALYTICS_FLUSH_BATCH: int = 2_000
+    ANALYTICS_FLUSH_INTERVAL_S: float = 1.0
+    ANALYTICS_ENQUEUE_TIMEOUT_S: float = 0.05
+
+    # Password hashing (process pool; 0 = one worker per CPU / 2x workers in flight)
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_CONCURRENCY: int = 0
+
+    # Startup
+    WARMUP_EMBEDDING_MODEL: bool = True
+    WARMUP_RETRY_DELAY_S: float = 2.0
+
+    # Request profiling (off unless a token or a sample rate is set)
+    # Requests sent with `X-Profile-Token: <token>` are profiled; the token also guards /debug/profiles
+    PROFILING_TOKEN: str | None = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_S: float = 0.005
+    PROFILING_MAX_PER_MINUTE: int = 6
+    PROFILING_KEEP: int = 50
+    # Also write each profile as <id>.folded here, so any worker can serve it
+    PROFILING_OUTPUT_DIR: str | None = None
 
     # Misc / App
     ENVIRONMENT: str = "development"
@@ -1,17 +1,77 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator
+
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.core.metrics import gauge
+
+if TYPE_CHECKING:
+    import asyncpg
 
 DATABASE_URL = (
     f"postgresql+asyncpg://{settings.POSTGRES_USER}:"
     f"{settings.POSTGRES_PASSWORD}@{settings.PGHOST}:{settings.PGPORT}/"
     f"{settings.POSTGRES_DB}"
+    f"?prepared_statement_cache_size={settings.PG_STATEMENT_CACHE_SIZE}"
 )
 
-engine = create_async_engine(DATABASE_URL, echo=False, future=True) 
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=False,
+    future=True,
+    pool_size=settings.PG_POOL_SIZE,
+    max_overflow=settings.PG_MAX_OVERFLOW,
+    pool_timeout=settings.PG_POOL_TIMEOUT_S,
+    pool_recycle=settings.PG_POOL_RECYCLE_S,
+    pool_pre_ping=True,
+    # asyncpg's own cache, used by the raw-connection bulk paths
+    connect_args={"statement_cache_size": settings.PG_STATEMENT_CACHE_SIZE},
+)
 
 AsyncSessionLocal = sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
+gauge(
+    "db_pool_connections",
+    "Postgres connection pool usage by state.",
+    lambda: {
+        ("checked_out",): engine.pool.checkedout(),
+        ("checked_in",): engine.pool.checkedin(),
+        ("overflow",): max(engine.pool.overflow(), 0),
+        ("size",): engine.pool.size(),
+    },
+    ("state",),
+)
+
 async def get_db():
     async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+        yield session
+
+
+@asynccontextmanager
+async def raw_connection() -> AsyncIterator["asyncpg.Connection"]:
+    """
+    Borrow a pooled connection and yield the underlying asyncpg connection.
+
+    Used for bulk paths (COPY, staging tables) that SQLAlchemy does not expose.
+    The connection is returned to the engine pool on exit.
+    """
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        yield raw.driver_connection
+
+
+async def open_pool(connections: int = settings.PG_POOL_SIZE) -> None:
+    """Open `connections` pooled connections up front so the first requests skip the handshake."""
+
+    async def _open_one() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(_open_one() for _ in range(connections)))
+
+
+async def close_pool() -> None:
+    await engine.dispose()
@@ -0,0 +1,121 @@
+"""
+Shared embedding sidecar for multi-worker deployments.
+
+One process loads the model and serves encode requests over a Unix socket;
+uvicorn workers started with `EMBEDDING_SERVICE_SOCKET` set talk to it through
+`EmbeddingServiceClient` and never import torch. Concurrent requests are
+micro-batched on both sides, so N workers share one batched model call.
+
+Wire format (both directions): 4-byte big-endian length + payload.
+  request  payload: JSON list of strings
+  response payload: 1 status byte, then a native float32 matrix (status 0)
+                    or a UTF-8 error message (status 1)
+
+Run: python -m app.core.embedding_server [--socket /tmp/flavornet-embed.sock]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from array import array
+from typing import List, Tuple
+
+from app.core.batching import MicroBatcher
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_OK = b"\x00"
+_ERROR = b"\x01"
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    size = int.from_bytes(await reader.readexactly(4), "big")
+    return await reader.readexactly(size)
+
+
+def _write_frame(writer: asyncio.StreamWriter, payload: bytes) -> None:
+    writer.write(len(payload).to_bytes(4, "big") + payload)
+
+
+# ---------------------- server ----------------------
+async def serve(socket_path: str) -> None:
+    from app.core.embeddings import encode_local, warm_up_embedding_model
+
+    await asyncio.to_thread(warm_up_embedding_model)
+    batcher = MicroBatcher(
+        encode_local,
+        max_batch=settings.EMBEDDING_MAX_BATCH,
+        max_delay=settings.EMBEDDING_BATCH_DELAY_S,
+    )
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                texts = json.loads(await _read_frame(reader))
+                try:
+                    rows = await batcher.submit(list(texts))
+                    body = _OK + b"".join(row.astype("float32").tobytes() for row in rows)
+                except Exception as err:  # pragma: no cover - model errors surface at runtime
+                    logger.exception("Encode failed")
+                    body = _ERROR + str(err).encode("utf-8")
+                _write_frame(writer, body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = await asyncio.start_unix_server(handle, path=socket_path)
+    logger.info("Embedding service listening on %s (model=%s)", socket_path, settings.EMBEDDING_MODEL_NAME)
+    async with server:
+        await server.serve_forever()
+
+
+# ---------------------- client ----------------------
+class EmbeddingServiceClient:
+    """Talks to the sidecar over a small pool of persistent Unix-socket connections."""
+
+    def __init__(self, socket_path: str, pool_size: int = 4) -> None:
+        self.socket_path = socket_path
+        self.pool_size = pool_size
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(pool_size)
+
+    async def encode(self, texts: List[str]) -> List[List[float]]:
+        async with self._slots:
+            reader, writer = self._idle.pop() if self._idle else await asyncio.open_unix_connection(self.socket_path)
+            try:
+                _write_frame(writer, json.dumps(texts).encode("utf-8"))
+                await writer.drain()
+                response = await _read_frame(reader)
+            except BaseException:
+                writer.close()
+                raise
+            self._idle.append((reader, writer))
+
+        if response[:1] != _OK:
+            raise RuntimeError(f"Embedding service error: {response[1:].decode('utf-8', 'replace')}")
+        flat = array("f")
+        flat.frombytes(response[1:])
+        dim = len(flat) // max(len(texts), 1)
+        return [flat[i * dim:(i + 1) * dim].tolist() for i in range(len(texts))]
+
+    def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--socket", default=settings.EMBEDDING_SERVICE_SOCKET or "/tmp/flavornet-embed.sock")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(serve(args.socket))
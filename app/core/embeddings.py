@@ -1,11 +1,86 @@
-from functools import lru_cache
+from __future__ import annotations
 
-from sentence_transformers import SentenceTransformer
+import asyncio
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, Sequence
 
+from app.core.batching import MicroBatcher
 from app.core.config import settings
+from app.core.metrics import histogram
+from app.core.vector_cache import get_query_vector_cache
+
+if TYPE_CHECKING:
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+
+    from app.core.onnx_embedder import OnnxEmbedder
 
 
 @lru_cache(maxsize=1)
-def get_embedding_model() -> SentenceTransformer:
-    """Load and cache the sentence-transformer model."""
+def get_embedding_model() -> "SentenceTransformer | OnnxEmbedder":
+    """Load and cache the embedding model for the configured backend."""
+    if settings.EMBEDDING_BACKEND == "onnx":
+        from app.core.onnx_embedder import load_onnx_embedder
+
+        return load_onnx_embedder()
+
+    # Imported here so processes that never encode locally (sidecar clients) skip torch.
+    from sentence_transformers import SentenceTransformer
+
     return SentenceTransformer(settings.EMBEDDING_MODEL_NAME)
+
+
+async def encode_local(texts: List[str]) -> "np.ndarray":
+    """Encode with the in-process model on a worker thread (keeps the event loop free)."""
+    model = get_embedding_model()
+    return await asyncio.to_thread(model.encode, texts, normalize_embeddings=True)
+
+
+EMBEDDING_BATCH_SIZE = histogram(
+    "embedding_batch_size",
+    "Number of texts per batched model call; near 1 means requests are not being coalesced.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+)
+
+
+@lru_cache(maxsize=1)
+def _get_batcher() -> MicroBatcher:
+    if settings.EMBEDDING_SERVICE_SOCKET:
+        from app.core.embedding_server import EmbeddingServiceClient
+
+        encode = EmbeddingServiceClient(settings.EMBEDDING_SERVICE_SOCKET).encode
+    else:
+        encode = encode_local
+
+    async def encode_batch(texts: List[str]) -> Sequence:
+        EMBEDDING_BATCH_SIZE.labels().observe(len(texts))
+        return await encode(texts)
+
+    return MicroBatcher(
+        encode_batch,
+        max_batch=settings.EMBEDDING_MAX_BATCH,
+        max_delay=settings.EMBEDDING_BATCH_DELAY_S,
+    )
+
+
+async def embed_queries(texts: List[str]) -> List[List[float]]:
+    """Normalized embeddings for `texts`: cached ones from the query cache, the rest batched with concurrent callers."""
+    cache = get_query_vector_cache()
+    vectors: List[Optional[List[float]]] = [cache.get(t) for t in texts] if cache else [None] * len(texts)
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        rows: Sequence = await _get_batcher().submit([texts[i] for i in missing])
+        for i, row in zip(missing, rows):
+            vectors[i] = row.tolist() if hasattr(row, "tolist") else list(row)
+            if cache is not None:
+                cache.put(texts[i], vectors[i])
+    return vectors
+
+
+async def embed_query(text: str) -> List[float]:
+    return (await embed_queries([text]))[0]
+
+
+def warm_up_embedding_model() -> None:
+    """Load the model and run one dummy encode so the first real query pays no init cost."""
+    get_embedding_model().encode(["warm-up query"], normalize_embeddings=True)
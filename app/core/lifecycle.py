@@ -0,0 +1,116 @@
+"""
+Startup warm-up and shutdown for the stores and models the API depends on.
+
+Warm-up runs as a background task so liveness is reported immediately, while
+readiness (`app.state.ready`) only flips once every step has succeeded. Failed
+steps are retried until they pass or the app shuts down.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+from app.core import db, local_vectors, mongo, qdrant, security, tag_index, vector_cache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+WarmUpStep = Tuple[str, Callable[[], Awaitable[None]]]
+
+
+async def _warm_up_embedding_model() -> None:
+    from app.core.embeddings import embed_query, warm_up_embedding_model
+
+    if settings.EMBEDDING_SERVICE_SOCKET:
+        # Sidecar mode: only check the shared model server answers.
+        await embed_query("warm-up query")
+        return
+    # Model load + first encode are CPU-bound; keep them off the event loop.
+    await asyncio.to_thread(warm_up_embedding_model)
+
+
+async def _load_query_vector_cache() -> None:
+    await asyncio.to_thread(vector_cache.load_query_vector_cache)
+
+
+async def _load_local_vectors() -> None:
+    try:
+        await asyncio.to_thread(local_vectors.load_local_index)
+    except Exception:
+        if settings.VECTOR_BACKEND == "local":
+            raise
+        # Only a fallback / size-based choice: Qdrant still serves without it.
+        logger.exception("Local vector index unavailable; searches use Qdrant only")
+
+
+async def _build_tag_index() -> None:
+    manager = tag_index.get_tag_index_manager()
+    await manager.build()
+    manager.start()
+
+
+async def _build_autocomplete() -> None:
+    from app.services.autocomplete import get_autocomplete
+
+    autocomplete = get_autocomplete()
+    await autocomplete.rebuild()
+    autocomplete.start()
+
+
+def warm_up_steps() -> List[WarmUpStep]:
+    steps: List[WarmUpStep] = [
+        ("postgres", db.open_pool),
+        ("mongo", mongo.open_client),
+    ]
+    # With the local backend Qdrant is not needed to serve, so it does not gate readiness.
+    if settings.VECTOR_BACKEND != "local":
+        steps.append(("qdrant", qdrant.open_client))
+    if settings.LOCAL_VECTOR_DIR:
+        steps.append(("local_vectors", _load_local_vectors))
+    if settings.TAG_INDEX_ENABLED:
+        steps.append(("tag_index", _build_tag_index))
+    if settings.AUTOCOMPLETE_ENABLED:
+        steps.append(("autocomplete", _build_autocomplete))
+    if settings.WARMUP_EMBEDDING_MODEL:
+        steps.append(("embedding_model", _warm_up_embedding_model))
+    if settings.QUERY_VECTOR_CACHE_PATH:
+        steps.append(("query_vector_cache", _load_query_vector_cache))
+    return steps
+
+
+async def _run_step(name: str, step: Callable[[], Awaitable[None]], timings: Dict[str, float]) -> None:
+    while True:
+        started = time.perf_counter()
+        try:
+            await step()
+        except Exception as err:  # pragma: no cover - depends on external services
+            logger.warning("Warm-up step %s failed (%s); retrying in %.1fs", name, err, settings.WARMUP_RETRY_DELAY_S)
+            await asyncio.sleep(settings.WARMUP_RETRY_DELAY_S)
+            continue
+        timings[name] = round(time.perf_counter() - started, 3)
+        return
+
+
+async def warm_up(state) -> None:
+    """Run all warm-up steps concurrently, then mark the app as ready."""
+    timings: Dict[str, float] = {}
+    state.warmup = timings
+    await asyncio.gather(*(_run_step(name, step, timings) for name, step in warm_up_steps()))
+    state.ready = True
+    logger.info("Warm-up finished: %s", timings)
+
+
+async def close_pools() -> None:
+    from app.services.autocomplete import get_autocomplete
+
+    await get_autocomplete().stop()
+    await tag_index.get_tag_index_manager().stop()
+    await asyncio.to_thread(vector_cache.save_query_vector_cache)
+    await asyncio.to_thread(security.shutdown_pool)
+    qdrant.close_client()
+    local_vectors.close_local_index()
+    mongo.close_client()
+    await db.close_pool()
@@ -0,0 +1,170 @@
+"""
+In-process exact vector search over an exported copy of the Qdrant collection.
+
+Artifacts (written by vectorDB/data/export_local_index.py into LOCAL_VECTOR_DIR):
+  meta.json            model, dimension, count, source collection
+  v_text.npy           float32 [count, dim], L2-normalized, memory-mapped
+  ids.npy              int64 [count], the Qdrant point ids
+  payload.jsonl        one Qdrant payload per line, same order
+  payload_offsets.npy  int64 [count + 1], byte offsets into payload.jsonl
+
+Only the top-k payload lines are decoded per query. The tag fields used by
+the recommendation filters are indexed at load time as posting lists, so the
+filter from `RecommendationService._build_qdrant_filter` becomes a row mask
+before the matrix product. Scores are cosine similarities, the same as the
+Qdrant collection returns.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import gauge
+
+if TYPE_CHECKING:
+    # Only for annotations: this module is imported at app startup and qdrant_client is slow to load.
+    from qdrant_client.models import FieldCondition, Filter
+
+logger = logging.getLogger(__name__)
+
+FILTER_FIELDS = ("dietary_tags", "allergen_tags", "ingredient_tags", "flavour_tags", "technique_tags")
+_EMPTY = np.empty(0, dtype=np.int32)
+
+
+@dataclass(frozen=True)
+class LocalHit:
+    """The subset of qdrant's ScoredPoint the service reads."""
+
+    id: int
+    score: float
+    payload: Dict[str, Any]
+
+
+class LocalVectorIndex:
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.meta = json.loads((directory / "meta.json").read_text())
+        self.vectors = np.load(directory / "v_text.npy", mmap_mode="r")
+        self.ids = np.load(directory / "ids.npy")
+        self.offsets = np.load(directory / "payload_offsets.npy")
+        self._payload_file = (directory / "payload.jsonl").open("rb")
+        self._payloads = mmap.mmap(self._payload_file.fileno(), 0, access=mmap.ACCESS_READ)
+        if not (len(self.vectors) == len(self.ids) == len(self.offsets) - 1):
+            raise ValueError(f"{directory}: vectors, ids and payload offsets disagree in length")
+        self.postings = self._build_postings()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _build_postings(self) -> Dict[str, Dict[str, np.ndarray]]:
+        lists: Dict[str, Dict[str, List[int]]] = {field: {} for field in FILTER_FIELDS}
+        for row in range(len(self)):
+            payload = self.payload(row)
+            for field in FILTER_FIELDS:
+                for tag in payload.get(field) or ():
+                    lists[field].setdefault(tag, []).append(row)
+        return {
+            field: {tag: np.asarray(rows, dtype=np.int32) for tag, rows in tags.items()}
+            for field, tags in lists.items()
+        }
+
+    def payload(self, row: int) -> Dict[str, Any]:
+        return json.loads(self._payloads[self.offsets[row]:self.offsets[row + 1]])
+
+    def close(self) -> None:
+        self._payloads.close()
+        self._payload_file.close()
+
+    # ----- filtering -----
+    def _rows(self, condition: FieldCondition) -> np.ndarray:
+        postings = self.postings.get(condition.key)
+        if postings is None:
+            raise NotImplementedError(f"local vector index cannot filter on '{condition.key}'")
+        match = condition.match
+        # Matched by field (MatchValue.value, MatchAny.any) so qdrant_client need not be imported.
+        if hasattr(match, "value"):
+            return postings.get(match.value, _EMPTY)
+        if hasattr(match, "any"):
+            return np.concatenate([postings.get(value, _EMPTY) for value in match.any] or [_EMPTY])
+        raise NotImplementedError(f"local vector index cannot evaluate {type(match).__name__}")
+
+    def mask(self, query_filter: Optional[Filter]) -> Optional[np.ndarray]:
+        """Boolean row mask for `query_filter` (must / must_not field matches), None if unfiltered."""
+        if query_filter is None:
+            return None
+        if query_filter.should or getattr(query_filter, "min_should", None):
+            raise NotImplementedError("local vector index supports must / must_not only")
+        mask = np.ones(len(self), dtype=bool)
+        for condition in query_filter.must or ():
+            required = np.zeros(len(self), dtype=bool)
+            required[self._rows(condition)] = True
+            mask &= required
+        for condition in query_filter.must_not or ():
+            mask[self._rows(condition)] = False
+        return mask
+
+    # ----- search -----
+    def search(self, vector: Sequence[float], limit: int, query_filter: Optional[Filter] = None) -> List[LocalHit]:
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        mask = self.mask(query_filter)
+
+        if mask is None:
+            rows = None
+            scores = self.vectors @ query
+        else:
+            rows = np.flatnonzero(mask)
+            if len(rows) == 0:
+                return []
+            # a selective filter gathers fewer rows than a full scan reads
+            if len(rows) < len(self) // 4:
+                scores = self.vectors[rows] @ query
+            else:
+                scores = (self.vectors @ query)[rows]
+
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        hits = []
+        for i in top:
+            row = int(rows[i]) if rows is not None else int(i)
+            hits.append(LocalHit(id=int(self.ids[row]), score=float(scores[i]), payload=self.payload(row)))
+        return hits
+
+
+@lru_cache(maxsize=1)
+def load_local_index() -> LocalVectorIndex:
+    """Open LOCAL_VECTOR_DIR (blocking: call off the event loop, e.g. during warm-up)."""
+    if not settings.LOCAL_VECTOR_DIR:
+        raise RuntimeError("LOCAL_VECTOR_DIR is not set")
+    index = LocalVectorIndex(Path(settings.LOCAL_VECTOR_DIR))
+    if index.meta.get("model") not in (None, settings.EMBEDDING_MODEL_NAME):
+        raise RuntimeError(
+            f"local vector index was built with {index.meta['model']}, queries use {settings.EMBEDDING_MODEL_NAME}"
+        )
+    logger.info("Loaded local vector index: %d points from %s", len(index), settings.LOCAL_VECTOR_DIR)
+    return index
+
+
+def get_local_index() -> Optional[LocalVectorIndex]:
+    """The loaded index, or None if it has not been (successfully) loaded."""
+    return load_local_index() if load_local_index.cache_info().currsize else None
+
+
+def close_local_index() -> None:
+    if load_local_index.cache_info().currsize:
+        load_local_index().close()
+        load_local_index.cache_clear()
+
+
+gauge("local_vector_index_points", "Points in the in-process vector index (0 when not loaded).",
+      lambda: len(get_local_index() or ()))
@@ -0,0 +1,245 @@
+"""
+Minimal in-process metrics primitives.
+
+Histograms use fixed bucket bounds and plain integer counters, so recording an
+observation costs one `bisect` and two additions (no locks: the app runs one
+event loop per process). Gauges are callbacks evaluated only when `/metrics`
+is scraped. `render_prometheus()` emits the text exposition format.
+
+`stage(name)` times one step of a request: it feeds the
+`request_stage_duration_seconds` histogram and, inside an HTTP request, the
+`Server-Timing` header written by `ServerTimingMiddleware`.
+"""
+
+from __future__ import annotations
+
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+# Latency buckets in seconds: 100µs .. 10s.
+DEFAULT_LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Cumulative-on-read histogram with fixed upper bounds."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        # one slot per bound plus the +Inf overflow slot
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[Tuple[float, int]]:
+        """Return `(upper_bound, cumulative_count)` pairs ending with +Inf."""
+        running = 0
+        out = []
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            running += n
+            out.append((bound, running))
+        return out
+
+
+class HistogramFamily:
+    """A named histogram with one child per label-value tuple."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Tuple[str, ...] = (),
+        buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = tuple(buckets)
+        self.children: Dict[Tuple[str, ...], Histogram] = {}
+
+    def labels(self, *values: str) -> Histogram:
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+            child = self.children[values] = Histogram(self.buckets)
+        return child
+
+
+HISTOGRAMS: Dict[str, HistogramFamily] = {}
+
+
+def histogram(
+    name: str,
+    description: str,
+    label_names: Tuple[str, ...] = (),
+    buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+) -> HistogramFamily:
+    """Get or create the process-wide histogram family `name`."""
+    family = HISTOGRAMS.get(name)
+    if family is None:
+        family = HISTOGRAMS[name] = HistogramFamily(name, description, label_names, buckets)
+    return family
+
+
+class CounterFamily:
+    """A monotonically increasing counter with one value per label-value tuple."""
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *values: str, amount: float = 1.0) -> None:
+        if len(values) != len(self.label_names):
+            raise ValueError(f"{self.name} expects labels {self.label_names}, got {values}")
+        self.values[values] = self.values.get(values, 0.0) + amount
+
+
+COUNTERS: Dict[str, CounterFamily] = {}
+
+
+def counter(name: str, description: str, label_names: Tuple[str, ...] = ()) -> CounterFamily:
+    """Get or create the process-wide counter family `name`."""
+    family = COUNTERS.get(name)
+    if family is None:
+        family = COUNTERS[name] = CounterFamily(name, description, label_names)
+    return family
+
+
+# A gauge callback returns one value, or a mapping of label-value tuples to values.
+GaugeValue = Union[float, Mapping[Tuple[str, ...], float]]
+
+
+class GaugeFamily:
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        label_names: Tuple[str, ...],
+        read: Callable[[], GaugeValue],
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.read = read
+
+
+GAUGES: Dict[str, GaugeFamily] = {}
+
+
+def gauge(
+    name: str,
+    description: str,
+    read: Callable[[], GaugeValue],
+    label_names: Tuple[str, ...] = (),
+) -> GaugeFamily:
+    """Register (or replace) the callback gauge `name`; `read` runs at scrape time."""
+    family = GAUGES[name] = GaugeFamily(name, description, label_names, read)
+    return family
+
+
+# ---------------------- request stages ----------------------
+STAGE_LATENCY = histogram(
+    "request_stage_duration_seconds",
+    "Latency of the individual stages of a request (prefs, encode, vector_search, ...).",
+    ("stage",),
+)
+
+# Set per request by ServerTimingMiddleware; None outside HTTP requests.
+_request_stages: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_stages", default=None)
+
+
+def add_server_timing(name: str, seconds: float) -> None:
+    """Report `name` in the current request's `Server-Timing` header (no-op outside requests)."""
+    stages = _request_stages.get()
+    if stages is not None:
+        stages.append((name, seconds))
+
+
+def record_stage(name: str, seconds: float) -> None:
+    STAGE_LATENCY.labels(name).observe(seconds)
+    add_server_timing(name, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def begin_request_stages() -> List[Tuple[str, float]]:
+    stages: List[Tuple[str, float]] = []
+    _request_stages.set(stages)
+    return stages
+
+
+def server_timing_header(stages: List[Tuple[str, float]], total: float) -> str:
+    """Format stages as a `Server-Timing` value; repeated stages are summed."""
+    merged: Dict[str, float] = {}
+    for name, seconds in stages:
+        merged[name] = merged.get(name, 0.0) + seconds
+    merged["total"] = total
+    return ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in merged.items())
+
+
+# ---------------------- exposition ----------------------
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    value = float(value)
+    if value == float("inf"):
+        return "+Inf"
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render_prometheus() -> str:
+    """Render every registered metric in the Prometheus text format (version 0.0.4)."""
+    lines: List[str] = []
+    for family in HISTOGRAMS.values():
+        lines += [f"# HELP {family.name} {family.description}", f"# TYPE {family.name} histogram"]
+        for values, child in list(family.children.items()):
+            for bound, running in child.cumulative():
+                le = f'le="{_number(bound)}"'
+                lines.append(f"{family.name}_bucket{_labels(family.label_names, values, le)} {running}")
+            lines.append(f"{family.name}_sum{_labels(family.label_names, values)} {_number(child.sum)}")
+            lines.append(f"{family.name}_count{_labels(family.label_names, values)} {child.count}")
+    for family in COUNTERS.values():
+        lines += [f"# HELP {family.name} {family.description}", f"# TYPE {family.name} counter"]
+        for values, value in list(family.values.items()):
+            lines.append(f"{family.name}{_labels(family.label_names, values)} {_number(value)}")
+    for family in GAUGES.values():
+        try:
+            read = family.read()
+        except Exception:  # pragma: no cover - a broken callback must not break the scrape
+            continue
+        samples = read.items() if isinstance(read, Mapping) else [((), read)]
+        lines += [f"# HELP {family.name} {family.description}", f"# TYPE {family.name} gauge"]
+        for values, value in samples:
+            lines.append(f"{family.name}{_labels(family.label_names, values)} {_number(value)}")
+    return "\n".join(lines) + "\n"
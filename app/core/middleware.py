@@ -0,0 +1,80 @@
+"""
+ASGI middleware shared by the API.
+
+Written as plain ASGI callables rather than `BaseHTTPMiddleware`, which would
+wrap every request in an extra task and memory stream.
+"""
+
+from __future__ import annotations
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import begin_request_stages, histogram, server_timing_header
+from app.core.profiling import RequestProfiler
+
+REQUEST_LATENCY = histogram(
+    "http_request_duration_seconds",
+    "Latency of HTTP requests until the response headers are sent, by route template.",
+    ("method", "route", "status"),
+)
+
+
+class ServerTimingMiddleware:
+    """Adds a `Server-Timing` header with the stages recorded via `metrics.stage()`."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        stages = begin_request_stages()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - started
+                # FastAPI stores the matched route in the scope; use its template, not the raw
+                # path, so ids in URLs do not explode the label cardinality.
+                route = getattr(scope.get("route"), "path", "unmatched")
+                REQUEST_LATENCY.labels(scope["method"], route, str(message["status"])).observe(elapsed)
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing_header(stages, elapsed).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+
+class ProfilingMiddleware:
+    """Profiles opted-in or sampled requests; see `app.core.profiling`."""
+
+    def __init__(self, app: ASGIApp, profiler: RequestProfiler) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        reason = self.profiler.should_profile(scope) if scope["type"] == "http" else None
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        profile, sampler = self.profiler.start(scope, reason)
+
+        async def send_with_profile_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile.id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            await self.profiler.finish(profile, sampler, time.perf_counter() - started)
@@ -9,7 +9,11 @@ from app.core.config import settings
 @lru_cache(maxsize=1)
 def _get_client() -> AsyncIOMotorClient:
     """Return a cached Mongo client."""
-    return AsyncIOMotorClient(settings.mongo_url)
+    return AsyncIOMotorClient(
+        settings.mongo_url,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+    )
 
 
 def _get_database_name() -> str:
@@ -17,12 +21,26 @@ def _get_database_name() -> str:
     return settings.MONGO_INITDB_DATABASE or "appdb"
 
 
+def get_mongo_database() -> AsyncIOMotorDatabase:
+    """Return the application database handle (for jobs outside request scope)."""
+    return _get_client()[_get_database_name()]
+
+
 async def get_mongo_db() -> AsyncGenerator[AsyncIOMotorDatabase, None]:
     """
     FastAPI dependency that yields the Mongo database handle.
 
     The underlying client is cached at module level so connections are reused.
     """
-    client = _get_client()
-    db = client[_get_database_name()]
-    yield db
+    yield get_mongo_database()
+
+
+async def open_client() -> None:
+    """Create the client and round-trip once; the driver then fills the pool up to minPoolSize."""
+    await get_mongo_database().command("ping")
+
+
+def close_client() -> None:
+    if _get_client.cache_info().currsize:
+        _get_client().close()
+        _get_client.cache_clear()
@@ -0,0 +1,172 @@
+"""
+ONNX Runtime backend for the query embedding model (`EMBEDDING_BACKEND=onnx`).
+
+`export_onnx` converts the sentence-transformers model once (needs torch). It
+writes `model.onnx`, an int8 `model.int8.onnx` made with dynamic quantization,
+`tokenizer.json` and `meta.json`. `OnnxEmbedder` only needs onnxruntime and
+tokenizers at serving time. Its `encode` mirrors `SentenceTransformer.encode`:
+the same truncation length, mean pooling over the attention mask and, with
+`normalize_embeddings=True`, L2 normalization. It can stand in for the torch
+model wherever `get_embedding_model()` is used.
+
+Export ahead of deployment (otherwise it happens on first use):
+  python -m app.core.onnx_embedder [--model sentence-transformers/all-MiniLM-L6-v2] [--no-quantize]
+Parity and latency against torch: python benchmarks/embedding_backends.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Sequence, Union
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+
+
+def model_dir(model_name: str = settings.EMBEDDING_MODEL_NAME) -> Path:
+    return Path(settings.EMBEDDING_ONNX_DIR) / model_name.replace("/", "__")
+
+
+def export_onnx(model_name: str, out_dir: Path, quantize: bool = True) -> Path:
+    """Export `model_name` (transformer + mean pooling) to ONNX in `out_dir`."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer, pooling = st[0], st[1]
+    if pooling.get_pooling_mode_str() != "mean":
+        raise ValueError(f"{model_name} uses {pooling.get_pooling_mode_str()} pooling; only mean is supported")
+    tokenizer = transformer.tokenizer
+
+    class LastHiddenState(torch.nn.Module):
+        def __init__(self, model: torch.nn.Module) -> None:
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(*inputs)[0]
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    tokenizer.save_pretrained(str(out_dir))
+    probe = tokenizer(["a probe sentence"], return_tensors="pt")
+    # BERT-style forward(input_ids, attention_mask, token_type_ids): keep that order
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in probe]
+    axes = {0: "batch", 1: "sequence"}
+    with torch.no_grad():
+        torch.onnx.export(
+            LastHiddenState(transformer.auto_model.eval()),
+            tuple(probe[name] for name in input_names),
+            str(out_dir / FP32_FILE),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes={**{name: axes for name in input_names}, "last_hidden_state": axes},
+            opset_version=14,
+            do_constant_folding=True,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        quantize_dynamic(str(out_dir / FP32_FILE), str(out_dir / INT8_FILE), weight_type=QuantType.QInt8)
+
+    meta = {
+        "model_name": model_name,
+        "max_seq_length": st.max_seq_length,
+        "dimension": st.get_sentence_embedding_dimension(),
+        "pad_token": tokenizer.pad_token,
+        "pad_token_id": tokenizer.pad_token_id,
+        "quantized": quantize,
+    }
+    (out_dir / "meta.json").write_text(json.dumps(meta, indent=2))
+    logger.info("Exported %s to %s", model_name, out_dir)
+    return out_dir
+
+
+class OnnxEmbedder:
+    """Sentence embeddings with onnxruntime; `encode` matches SentenceTransformer.encode."""
+
+    def __init__(self, directory: Path, quantized: bool = True, threads: int = 0) -> None:
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        meta = json.loads((directory / "meta.json").read_text())
+        self.model_name = meta["model_name"]
+        self.dimension = meta["dimension"]
+        self.tokenizer = Tokenizer.from_file(str(directory / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=meta["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=meta["pad_token_id"], pad_token=meta["pad_token"])
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        path = directory / (INT8_FILE if quantized else FP32_FILE)
+        self.session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(
+        self,
+        sentences: Union[str, Sequence[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        **_: object,
+    ) -> "np.ndarray":
+        import numpy as np
+
+        single = isinstance(sentences, str)
+        texts: List[str] = [sentences] if single else list(sentences)
+        out = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            out[start:start + batch_size] = self._encode_batch(texts[start:start + batch_size])
+        if normalize_embeddings:
+            # same as torch.nn.functional.normalize(p=2, eps=1e-12)
+            out /= np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+        return out[0] if single else out
+
+    def _encode_batch(self, texts: List[str]) -> "np.ndarray":
+        import numpy as np
+
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        encodings = self.tokenizer.encode_batch(texts)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        hidden = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+        # mean pooling over real tokens, as sentence_transformers.models.Pooling(mode="mean")
+        mask = feeds["attention_mask"][..., None].astype(np.float32)
+        return (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+
+def load_onnx_embedder() -> OnnxEmbedder:
+    directory = model_dir()
+    needs_int8 = settings.EMBEDDING_ONNX_QUANTIZE and not (directory / INT8_FILE).exists()
+    if not (directory / "meta.json").exists() or needs_int8:
+        logger.warning("No ONNX export for %s in %s; exporting now (needs torch)", settings.EMBEDDING_MODEL_NAME, directory)
+        export_onnx(settings.EMBEDDING_MODEL_NAME, directory, quantize=settings.EMBEDDING_ONNX_QUANTIZE)
+    return OnnxEmbedder(directory, quantized=settings.EMBEDDING_ONNX_QUANTIZE, threads=settings.EMBEDDING_ONNX_THREADS)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL_NAME)
+    parser.add_argument("--out", type=Path, help="output directory (default: EMBEDDING_ONNX_DIR/<model>)")
+    parser.add_argument("--no-quantize", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    export_onnx(args.model, args.out or model_dir(args.model), quantize=not args.no_quantize)
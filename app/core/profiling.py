@@ -0,0 +1,223 @@
+"""
+Wall-clock sampling profiler for individual live requests.
+
+While a request is profiled, a helper thread wakes every `interval` seconds and
+records where the request's task is:
+  * running on the event loop: the loop thread's Python stack, cut at the
+    task's root coroutine (sync work such as formatting or a blocking client
+    call shows up here);
+  * suspended: the chain of awaiting coroutines, ending in `[await <type>]`
+    (time spent in Postgres, Mongo, Qdrant or a worker thread shows up here).
+
+Samples are aggregated as collapsed stacks (`frame;frame;frame count`), the
+input format of flamegraph.pl, speedscope and inferno. Profiles are kept in a
+ring buffer (and optionally written to `PROFILING_OUTPUT_DIR`) and served by
+`/debug/profiles`. Unprofiled requests pay for one header scan and one
+`random()` call; with no token and a zero sample rate the middleware is not
+installed at all.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+_REPO_ROOT = str(Path(__file__).resolve().parent.parent.parent) + os.sep
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(_REPO_ROOT):
+        filename = filename[len(_REPO_ROOT):]
+    else:
+        filename = "/".join(Path(filename).parts[-2:])
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+def _await_chain(coro: Any) -> List[Any]:
+    """Frames of a suspended coroutine and everything it is awaiting, outermost first."""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    frames.append(coro)  # leaf awaitable (Future, Task, ...) or None
+    return frames
+
+
+class Sampler(threading.Thread):
+    """Samples one asyncio task from a helper thread until `stop()` is called."""
+
+    def __init__(self, task: asyncio.Task, loop_thread_id: int, interval: float) -> None:
+        super().__init__(name="request-profiler", daemon=True)
+        self.root = task.get_coro()
+        self.loop_thread_id = loop_thread_id
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        while not self._done.wait(self.interval):
+            stack = self._sample()
+            if stack:
+                self.stacks[stack] += 1
+
+    def stop(self) -> None:
+        """Signal the thread to exit; join it off the event loop (see RequestProfiler.finish)."""
+        self._done.set()
+
+    def _sample(self) -> Optional[str]:
+        root_frame = self.root.cr_frame
+        if root_frame is None:
+            return None
+
+        running = []
+        frame = sys._current_frames().get(self.loop_thread_id)
+        while frame is not None:
+            running.append(frame)
+            if frame is root_frame:
+                return ";".join(_frame_label(f) for f in reversed(running))
+            frame = frame.f_back
+
+        *frames, leaf = _await_chain(self.root)
+        labels = [_frame_label(f) for f in frames]
+        labels.append(f"[await {type(leaf).__name__}]")
+        return ";".join(labels)
+
+
+@dataclass
+class Profile:
+    id: str
+    method: str
+    path: str
+    reason: str
+    started_at: datetime
+    interval_s: float
+    duration_s: float = 0.0
+    status: Optional[int] = None
+    stacks: Counter = field(default_factory=Counter)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "status": self.status,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_s * 1000, 2),
+            "samples": sum(self.stacks.values()),
+            "interval_ms": self.interval_s * 1000,
+        }
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class RequestProfiler:
+    """Decides which requests to profile and keeps the finished profiles."""
+
+    def __init__(
+        self,
+        token: Optional[str] = settings.PROFILING_TOKEN,
+        sample_rate: float = settings.PROFILING_SAMPLE_RATE,
+        interval: float = settings.PROFILING_INTERVAL_S,
+        max_per_minute: int = settings.PROFILING_MAX_PER_MINUTE,
+        keep: int = settings.PROFILING_KEEP,
+        output_dir: Optional[str] = settings.PROFILING_OUTPUT_DIR,
+    ) -> None:
+        self.token = token.encode("latin-1") if token else None
+        self.sample_rate = sample_rate
+        self.interval = interval
+        self.max_per_minute = max_per_minute
+        self.output_dir = Path(output_dir) if output_dir else None
+        self.profiles: Deque[Profile] = deque(maxlen=keep)
+        self._recent_starts: Deque[float] = deque()
+
+    @property
+    def enabled(self) -> bool:
+        return self.token is not None or self.sample_rate > 0
+
+    def should_profile(self, scope: Dict[str, Any]) -> Optional[str]:
+        """Return why this request should be profiled (`header` / `sampled`), or None."""
+        if scope["path"].startswith("/debug/"):
+            return None
+        reason = None
+        if self.token is not None:
+            for name, value in scope["headers"]:
+                if name == b"x-profile-token" and value == self.token:
+                    reason = "header"
+                    break
+        if reason is None and self.sample_rate > 0 and random.random() < self.sample_rate:
+            reason = "sampled"
+        if reason is None or not self._take_slot():
+            return None
+        return reason
+
+    def _take_slot(self) -> bool:
+        now = time.monotonic()
+        while self._recent_starts and now - self._recent_starts[0] > 60:
+            self._recent_starts.popleft()
+        if len(self._recent_starts) >= self.max_per_minute:
+            return False
+        self._recent_starts.append(now)
+        return True
+
+    def start(self, scope: Dict[str, Any], reason: str) -> tuple[Profile, Sampler]:
+        profile = Profile(
+            id=uuid.uuid4().hex[:16],
+            method=scope["method"],
+            path=scope["path"],
+            reason=reason,
+            started_at=datetime.now(timezone.utc),
+            interval_s=self.interval,
+        )
+        sampler = Sampler(asyncio.current_task(), threading.get_ident(), self.interval)
+        sampler.start()
+        return profile, sampler
+
+    async def finish(self, profile: Profile, sampler: Sampler, duration: float) -> None:
+        sampler.stop()
+        # The thread may be mid-sleep for up to one interval; wait for it without blocking the loop.
+        await asyncio.to_thread(sampler.join)
+        profile.stacks = sampler.stacks
+        profile.duration_s = duration
+        self.profiles.append(profile)
+        if self.output_dir is not None:
+            await asyncio.to_thread(self._write, profile)
+
+    def _write(self, profile: Profile) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        (self.output_dir / f"{profile.id}.folded").write_text(profile.collapsed(), encoding="utf-8")
+
+    def get(self, profile_id: str) -> Optional[str]:
+        """Collapsed stacks of a profile from this worker, or from the shared output dir."""
+        for profile in self.profiles:
+            if profile.id == profile_id:
+                return profile.collapsed()
+        if self.output_dir is not None and profile_id.isalnum():
+            path = self.output_dir / f"{profile_id}.folded"
+            if path.is_file():
+                return path.read_text(encoding="utf-8")
+        return None
+
+
+@lru_cache(maxsize=1)
+def get_request_profiler() -> RequestProfiler:
+    return RequestProfiler()
@@ -1,17 +1,45 @@
+import asyncio
 from functools import lru_cache
+from typing import TYPE_CHECKING
 
-from qdrant_client import QdrantClient
+import httpx
 
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
+
 
 @lru_cache(maxsize=1)
-def get_qdrant_client() -> QdrantClient:
+def get_qdrant_client() -> "QdrantClient":
     """Return a cached Qdrant client."""
+    # Imported here: qdrant_client takes ~0.7s to load and the API imports this module at startup.
+    from qdrant_client import QdrantClient
+
+    if settings.qdrant_url == ":memory:":
+        # local in-process mode, e.g. for benchmarks/endpoints.py
+        return QdrantClient(":memory:")
     return QdrantClient(
         url=settings.qdrant_url,
         api_key=settings.QDRANT_API_KEY or None,
         timeout=30.0,
         prefer_grpc=False,
         check_compatibility=False,
+        # passed through to the underlying httpx client (REST connection pool)
+        limits=httpx.Limits(
+            max_connections=settings.QDRANT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.QDRANT_MAX_CONNECTIONS,
+        ),
     )
+
+
+async def open_client() -> None:
+    """Create the client and fetch the collection once so a keep-alive connection is ready."""
+    client = get_qdrant_client()
+    await asyncio.to_thread(client.get_collection, settings.QDRANT_COLLECTION)
+
+
+def close_client() -> None:
+    if get_qdrant_client.cache_info().currsize:
+        get_qdrant_client().close()
+        get_qdrant_client.cache_clear()
@@ -0,0 +1,69 @@
+"""
+Password hashing off the event loop.
+
+bcrypt is deliberately slow (~100-250 ms of CPU per hash), so hashes run in a
+process pool: the event loop stays responsive and bulk imports use every core.
+Interactive signups are additionally bounded by a semaphore so a burst cannot
+queue unbounded work behind the pool.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import List, Optional, Sequence
+
+from passlib.hash import bcrypt
+
+from app.core.config import settings
+
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def _hash_one(password: str) -> str:
+    return bcrypt.hash(password)
+
+
+def _hash_many(passwords: Sequence[str]) -> List[str]:
+    return [bcrypt.hash(password) for password in passwords]
+
+
+def _pool_size() -> int:
+    return settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+
+
+@lru_cache(maxsize=1)
+def _get_pool() -> ProcessPoolExecutor:
+    # spawn: never fork a process that already runs an event loop and driver threads
+    return ProcessPoolExecutor(max_workers=_pool_size(), mp_context=multiprocessing.get_context("spawn"))
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(settings.PASSWORD_HASH_CONCURRENCY or 2 * _pool_size())
+    return _semaphore
+
+
+async def hash_password(password: str) -> str:
+    """Hash one password in the process pool (bounded concurrency)."""
+    async with _get_semaphore():
+        return await asyncio.get_running_loop().run_in_executor(_get_pool(), _hash_one, password)
+
+
+async def hash_passwords(passwords: Sequence[str], chunk_size: int = 64) -> List[str]:
+    """Hash many passwords across all pool workers, preserving order."""
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+    results = await asyncio.gather(*(loop.run_in_executor(pool, _hash_many, chunk) for chunk in chunks))
+    return [hashed for chunk in results for hashed in chunk]
+
+
+def shutdown_pool() -> None:
+    if _get_pool.cache_info().currsize:
+        _get_pool().shutdown(wait=True, cancel_futures=True)
+        _get_pool.cache_clear()
@@ -0,0 +1,69 @@
+"""
+Single-flight execution with an optional short-lived result cache.
+
+Concurrent `do(key, fn)` calls with the same key share one execution of `fn`.
+The shared work runs as its own task, so a caller that disconnects (and is
+cancelled) does not cancel it for the others. With `ttl > 0`, successful
+results are also served from an LRU cache for `ttl` seconds; errors are never
+cached.
+
+Results are shared between callers and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+from app.core.metrics import counter
+
+R = TypeVar("R")
+
+SINGLEFLIGHT_CALLS = counter(
+    "singleflight_calls_total",
+    "Coalesced calls by outcome: leader (ran the work), coalesced (joined an in-flight call), cache_hit.",
+    ("flight", "outcome"),
+)
+
+
+class SingleFlight(Generic[R]):
+    def __init__(self, name: str, ttl: float = 0.0, max_entries: int = 2048) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._cache: "OrderedDict[Hashable, Tuple[float, R]]" = OrderedDict()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[R]]) -> R:
+        if self.ttl > 0:
+            cached = self._cache.get(key)
+            if cached is not None:
+                expires, result = cached
+                if time.monotonic() < expires:
+                    self._cache.move_to_end(key)
+                    SINGLEFLIGHT_CALLS.inc(self.name, "cache_hit")
+                    return result
+                del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is None:
+            SINGLEFLIGHT_CALLS.inc(self.name, "leader")
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            SINGLEFLIGHT_CALLS.inc(self.name, "coalesced")
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Also marks the exception as retrieved when every caller has gone away.
+        if task.cancelled() or task.exception() is not None or self.ttl <= 0:
+            return
+        self._cache[key] = (time.monotonic() + self.ttl, task.result())
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
@@ -1,8 +1,132 @@
+"""
+Registry of the named SQL queries in `sql/queries`.
+
+All files are read, checked and compiled into `TextClause` objects once at
+startup. Executing the same compiled statement keeps SQLAlchemy's compiled
+cache warm and lets the asyncpg dialect reuse its per-connection prepared
+statement, so hot paths skip both file I/O and re-planning. Every call is
+timed into the `sql_query_duration_seconds` histogram and, inside a request,
+reported in its `Server-Timing` header as `sql.<name>`.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterator, Mapping, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from sqlalchemy.sql.elements import TextClause
+
+from app.core.metrics import add_server_timing, histogram
 
 SQL_DIR = Path(__file__).parent.parent.parent / "sql" / "queries"
 
-def load_query(filename: str) -> str:
-    path = SQL_DIR / filename
-    with open(path, "r", encoding="utf-8") as f:
-        return f.read()
\ No newline at end of file
+# Same rule SQLAlchemy uses for text() binds: ":name" but not "::type" casts.
+_BIND_RE = re.compile(r"(?<![:\w]):([A-Za-z_]\w*)")
+_POSITIONAL_RE = re.compile(r"\$\d+")
+_COMMENT_RE = re.compile(r"--[^\n]*")
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+
+QUERY_LATENCY = histogram(
+    "sql_query_duration_seconds",
+    "Latency of named SQL queries from sql/queries.",
+    ("query",),
+)
+
+
+@dataclass(frozen=True)
+class NamedQuery:
+    name: str
+    sql: str
+    statement: TextClause
+    params: FrozenSet[str]
+
+
+def _bind_names(sql: str) -> FrozenSet[str]:
+    stripped = _STRING_RE.sub("''", _COMMENT_RE.sub("", sql))
+    if _POSITIONAL_RE.search(stripped):
+        raise ValueError("positional $n placeholders are not supported; use :name binds")
+    return frozenset(_BIND_RE.findall(stripped))
+
+
+class QueryRegistry:
+    """Loads every `*.sql` file under `directory`, keyed by file stem."""
+
+    def __init__(self, directory: Path = SQL_DIR) -> None:
+        self.queries: Dict[str, NamedQuery] = {}
+        for path in sorted(directory.glob("*.sql")):
+            sql = path.read_text(encoding="utf-8")
+            try:
+                params = _bind_names(sql)
+            except ValueError as err:
+                raise ValueError(f"{path.name}: {err}") from err
+            self.queries[path.stem] = NamedQuery(path.stem, sql, text(sql), params)
+
+    def get(self, name: str) -> NamedQuery:
+        try:
+            return self.queries[name.removesuffix(".sql")]
+        except KeyError:
+            raise KeyError(f"Unknown SQL query '{name}' (looked in {SQL_DIR})") from None
+
+    def sql(self, name: str) -> str:
+        """Raw SQL text, for bulk paths that run on the asyncpg connection directly."""
+        return self.get(name).sql
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            QUERY_LATENCY.labels(name).observe(elapsed)
+            add_server_timing(f"sql.{name}", elapsed)
+
+    async def execute(
+        self,
+        db: AsyncSession,
+        name: str,
+        params: Optional[Mapping[str, Any]] = None,
+    ) -> Result:
+        """Validate binds against the file and execute the precompiled statement."""
+        query = self.get(name)
+        params = self._check_params(query, params)
+        with self.timed(query.name):
+            return await db.execute(query.statement, params)
+
+    async def stream(
+        self,
+        db: AsyncSession,
+        name: str,
+        params: Optional[Mapping[str, Any]] = None,
+        chunk_size: int = 1000,
+    ) -> AsyncResult:
+        """Execute through a server-side cursor that fetches `chunk_size` rows at a time."""
+        query = self.get(name)
+        params = self._check_params(query, params)
+        with self.timed(query.name):
+            return await db.stream(query.statement.execution_options(yield_per=chunk_size), params)
+
+    @staticmethod
+    def _check_params(query: NamedQuery, params: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        params = dict(params or {})
+        if params.keys() != query.params:
+            missing = sorted(query.params - params.keys())
+            unexpected = sorted(params.keys() - query.params)
+            raise ValueError(
+                f"{query.name}.sql bind mismatch (missing={missing}, unexpected={unexpected})"
+            )
+        return params
+
+
+@lru_cache(maxsize=1)
+def get_query_registry() -> QueryRegistry:
+    """Return the process-wide query registry (loaded on first use / at startup)."""
+    return QueryRegistry()
@@ -0,0 +1,238 @@
+"""
+In-process bitmap index over recipe tags, used for preference filtering in /recommended.
+
+Each recipe has an ordinal, and each (field, tag) pair maps to a roaring bitmap of
+ordinals. A full build streams a projection of the `recipes` collection and numbers the
+documents in the `_personalized` sort order (rating.value desc, title asc), so a
+bitmap's first N members are its top N. The `$all` / `$nin` preference query then
+becomes AND / ANDNOT over bitmaps, and Mongo is only queried to hydrate the winners.
+
+A refresh picks up documents whose `updated_at` is newer than the last build or
+refresh. It drops their old ordinal from `live` and appends each one as a new
+"tail" ordinal, ranked at query time by its stored sort key. Deleted documents and
+documents without `updated_at` are only picked up by the periodic full rebuild. A
+full rebuild also runs when the tail grows past TAG_INDEX_MAX_TAIL.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import sys
+import time
+from array import array
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from bson import ObjectId
+from pyroaring import BitMap
+
+from app.core.config import settings
+from app.core.metrics import gauge
+from app.core.mongo import get_mongo_database
+from app.core.vocabularies import TAG_VOCABULARIES
+
+logger = logging.getLogger(__name__)
+
+TAG_FIELDS = ("dietary_tags", "allergen_tags", "flavour_tags", "technique_tags", "ingredient_tags")
+PROJECTION = {"_id": 1, "title": 1, "rating.value": 1, **{field: 1 for field in TAG_FIELDS}}
+_EMPTY = BitMap()
+
+RankKey = Tuple[float, str]
+
+
+def rank_key(doc: Dict[str, Any]) -> RankKey:
+    """Sort key equal to .sort([("rating.value", -1), ("title", 1)]); missing ratings sort last."""
+    value = (doc.get("rating") or {}).get("value")
+    rating = -float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.inf
+    return (rating, doc.get("title") or "")
+
+
+def _tags(doc: Dict[str, Any], field: str) -> Iterable[str]:
+    value = doc.get(field)
+    return value if isinstance(value, list) else ()
+
+
+class TagIndex:
+    def __init__(self, ids: List[ObjectId], tags: Dict[str, Dict[str, BitMap]]) -> None:
+        self.ids = ids
+        self.ordinal_of: Dict[ObjectId, int] = {doc_id: ordinal for ordinal, doc_id in enumerate(ids)}
+        self.tags = tags
+        self.base_size = len(ids)
+        self.live = BitMap(range(len(ids)))
+        self.tail = BitMap()
+        self.tail_keys: Dict[int, RankKey] = {}
+
+    def __len__(self) -> int:
+        return len(self.live)
+
+    def apply(self, docs: Iterable[Dict[str, Any]]) -> int:
+        """Re-index changed documents as tail ordinals. Returns how many were applied."""
+        applied = 0
+        for doc in docs:
+            old = self.ordinal_of.get(doc["_id"])
+            if old is not None:
+                self.live.discard(old)
+                self.tail.discard(old)
+                self.tail_keys.pop(old, None)
+            ordinal = len(self.ids)
+            self.ids.append(doc["_id"])
+            self.ordinal_of[doc["_id"]] = ordinal
+            for field in TAG_FIELDS:
+                for tag in _tags(doc, field):
+                    self.tags[field].setdefault(sys.intern(tag), BitMap()).add(ordinal)
+            self.live.add(ordinal)
+            self.tail.add(ordinal)
+            self.tail_keys[ordinal] = rank_key(doc)
+            applied += 1
+        return applied
+
+    def match(self, prefs: Dict[str, List[str]]) -> BitMap:
+        """Ordinals matching `_build_mongo_query(prefs)`: all diet tags, no allergen / disliked ingredient."""
+        required = sorted((self.tags["dietary_tags"].get(diet, _EMPTY) for diet in prefs["diet_type"]), key=len)
+        result = self.live
+        for bitmap in required:
+            result = result & bitmap
+        excluded = [self.tags["allergen_tags"].get(tag, _EMPTY) for tag in prefs["allergies"]]
+        excluded += [self.tags["ingredient_tags"].get(tag, _EMPTY) for tag in prefs["dislikes"]]
+        if excluded:
+            result = result - BitMap.union(*excluded)
+        return result
+
+    def top(self, prefs: Dict[str, List[str]], limit: int) -> List[ObjectId]:
+        """
+        Candidate ids for the top `limit` matches: the first `limit` base ordinals
+        (already in rank order) followed by the best `limit` tail ordinals. The exact
+        top `limit` is among them; re-sort the hydrated documents with `rank_key`.
+        """
+        matched = self.match(prefs)
+        base = [ordinal for ordinal in islice(matched, limit) if ordinal < self.base_size]
+        tail = sorted(matched & self.tail, key=self.tail_keys.__getitem__)[:limit] if self.tail else []
+        return [self.ids[ordinal] for ordinal in base + tail]
+
+
+class TagIndexBuilder:
+    """Accumulates streamed documents in arrival order; `finish` renumbers them in rank order."""
+
+    def __init__(self) -> None:
+        self.ids: List[ObjectId] = []
+        self.keys: List[RankKey] = []
+        self.postings: Dict[str, Dict[str, array]] = {field: {} for field in TAG_FIELDS}
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        arrival = len(self.ids)
+        self.ids.append(doc["_id"])
+        self.keys.append(rank_key(doc))
+        for field in TAG_FIELDS:
+            for tag in _tags(doc, field):
+                self.postings[field].setdefault(sys.intern(tag), array("I")).append(arrival)
+
+    def finish(self) -> TagIndex:
+        """Sort and build the bitmaps (CPU-bound; run off the event loop)."""
+        order = sorted(range(len(self.ids)), key=self.keys.__getitem__)
+        rank = np.empty(len(order), dtype=np.uint32)
+        rank[order] = np.arange(len(order), dtype=np.uint32)
+
+        tags: Dict[str, Dict[str, BitMap]] = {}
+        for field, by_tag in self.postings.items():
+            vocabulary = TAG_VOCABULARIES.get(field)
+            tags[field] = {tag: BitMap() for tag in vocabulary or ()}
+            for tag, arrivals in by_tag.items():
+                tags[field][tag] = BitMap(rank[np.frombuffer(arrivals, dtype=np.uint32)].tolist())
+            unknown = set(by_tag) - set(vocabulary or by_tag)
+            if unknown:
+                logger.warning("%s has %d values outside the vocabulary: %s", field, len(unknown), sorted(unknown)[:10])
+        return TagIndex([self.ids[i] for i in order], tags)
+
+
+def _utcnow() -> datetime:
+    # pymongo decodes dates as naive UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class TagIndexManager:
+    """Owns the current index: full builds, incremental refreshes and the background refresh task."""
+
+    def __init__(self) -> None:
+        self.index: Optional[TagIndex] = None
+        self._watermark: Optional[datetime] = None
+        self._built_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    async def build(self) -> None:
+        started = _utcnow()
+        builder = TagIndexBuilder()
+        async for doc in get_mongo_database().recipes.find({}, PROJECTION, batch_size=10_000):
+            builder.add(doc)
+        index = await asyncio.to_thread(builder.finish)
+        # Swap only a complete index; readers keep using the old one until here.
+        self.index, self._watermark, self._built_at = index, started, time.monotonic()
+        logger.info("Built tag index over %d recipes", len(index))
+
+    async def refresh(self) -> None:
+        index = self.index
+        if (
+            index is None
+            or len(index.tail) > settings.TAG_INDEX_MAX_TAIL
+            or time.monotonic() - self._built_at > settings.TAG_INDEX_REBUILD_INTERVAL_S
+        ):
+            await self.build()
+            return
+        started = _utcnow()
+        cursor = get_mongo_database().recipes.find({"updated_at": {"$gt": self._watermark}}, PROJECTION)
+        docs = await cursor.to_list(length=None)
+        # Documents written while the query ran may be applied again next time, which is harmless.
+        applied = index.apply(docs)
+        self._watermark = started
+        if applied:
+            logger.debug("Tag index refreshed with %d changed recipes", applied)
+
+    # ----- lifecycle -----
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="tag-index-refresh")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.TAG_INDEX_REFRESH_INTERVAL_S)
+            try:
+                await self.refresh()
+            except Exception:  # pragma: no cover - Mongo errors surface at runtime
+                # Keep serving the last good index; the next tick retries.
+                logger.exception("Tag index refresh failed")
+
+
+@lru_cache(maxsize=1)
+def get_tag_index_manager() -> TagIndexManager:
+    return TagIndexManager()
+
+
+def get_tag_index() -> Optional[TagIndex]:
+    """The current index, or None when it is disabled or not built yet."""
+    return get_tag_index_manager().index if settings.TAG_INDEX_ENABLED else None
+
+
+def _index_sizes() -> Dict[Tuple[str, ...], int]:
+    index = get_tag_index()
+    return {("live",): len(index) if index else 0, ("tail",): len(index.tail) if index else 0}
+
+
+gauge(
+    "tag_index_recipes",
+    "Recipes in the tag bitmap index: live, and tail (changed since the last full build).",
+    _index_sizes,
+    label_names=("part",),
+)
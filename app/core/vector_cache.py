@@ -0,0 +1,118 @@
+"""
+LRU cache of query embeddings in front of the embedding model.
+
+There is one cache per model name, keyed by the case- and whitespace-normalized
+query; values are float16 bytes (768 B for a 384-d vector), so the default 20k entries
+stay around 20 MB. The cache is process-local and sits in front of the sidecar
+client too. With `QUERY_VECTOR_CACHE_PATH` set it is loaded during warm-up and
+saved on shutdown (oldest to newest, so recency survives restarts); the keys are
+stored as one UTF-8 JSON list, so a single long query does not widen every entry.
+A file written for another model is ignored on load.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.core.metrics import counter, gauge
+
+logger = logging.getLogger(__name__)
+
+CACHE_LOOKUPS = counter("query_vector_cache_lookups_total", "Query-embedding cache lookups by outcome.", ("outcome",))
+
+
+def normalize_query(text: str) -> str:
+    # The embedding model is uncased, so case and spacing variants embed identically.
+    return " ".join(text.lower().split())
+
+
+class QueryVectorCache:
+    def __init__(self, model_name: str, max_entries: int) -> None:
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, text: str) -> Optional[List[float]]:
+        key = normalize_query(text)
+        raw = self._entries.get(key)
+        if raw is None:
+            CACHE_LOOKUPS.inc("miss")
+            return None
+        self._entries.move_to_end(key)
+        CACHE_LOOKUPS.inc("hit")
+        return np.frombuffer(raw, dtype=np.float16).astype(np.float32).tolist()
+
+    def put(self, text: str, vector: Sequence[float]) -> None:
+        key = normalize_query(text)
+        self._entries[key] = np.asarray(vector, dtype=np.float16).tobytes()
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # ----- persistence -----
+    def save(self, path: Path) -> None:
+        if not self._entries:
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        keys = list(self._entries)
+        vectors = np.stack([np.frombuffer(self._entries[k], dtype=np.float16) for k in keys])
+        tmp = path.with_name(path.name + ".tmp")
+        with tmp.open("wb") as f:
+            encoded_keys = np.frombuffer(json.dumps(keys).encode("utf-8"), dtype=np.uint8)
+            np.savez(f, model=np.array(self.model_name), keys=encoded_keys, vectors=vectors)
+        os.replace(tmp, path)
+        logger.info("Saved %d cached query vectors to %s", len(keys), path)
+
+    def load(self, path: Path) -> int:
+        if not path.exists():
+            return 0
+        with np.load(path, allow_pickle=False) as data:
+            if str(data["model"]) != self.model_name:
+                logger.info("Ignoring query vector cache %s written for %s", path, data["model"])
+                return 0
+            raw_keys, vectors = data["keys"], data["vectors"].astype(np.float16)
+            # older files stored a fixed-width unicode array
+            keys = raw_keys.tolist() if raw_keys.dtype.kind == "U" else json.loads(raw_keys.tobytes().decode("utf-8"))
+        for key, vector in zip(keys[-self.max_entries:], vectors[-self.max_entries:]):
+            self._entries[str(key)] = vector.tobytes()
+        logger.info("Loaded %d cached query vectors from %s", len(self._entries), path)
+        return len(self._entries)
+
+
+@lru_cache(maxsize=1)
+def get_query_vector_cache() -> Optional[QueryVectorCache]:
+    """Process-wide cache, or None when `QUERY_VECTOR_CACHE_SIZE` is 0."""
+    if settings.QUERY_VECTOR_CACHE_SIZE <= 0:
+        return None
+    return QueryVectorCache(settings.EMBEDDING_MODEL_NAME, settings.QUERY_VECTOR_CACHE_SIZE)
+
+
+def load_query_vector_cache() -> None:
+    cache = get_query_vector_cache()
+    if cache is not None and settings.QUERY_VECTOR_CACHE_PATH:
+        cache.load(Path(settings.QUERY_VECTOR_CACHE_PATH))
+
+
+def save_query_vector_cache() -> None:
+    cache = get_query_vector_cache()
+    if cache is not None and settings.QUERY_VECTOR_CACHE_PATH:
+        cache.save(Path(settings.QUERY_VECTOR_CACHE_PATH))
+
+
+gauge(
+    "query_vector_cache_entries",
+    "Entries in the query-embedding cache.",
+    lambda: len(get_query_vector_cache() or ()),
+)
@@ -0,0 +1,84 @@
+"""
+Controlled tag vocabularies of the `recipes` collection.
+
+Mirrors the constants at the top of mongoDB/init/01_collections.js; keep the two
+in sync. `ingredient_tags` is open (any kebab-case string) and has no entry here.
+`validate_recipe` checks a document against the same `$jsonSchema` rules before
+it is loaded.
+"""
+
+import re
+from typing import Any, Dict, List, Tuple
+
+DIETARY: Tuple[str, ...] = (
+    "vegan", "vegetarian", "pescatarian", "halal", "kosher", "gluten-free", "dairy-free", "nut-free",
+    "egg-free", "low-carb", "low-fat",
+)
+ALLERGENS: Tuple[str, ...] = (
+    "gluten", "dairy", "egg", "peanut", "tree-nut", "soy", "shellfish", "fish", "sesame",
+)
+FLAVOURS: Tuple[str, ...] = (
+    "spicy", "sweet", "sour", "bitter", "salty", "umami", "smoky", "tangy", "herby", "garlicky",
+    "citrusy", "creamy", "rich", "fresh",
+)
+TECHNIQUE: Tuple[str, ...] = (
+    "grill", "roast", "bake", "fry", "deep-fry", "stir-fry", "braise", "stew", "steam", "poach",
+    "sous-vide", "marinate", "pickle", "ferment",
+)
+COURSES: Tuple[str | None, ...] = ("breakfast", "starter", "main", "side", "dessert", "drink", "snack", None)
+
+# Recipe field -> its vocabulary
+TAG_VOCABULARIES: Dict[str, Tuple[str, ...]] = {
+    "dietary_tags": DIETARY,
+    "allergen_tags": ALLERGENS,
+    "flavour_tags": FLAVOURS,
+    "technique_tags": TECHNIQUE,
+}
+
+# KEBAB in 01_collections.js
+KEBAB = re.compile(r"^[a-z0-9]+(?:-[a-z0-9]+)*$")
+
+
+def _tag_problems(field: str, values: Any, allowed: Tuple[str, ...] | None) -> List[str]:
+    if not isinstance(values, list):
+        return [f"{field} is not an array"]
+    problems = []
+    if len(set(map(repr, values))) != len(values):
+        problems.append(f"{field} has duplicates")
+    if allowed is not None:
+        unknown = sorted({str(v) for v in values if v not in allowed})
+        if unknown:
+            problems.append(f"{field} has values outside the vocabulary: {unknown}")
+    else:
+        bad = [v for v in values if not (isinstance(v, str) and KEBAB.match(v))]
+        if bad:
+            problems.append(f"{field} has non-kebab-case values: {bad[:5]}")
+    return problems
+
+
+def validate_recipe(doc: Dict[str, Any]) -> List[str]:
+    """Why `doc` would fail the `recipes` validator; empty when it passes."""
+    problems = [f"missing {field}" for field in ("title", "ingredients", "steps") if field not in doc]
+    if "title" in doc and not isinstance(doc["title"], str):
+        problems.append("title is not a string")
+    slug = doc.get("slug")
+    if "slug" in doc and not (isinstance(slug, str) and KEBAB.match(slug)):
+        problems.append(f"slug is not kebab-case: {slug!r}")
+    steps = doc.get("steps", [])
+    if not (isinstance(steps, list) and all(isinstance(step, str) for step in steps)):
+        problems.append("steps is not an array of strings")
+    ingredients = doc.get("ingredients", [])
+    if not (
+        isinstance(ingredients, list)
+        and all(isinstance(i, dict) and isinstance(i.get("name"), str) and isinstance(i.get("raw"), str) for i in ingredients)
+    ):
+        problems.append("ingredients need string name and raw")
+    for field, allowed in (*TAG_VOCABULARIES.items(), ("ingredient_tags", None)):
+        if field in doc:
+            problems += _tag_problems(field, doc[field], allowed)
+    cuisine = doc.get("cuisine")
+    if cuisine is not None and not (isinstance(cuisine, str) and KEBAB.match(cuisine)):
+        problems.append(f"cuisine is not kebab-case: {cuisine!r}")
+    if "course" in doc and doc["course"] not in COURSES:
+        problems.append(f"course outside the vocabulary: {doc['course']!r}")
+    return problems
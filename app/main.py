@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager
 from typing import Sequence
 
 from fastapi import FastAPI
@@ -5,9 +7,38 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
-from app.routes import users, recipes
+from app.core.lifecycle import close_pools, warm_up
+from app.core.middleware import ProfilingMiddleware, ServerTimingMiddleware
+from app.core.profiling import get_request_profiler
+from app.core.sql_loader import get_query_registry
+from app.routes import users, recipes, analytics, autocomplete, health, metrics, debug
+from app.services.analytics import get_analytics_buffer
 
-app = FastAPI(title="FlavorNet API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Read and validate every sql/queries file once, before serving traffic.
+    get_query_registry()
+    app.state.ready = False
+    warm_up_task = asyncio.create_task(warm_up(app.state), name="warm-up")
+    analytics_buffer = get_analytics_buffer()
+    analytics_buffer.start()
+    try:
+        yield
+    finally:
+        app.state.ready = False
+        # Wait for the cancelled warm-up so no step is still using a pool or client below.
+        warm_up_task.cancel()
+        try:
+            await warm_up_task
+        except asyncio.CancelledError:
+            pass
+        # Flush buffered analytics events before the pools go away.
+        await analytics_buffer.stop()
+        await close_pools()
+
+
+app = FastAPI(title="FlavorNet API", lifespan=lifespan)
 
 # Allow the local development frontend(s) to call the API without CORS errors.
 allowed_origins: Sequence[str] = [
@@ -25,10 +56,21 @@ app.add_middleware(
     allow_credentials=False,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+# Only installed when profiling is configured, so it costs nothing otherwise.
+if get_request_profiler().enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=get_request_profiler())
+# Added last so it is outermost and its total covers the whole middleware stack.
+app.add_middleware(ServerTimingMiddleware)
 
 app.include_router(users.router)
 app.include_router(recipes.router)
+app.include_router(analytics.router)
+app.include_router(autocomplete.router)
+app.include_router(health.router)
+app.include_router(metrics.router)
+app.include_router(debug.router)
 
 
 @app.get("/")
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.sql_loader import get_query_registry
+
+if TYPE_CHECKING:
+    import asyncpg
+
+
+class AnalyticsEvent(NamedTuple):
+    """One buffered row of the `analytics` table."""
+
+    user_id: Optional[int]
+    event_type: str
+    event_details: Optional[Dict[str, Any]]
+    created_at: datetime
+
+
+ANALYTICS_COLUMNS = ("user_id", "event_type", "event_details", "created_at")
+
+_CREATE_STAGE_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS analytics_stage (
+    user_id INT,
+    event_type VARCHAR(50),
+    event_details JSONB,
+    created_at TIMESTAMP
+) ON COMMIT DELETE ROWS;
+"""
+
+
+async def copy_events(conn: "asyncpg.Connection", events: Sequence[AnalyticsEvent]) -> int:
+    """
+    Bulk-load a batch of events: COPY into a session staging table, then one
+    INSERT ... SELECT into `analytics`.
+
+    Must run inside a transaction owned by the caller so follow-up statements
+    (e.g. rollups reading `analytics_stage`) commit atomically with the rows.
+    """
+    if not events:
+        return 0
+
+    records = [
+        (
+            event.user_id,
+            event.event_type,
+            json.dumps(event.event_details) if event.event_details is not None else None,
+            event.created_at,
+        )
+        for event in events
+    ]
+    await conn.execute(_CREATE_STAGE_SQL)
+    await conn.copy_records_to_table("analytics_stage", records=records, columns=ANALYTICS_COLUMNS)
+    queries = get_query_registry()
+    with queries.timed("insert_analytics_from_stage"):
+        await conn.execute(queries.sql("insert_analytics_from_stage"))
+    return len(records)
+
+
+async def update_rollups(conn: "asyncpg.Connection") -> None:
+    """Fold the batch staged by `copy_events` into the per-user and per-day rollups."""
+    queries = get_query_registry()
+    for name in ("update_user_activity_rollup", "update_daily_activity_rollup"):
+        with queries.timed(name):
+            await conn.execute(queries.sql(name))
+
+
+# Upper bounds for the first keyset page (nothing sorts after them).
+_FIRST_PAGE_ACTIVITY = datetime.max
+_FIRST_PAGE_USER_ID = 2**31 - 1
+
+
+class AnalyticsRepository:
+    """Read side of analytics; only touches the rollup tables, never raw events."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_user_stats(
+        self,
+        limit: int = 50,
+        after_last_activity: Optional[datetime] = None,
+        after_user_id: Optional[int] = None,
+    ):
+        result = await get_query_registry().execute(
+            self.db,
+            "get_user_stats",
+            {
+                "after_last_activity": after_last_activity or _FIRST_PAGE_ACTIVITY,
+                "after_user_id": after_user_id if after_user_id is not None else _FIRST_PAGE_USER_ID,
+                "limit": limit,
+            },
+        )
+        return result.mappings().all()
+
+    async def get_daily_activity(self, days: int = 30):
+        result = await get_query_registry().execute(self.db, "get_daily_activity", {"days": days})
+        return result.mappings().all()
+
+    async def get_popular_searches(self, days: int, min_count: int, limit: int):
+        result = await get_query_registry().execute(
+            self.db,
+            "popular_searches",
+            {"days": days, "min_count": min_count, "limit": limit},
+        )
+        return result.mappings().all()
@@ -1,13 +1,135 @@
+from __future__ import annotations
+
+import math
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Sequence
+
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import text
-from passlib.hash import bcrypt
-from app.core.sql_loader import load_query
+from app.core.sql_loader import get_query_registry
+
+if TYPE_CHECKING:
+    import asyncpg
+
+
+class RecipeMetadataRow(NamedTuple):
+    """One row of `recipe_metadata` as mirrored from Mongo."""
+
+    mongo_id: str
+    title: Optional[str]
+    cuisine: Optional[str]
+    rating_avg: Optional[Decimal]
+
+
+RECIPE_METADATA_COLUMNS = ("mongo_id", "title", "cuisine", "rating_avg")
+
+_CREATE_STAGE_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS recipe_metadata_stage (
+    mongo_id VARCHAR(50),
+    title VARCHAR(255),
+    cuisine VARCHAR(100),
+    rating_avg NUMERIC
+) ON COMMIT DELETE ROWS;
+"""
+
+
+def normalize_cuisine(cuisine: str) -> str:
+    """Match the `cuisine_key` generated column (kebab-case, lowercase)."""
+    return "-".join(cuisine.strip().lower().split())
+
+
+def to_metadata_row(doc: dict[str, Any]) -> RecipeMetadataRow:
+    """Project a Mongo recipe document onto the recipe_metadata columns."""
+    rating = (doc.get("rating") or {}).get("value")
+    rating_avg = None
+    # DECIMAL(3,1): keep finite values in range after rounding (99.96 rounds to 100.0),
+    # drop anything else rather than fail the batch.
+    if isinstance(rating, (int, float)) and math.isfinite(rating):
+        rounded = round(float(rating), 1)
+        if 0 <= rounded < 100:
+            rating_avg = Decimal(str(rounded))
+    title = doc.get("title")
+    cuisine = doc.get("cuisine")
+    return RecipeMetadataRow(
+        mongo_id=str(doc["_id"]),
+        title=title[:255] if isinstance(title, str) else None,
+        cuisine=cuisine[:100] if isinstance(cuisine, str) else None,
+        rating_avg=rating_avg,
+    )
+
+
+async def upsert_recipe_metadata(conn: "asyncpg.Connection", rows: Sequence[RecipeMetadataRow]) -> int:
+    """
+    COPY a batch into a session staging table and merge it with
+    `INSERT ... ON CONFLICT (mongo_id)`. Must run inside a caller-owned transaction.
+    """
+    if not rows:
+        return 0
+    await conn.execute(_CREATE_STAGE_SQL)
+    await conn.copy_records_to_table(
+        "recipe_metadata_stage",
+        records=rows,
+        columns=RECIPE_METADATA_COLUMNS,
+    )
+    queries = get_query_registry()
+    with queries.timed("upsert_recipe_metadata_from_stage"):
+        await conn.execute(queries.sql("upsert_recipe_metadata_from_stage"))
+    return len(rows)
+
+
+async def delete_recipe_metadata(conn: "asyncpg.Connection", mongo_ids: Sequence[str]) -> int:
+    """Delete the rows of recipes removed from Mongo. Returns rows deleted."""
+    if not mongo_ids:
+        return 0
+    status = await conn.execute("DELETE FROM recipe_metadata WHERE mongo_id = ANY($1::varchar[])", list(mongo_ids))
+    return int(status.split()[-1])
+
+
+class FacetCountRow(NamedTuple):
+    """One row of `recipe_facet_counts`; the tag lists are sorted."""
+
+    topic_id: int
+    cuisine: Optional[str]
+    course: Optional[str]
+    dietary_tags: list[str]
+    allergen_tags: list[str]
+    recipe_count: int
+
+
+FACET_COUNT_COLUMNS = ("topic_id", "cuisine", "course", "dietary_tags", "allergen_tags", "recipe_count")
+
+
+async def replace_facet_counts(
+    conn: "asyncpg.Connection",
+    rows: Sequence[FacetCountRow],
+    topics: Sequence[tuple[int, Optional[str], list[str]]],
+) -> int:
+    """
+    Swap in a new facet table and topic labels. DELETE (not TRUNCATE) keeps readers
+    unblocked; they see the old counts until the caller's transaction commits.
+    """
+    await conn.execute("DELETE FROM recipe_facet_counts")
+    await conn.copy_records_to_table("recipe_facet_counts", records=rows, columns=FACET_COUNT_COLUMNS)
+    await conn.execute("DELETE FROM recipe_topics")
+    await conn.copy_records_to_table("recipe_topics", records=topics, columns=("topic_id", "label", "terms"))
+    return len(rows)
+
 
 class RecipeRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
-    async def get_top_recipes_by_cuisine(self, cuisine: str):
-        sql = load_query("recipe_metadata.sql")
-        result = await self.db.execute(text(sql), {"cuisine": f"%{cuisine}%"})
+    async def get_top_recipes_by_cuisine(self, cuisine: str, limit: int = 10):
+        result = await get_query_registry().execute(
+            self.db,
+            "recipe_metadata",
+            {"cuisine": normalize_cuisine(cuisine), "limit": limit},
+        )
+        return result.mappings().all()
+
+    async def get_facet_counts(self, diet: list[str], allergies: list[str]):
+        result = await get_query_registry().execute(
+            self.db,
+            "recipe_facet_counts",
+            {"diet": diet, "allergies": allergies},
+        )
         return result.mappings().all()
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.sql_loader import get_query_registry
+
+if TYPE_CHECKING:
+    import asyncpg
+
+
+class TasteIncrement(NamedTuple):
+    """One user's share of an analytics batch, decayed to `updated_at`."""
+
+    user_id: int
+    taste: List[float]
+    weight: float
+    event_count: int
+    half_life_s: float
+    updated_at: datetime
+
+
+TASTE_COLUMNS = ("user_id", "taste", "weight", "event_count", "half_life_s", "updated_at")
+
+_CREATE_STAGE_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS taste_stage (
+    user_id INT,
+    taste REAL[],
+    weight DOUBLE PRECISION,
+    event_count BIGINT,
+    half_life_s DOUBLE PRECISION,
+    updated_at TIMESTAMP
+) ON COMMIT DELETE ROWS;
+"""
+
+
+async def apply_taste_increments(conn: "asyncpg.Connection", increments: Sequence[TasteIncrement]) -> int:
+    """COPY the increments into a staging table and fold them into `user_taste` in one statement."""
+    if not increments:
+        return 0
+    await conn.execute(_CREATE_STAGE_SQL)
+    await conn.copy_records_to_table("taste_stage", records=increments, columns=TASTE_COLUMNS)
+    queries = get_query_registry()
+    with queries.timed("update_user_taste_from_stage"):
+        await conn.execute(queries.sql("update_user_taste_from_stage"))
+    return len(increments)
+
+
+class TasteRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_taste(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """The user's taste vector and its weight decayed to now, or None for cold-start users."""
+        result = await get_query_registry().execute(self.db, "select_user_taste", {"user_id": user_id})
+        row = result.mappings().first()
+        return dict(row) if row else None
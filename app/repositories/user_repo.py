@@ -1,35 +1,90 @@
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, AsyncIterator, NamedTuple, Optional, Sequence
+
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, Integer
-from passlib.hash import bcrypt
-from app.core.sql_loader import load_query
+from app.core.security import hash_password
+from app.core.sql_loader import get_query_registry
 from sqlalchemy import bindparam
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy import String
 from fastapi import HTTPException
 
+if TYPE_CHECKING:
+    import asyncpg
+
+
+class UserImportRow(NamedTuple):
+    email: str
+    password_hash: str
+    diet_type: Optional[list[str]]
+    allergies: Optional[list[str]]
+    dislikes: Optional[list[str]]
+
+
+USER_IMPORT_COLUMNS = ("email", "password_hash", "diet_type", "allergies", "dislikes")
+
+_CREATE_IMPORT_STAGE_SQL = """
+CREATE TEMP TABLE IF NOT EXISTS users_import_stage (
+    email VARCHAR(255),
+    password_hash TEXT,
+    diet_type TEXT[],
+    allergies TEXT[],
+    dislikes TEXT[]
+) ON COMMIT DELETE ROWS;
+"""
+
+
+async def import_users(conn: "asyncpg.Connection", rows: Sequence[UserImportRow]) -> int:
+    """
+    COPY a batch of pre-hashed users into a staging table and load `users` and
+    `user_prefs` with one set-based statement. Must run inside a caller-owned
+    transaction. Returns the number of users created.
+    """
+    if not rows:
+        return 0
+    await conn.execute(_CREATE_IMPORT_STAGE_SQL)
+    await conn.copy_records_to_table("users_import_stage", records=rows, columns=USER_IMPORT_COLUMNS)
+    queries = get_query_registry()
+    with queries.timed("import_users_from_stage"):
+        status = await conn.execute(queries.sql("import_users_from_stage"))
+    # status is "INSERT 0 <n>": one prefs row per newly created user
+    return int(status.rsplit(" ", 1)[-1])
+
+PREF_FIELDS = ("diet_type", "allergies", "dislikes")
+
+
+def _patch_params(add: dict | None, remove: dict | None) -> dict[str, list[str]]:
+    """Flatten add/remove dicts into the add_<field>/remove_<field> array binds; unknown fields are ignored."""
+    params: dict[str, list[str]] = {}
+    for field in PREF_FIELDS:
+        params[f"add_{field}"] = list((add or {}).get(field) or [])
+        params[f"remove_{field}"] = list((remove or {}).get(field) or [])
+    return params
+
+
 class UserRepository:
     def __init__(self, db: AsyncSession):
         self.db = db
 
     async def create_user_with_prefs(self, email, password, diet_type, allergies, dislikes):
-        user_sql = load_query("insert_user.sql")
-        pref_sql = load_query("insert_user_prefs.sql")
+        queries = get_query_registry()
+        # bcrypt runs in the process pool, before the transaction opens
+        password_hash = await hash_password(password)
 
         async with self.db.begin():
-            user_result = await self.db.execute(
-                text(user_sql),
-                {"email": email, "password_hash": bcrypt.hash(password)},
+            user_result = await queries.execute(
+                self.db,
+                "insert_user",
+                {"email": email, "password_hash": password_hash},
             )
             user = user_result.mappings().first()
             user_id = user["user_id"]
 
-            # param needs to be bound with correct type for ARRAY
-            await self.db.execute(
-                text(pref_sql).bindparams(
-                    bindparam("diet_type", type_=ARRAY(String)),
-                    bindparam("allergies", type_=ARRAY(String)),
-                    bindparam("dislikes", type_=ARRAY(String)),
-                ),
+            # array params are cast to TEXT[] inside insert_user_prefs.sql
+            await queries.execute(
+                self.db,
+                "insert_user_prefs",
                 {
                     "user_id": user_id,
                     "diet_type": diet_type,
@@ -41,15 +96,36 @@ class UserRepository:
         return user
 
     async def get_user_prefs(self, user_id: int):
-        sql = load_query("select_user_prefs.sql")
-        result = await self.db.execute(text(sql), {"user_id": user_id})
+        result = await get_query_registry().execute(self.db, "select_user_prefs", {"user_id": user_id})
         return result.mappings().first()
 
-    async def list_users(self):
-        sql = load_query("select_users.sql")
-        result = await self.db.execute(text(sql))
+    async def list_users(
+        self,
+        limit: int = 100,
+        after_created_at: Optional[datetime] = None,
+        after_user_id: Optional[int] = None,
+    ):
+        result = await get_query_registry().execute(
+            self.db,
+            "select_users",
+            {
+                "after_created_at": after_created_at or datetime.max,
+                "after_user_id": after_user_id if after_user_id is not None else 2**31 - 1,
+                "limit": limit,
+            },
+        )
         return result.mappings().all()
 
+    async def get_user_by_email(self, email: str):
+        result = await get_query_registry().execute(self.db, "select_user_by_email", {"email": email})
+        return result.mappings().first()
+
+    async def iter_user_export(self, chunk_size: int = 1000) -> AsyncIterator[Sequence[Any]]:
+        """Yield users with prefs in chunks of `chunk_size` from a server-side cursor."""
+        result = await get_query_registry().stream(self.db, "export_users", chunk_size=chunk_size)
+        async for chunk in result.mappings().partitions(chunk_size):
+            yield chunk
+
     # todo: delete later if not used
     async def update_prefs(self, user_id: int, diet_type=None, allergies=None, dislikes=None):
         # Build dynamic update set clauses
@@ -91,17 +167,7 @@ class UserRepository:
 
 
     async def replace_user_prefs(self, user_id: int, diet_type, allergies, dislikes):
-        sql = """
-        UPDATE user_prefs
-        SET 
-            diet_type = CAST(:diet_type AS TEXT[]),
-            allergies = CAST(:allergies AS TEXT[]),
-            dislikes = CAST(:dislikes AS TEXT[]),
-            updated_at = CURRENT_TIMESTAMP
-        WHERE user_id = :user_id
-        RETURNING *;
-        """
-        result = await self.db.execute(text(sql), {
+        result = await get_query_registry().execute(self.db, "replace_user_prefs", {
             "user_id": user_id,
             "diet_type": diet_type or [],
             "allergies": allergies or [],
@@ -111,47 +177,29 @@ class UserRepository:
         return result.mappings().first()
 
     async def patch_user_prefs(self, user_id: int, add: dict | None = None, remove: dict | None = None):
-        # First fetch current prefs
-        result = await self.db.execute(text("SELECT * FROM user_prefs WHERE user_id = :user_id"), {"user_id": user_id})
-        current = result.mappings().first()
-        if not current:
+        result = await get_query_registry().execute(
+            self.db,
+            "patch_user_prefs",
+            {**_patch_params(add, remove), "user_id": user_id},
+        )
+        updated = result.mappings().first()
+        if not updated:
             raise HTTPException(status_code=404, detail="User not found")
-
-        def modify(field, current_list):
-            current_set = set(current_list or [])
-            if add and field in add:
-                current_set |= set(add[field])
-            if remove and field in remove:
-                current_set -= set(remove[field])
-            return list(current_set)
-
-        updated = {
-            "diet_type": modify("diet_type", current["diet_type"]),
-            "allergies": modify("allergies", current["allergies"]),
-            "dislikes": modify("dislikes", current["dislikes"]),
-        }
-
-        sql = """
-        UPDATE user_prefs
-        SET 
-            diet_type = CAST(:diet_type AS TEXT[]),
-            allergies = CAST(:allergies AS TEXT[]),
-            dislikes = CAST(:dislikes AS TEXT[]),
-            updated_at = CURRENT_TIMESTAMP
-        WHERE user_id = :user_id
-        RETURNING *;
-        """
-        result = await self.db.execute(text(sql), {**updated, "user_id": user_id})
         await self.db.commit()
-        return result.mappings().first()
+        return updated
+
+    async def patch_user_prefs_batch(self, user_ids: list[int], add: dict | None = None, remove: dict | None = None):
+        """Apply one add/remove patch to many users in a single statement; returns the updated ids."""
+        result = await get_query_registry().execute(
+            self.db,
+            "patch_user_prefs_batch",
+            {**_patch_params(add, remove), "user_ids": user_ids},
+        )
+        updated = sorted({row[0] for row in result.all()})
+        await self.db.commit()
+        return updated
 
     async def clear_user_prefs(self, user_id: int):
-        sql = """
-        UPDATE user_prefs
-        SET diet_type = '{}', allergies = '{}', dislikes = '{}', updated_at = CURRENT_TIMESTAMP
-        WHERE user_id = :user_id
-        RETURNING *;
-        """
-        result = await self.db.execute(text(sql), {"user_id": user_id})
+        result = await get_query_registry().execute(self.db, "clear_user_prefs", {"user_id": user_id})
         await self.db.commit()
         return result.mappings().first()
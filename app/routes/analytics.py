@@ -0,0 +1,70 @@
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query, status
+from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import get_db
+from app.repositories.analytics_repo import AnalyticsRepository
+from app.services.analytics import get_analytics_buffer
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+class AnalyticsEventRequest(BaseModel):
+    event_type: str = Field(..., min_length=1, max_length=50, description="e.g. search, view, click")
+    user_id: int | None = None
+    details: dict[str, Any] | None = None
+
+
+class AnalyticsBatchRequest(BaseModel):
+    events: list[AnalyticsEventRequest] = Field(..., max_length=1000)
+
+
+# Fire-and-forget: events are buffered in-process and written in batches by the flusher.
+@router.post("/events", status_code=status.HTTP_202_ACCEPTED)
+async def track_events(data: AnalyticsBatchRequest):
+    buffer = get_analytics_buffer()
+    accepted = 0
+    overloaded = False
+    for event in data.events:
+        # Wait briefly for room once; if the buffer is still full, drop the rest without waiting.
+        if overloaded:
+            ok = buffer.record(event.event_type, event.user_id, event.details)
+        else:
+            ok = await buffer.record_with_backpressure(event.event_type, event.user_id, event.details)
+            overloaded = not ok
+        accepted += int(ok)
+    return {"accepted": accepted, "dropped": len(data.events) - accepted}
+
+
+@router.get("/ingest-stats")
+async def ingest_stats():
+    return get_analytics_buffer().stats()
+
+
+# Dashboard reads come from the rollup tables, so cost is independent of the event history size.
+@router.get("/user-stats")
+async def user_stats(
+    limit: int = Query(50, ge=1, le=500),
+    after_last_activity: datetime | None = Query(None, description="last_activity of the previous page's last row"),
+    after_user_id: int | None = Query(None, description="user_id of the previous page's last row"),
+    db: AsyncSession = Depends(get_db),
+):
+    repo = AnalyticsRepository(db)
+    rows = await repo.get_user_stats(limit, after_last_activity, after_user_id)
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = {"after_last_activity": last["last_activity"], "after_user_id": last["user_id"]}
+    return {"data": rows, "next": next_cursor}
+
+
+@router.get("/daily")
+async def daily_activity(
+    days: int = Query(30, ge=1, le=366),
+    db: AsyncSession = Depends(get_db),
+):
+    repo = AnalyticsRepository(db)
+    return {"data": await repo.get_daily_activity(days)}
@@ -0,0 +1,21 @@
+from typing import Literal
+
+from fastapi import APIRouter, HTTPException, Query
+
+from app.services.autocomplete import MAX_LIMIT, get_autocomplete
+
+router = APIRouter(prefix="/autocomplete", tags=["Autocomplete"])
+
+
+# Served from the in-memory index only; no database round-trip per keystroke.
+@router.get("")
+async def autocomplete(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix typed so far"),
+    kind: Literal["all", "ingredient", "cuisine", "dietary", "allergen", "flavour", "technique", "query"] = "all",
+    limit: int = Query(10, ge=1, le=MAX_LIMIT),
+):
+    service = get_autocomplete()
+    if not service.ready:
+        raise HTTPException(status_code=503, detail="Autocomplete index is not ready.")
+    suggestions = service.complete(q, kind, limit)
+    return {"data": [s._asdict() for s in suggestions]}
@@ -0,0 +1,32 @@
+import secrets
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.core.config import settings
+from app.core.profiling import get_request_profiler
+
+router = APIRouter(prefix="/debug", tags=["Debug"], include_in_schema=False)
+
+
+def require_profiling_token(x_profile_token: str | None = Header(None)) -> None:
+    # Without a configured token the debug routes do not exist.
+    if not settings.PROFILING_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_profile_token or not secrets.compare_digest(x_profile_token, settings.PROFILING_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid profiling token.")
+
+
+@router.get("/profiles", dependencies=[Depends(require_profiling_token)])
+async def list_profiles():
+    profiles = get_request_profiler().profiles
+    return {"data": [profile.summary() for profile in reversed(profiles)]}
+
+
+# Collapsed stacks: pipe into flamegraph.pl or load into speedscope.app.
+@router.get("/profiles/{profile_id}", dependencies=[Depends(require_profiling_token)])
+async def get_profile(profile_id: str):
+    collapsed = get_request_profiler().get(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profile not found.")
+    return PlainTextResponse(collapsed)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Request, Response, status
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+
+@router.get("/live")
+async def live():
+    return {"status": "alive"}
+
+
+# Ready only after pools are open and the embedding model is warm (see app.core.lifecycle).
+@router.get("/ready")
+async def ready(request: Request, response: Response):
+    state = request.app.state
+    is_ready = getattr(state, "ready", False)
+    if not is_ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {"ready": is_ready, "warmup_seconds": getattr(state, "warmup", {})}
@@ -4,6 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.db import get_db
 from app.core.mongo import get_mongo_db
 from app.core.qdrant import get_qdrant_client
+from app.repositories.recipe_repo import RecipeRepository
+from app.services.analytics import get_analytics_buffer
 from app.services.recommendations import RecommendationService
 
 router = APIRouter(prefix="/recipes", tags=["Recipes"])
@@ -25,7 +27,7 @@ async def get_recommended_recipes(
 @router.get("/search")
 async def search_recipes(
     user_id: int = Query(..., description="Authenticated user id"),
-    query: str = Query(..., min_length=2, description="Free-text query"),
+    query: str = Query(..., min_length=2, max_length=200, description="Free-text query"),
     limit: int = Query(12, ge=1, le=50),
     db: AsyncSession = Depends(get_db),
     mongo_db=Depends(get_mongo_db),
@@ -37,4 +39,30 @@ async def search_recipes(
         query_text=query,
         limit=limit,
     )
+    get_analytics_buffer().record(
+        "search",
+        user_id=user_id,
+        details={"query": query, "results": len(items)},
+    )
     return {"data": items}
+
+
+@router.get("/facets")
+async def get_recipe_facets(
+    user_id: int = Query(..., description="Authenticated user id"),
+    db: AsyncSession = Depends(get_db),
+    mongo_db=Depends(get_mongo_db),
+    qdrant_client=Depends(get_qdrant_client),
+):
+    service = RecommendationService(db, mongo_db, qdrant_client)
+    return {"data": await service.get_facet_counts(user_id)}
+
+
+@router.get("/top-by-cuisine")
+async def get_top_recipes_by_cuisine(
+    cuisine: str = Query(..., min_length=2, description="Cuisine, e.g. italian or middle-eastern"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    repo = RecipeRepository(db)
+    return {"data": await repo.get_top_recipes_by_cuisine(cuisine, limit)}
@@ -1,8 +1,15 @@
-from fastapi import APIRouter, Depends
-from pydantic import BaseModel
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.repositories.user_repo import UserRepository
-from app.core.db import get_db
+from app.core.db import AsyncSessionLocal, get_db
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -28,9 +35,65 @@ async def create_user(data: UserCreateRequest, db: AsyncSession = Depends(get_db
         )
 
 @router.get("/")
-async def list_users(db: AsyncSession = Depends(get_db)):
+async def list_users(
+    limit: int = Query(100, ge=1, le=1000),
+    after_created_at: datetime | None = Query(None, description="created_at of the previous page's last row"),
+    after_user_id: int | None = Query(None, description="user_id of the previous page's last row"),
+    email: str | None = Query(None, description="Exact email lookup instead of a page"),
+    db: AsyncSession = Depends(get_db),
+):
     repo = UserRepository(db)
-    return await repo.list_users()
+    if email is not None:
+        user = await repo.get_user_by_email(email.strip())
+        return {"data": [user] if user else [], "next": None}
+
+    rows = await repo.list_users(limit, after_created_at, after_user_id)
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = {"after_created_at": last["created_at"], "after_user_id": last["user_id"]}
+    return {"data": rows, "next": next_cursor}
+
+
+EXPORT_FIELDS = ("user_id", "email", "created_at", "diet_type", "allergies", "dislikes")
+
+
+async def _export_chunks(fmt: str, chunk_size: int) -> AsyncIterator[str]:
+    # The request-scoped session is closed before a streaming body is sent,
+    # so the export owns its session (and server-side cursor) for the whole stream.
+    async with AsyncSessionLocal() as session:
+        repo = UserRepository(session)
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_FIELDS)
+            yield buffer.getvalue()
+        async for chunk in repo.iter_user_export(chunk_size):
+            if fmt == "csv":
+                buffer.seek(0)
+                buffer.truncate()
+                for row in chunk:
+                    # list fields use the same "|" separator the bulk importer reads
+                    writer.writerow(
+                        "|".join(row[f] or []) if f in ("diet_type", "allergies", "dislikes") else row[f]
+                        for f in EXPORT_FIELDS
+                    )
+                yield buffer.getvalue()
+            else:
+                yield "".join(json.dumps(dict(row), default=str) + "\n" for row in chunk)
+
+
+@router.get("/export")
+async def export_users(
+    format: Literal["ndjson", "csv"] = Query("ndjson"),
+    chunk_size: int = Query(1000, ge=100, le=10_000),
+):
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _export_chunks(format, chunk_size),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'},
+    )
 
 @router.get("/{user_id}/prefs")
 async def get_user_prefs(user_id: int, db: AsyncSession = Depends(get_db)):
@@ -78,6 +141,21 @@ async def patch_user_prefs(user_id: int, data: UserPrefsPatchRequest, db: AsyncS
         remove=data.remove,
     )
 
+class UserPrefsBatchPatchRequest(UserPrefsPatchRequest):
+    user_ids: list[int] = Field(..., min_length=1, max_length=50_000)
+
+# PATCH (batch) — same add/remove patch for many users in one statement
+@router.patch("/prefs/batch")
+async def patch_user_prefs_batch(data: UserPrefsBatchPatchRequest, db: AsyncSession = Depends(get_db)):
+    repo = UserRepository(db)
+    updated = await repo.patch_user_prefs_batch(
+        user_ids=data.user_ids,
+        add=data.add,
+        remove=data.remove,
+    )
+    missing = sorted(set(data.user_ids) - set(updated))
+    return {"updated": len(updated), "missing": missing}
+
 # 4️⃣ DELETE — Clear all preferences
 @router.delete("/{user_id}/prefs")
 async def clear_user_prefs(user_id: int, db: AsyncSession = Depends(get_db)):
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.core.db import raw_connection
+from app.core.metrics import gauge
+from app.repositories.analytics_repo import AnalyticsEvent, copy_events, update_rollups
+from app.repositories.taste_repo import apply_taste_increments
+from app.services.taste import taste_increments
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyticsBuffer:
+    """
+    Bounded in-process buffer for analytics events.
+
+    Request handlers call `record` (never blocks, drops when full) or
+    `record_with_backpressure` (waits briefly for room). A background task
+    drains the buffer in batches whenever `flush_batch` events are pending or
+    `flush_interval` seconds have passed, writes each batch with COPY and folds
+    it into the activity rollups and user taste vectors in the same transaction.
+    """
+
+    def __init__(
+        self,
+        max_size: int = settings.ANALYTICS_BUFFER_SIZE,
+        flush_batch: int = settings.ANALYTICS_FLUSH_BATCH,
+        flush_interval: float = settings.ANALYTICS_FLUSH_INTERVAL_S,
+    ) -> None:
+        self.flush_batch = flush_batch
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[AnalyticsEvent] = asyncio.Queue(maxsize=max_size)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.accepted = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+
+    # ----- producer side -----
+    def record(
+        self,
+        event_type: str,
+        user_id: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Enqueue an event without waiting. Returns False if it was dropped."""
+        try:
+            self._queue.put_nowait(self._make_event(event_type, user_id, details))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self._accepted()
+        return True
+
+    async def record_with_backpressure(
+        self,
+        event_type: str,
+        user_id: Optional[int] = None,
+        details: Optional[Dict[str, Any]] = None,
+        timeout: float = settings.ANALYTICS_ENQUEUE_TIMEOUT_S,
+    ) -> bool:
+        """Enqueue an event, waiting up to `timeout` seconds for buffer space."""
+        event = self._make_event(event_type, user_id, details)
+        try:
+            await asyncio.wait_for(self._queue.put(event), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            return False
+        self._accepted()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": self._queue.qsize(),
+            "capacity": self._queue.maxsize,
+            "accepted": self.accepted,
+            "dropped": self.dropped,
+            "written": self.written,
+            "failed": self.failed,
+            "flushes": self.flushes,
+        }
+
+    # ----- lifecycle -----
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._task = asyncio.create_task(self._run(), name="analytics-flusher")
+
+    async def stop(self) -> None:
+        """Stop the background task after it has flushed everything still buffered."""
+        self._closing = True
+        self._wakeup.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        await self._drain()
+
+    # ----- consumer side -----
+    async def _run(self) -> None:
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self._drain()
+
+    async def _drain(self) -> None:
+        while not self._queue.empty():
+            batch = self._take_batch()
+            await self._flush(batch)
+
+    def _take_batch(self) -> List[AnalyticsEvent]:
+        batch: List[AnalyticsEvent] = []
+        while len(batch) < self.flush_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _flush(self, batch: List[AnalyticsEvent]) -> None:
+        if not batch:
+            return
+        try:
+            # Fetched before the transaction so no connection is held during the Qdrant call.
+            increments = await taste_increments(batch)
+        except Exception:  # pragma: no cover - vector store errors surface at runtime
+            # Taste vectors are best-effort too: the events are still written.
+            increments = []
+            logger.exception("Failed to compute taste increments for %d analytics events", len(batch))
+        try:
+            async with raw_connection() as conn:
+                async with conn.transaction():
+                    await copy_events(conn, batch)
+                    await update_rollups(conn)
+                    await apply_taste_increments(conn, increments)
+        except Exception:  # pragma: no cover - database errors surface at runtime
+            # Analytics is best-effort: count the loss and keep the flusher alive.
+            self.failed += len(batch)
+            logger.exception("Failed to flush %d analytics events", len(batch))
+            return
+        self.written += len(batch)
+        self.flushes += 1
+
+    def _accepted(self) -> None:
+        self.accepted += 1
+        if self._queue.qsize() >= self.flush_batch:
+            self._wakeup.set()
+
+    @staticmethod
+    def _make_event(
+        event_type: str,
+        user_id: Optional[int],
+        details: Optional[Dict[str, Any]],
+    ) -> AnalyticsEvent:
+        created_at = datetime.now(timezone.utc).replace(tzinfo=None)
+        return AnalyticsEvent(user_id, event_type[:50], details, created_at)
+
+
+@lru_cache(maxsize=1)
+def get_analytics_buffer() -> AnalyticsBuffer:
+    """Return the process-wide analytics buffer."""
+    return AnalyticsBuffer()
+
+
+gauge(
+    "analytics_buffer",
+    "Analytics buffer depth and lifetime event counts (pending, capacity, accepted, dropped, ...).",
+    lambda: {(name,): value for name, value in get_analytics_buffer().stats().items()},
+    ("stat",),
+)
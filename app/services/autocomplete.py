@@ -0,0 +1,210 @@
+"""
+In-memory autocomplete over ingredients, cuisines, tag vocabularies and popular searches.
+
+Every suggestion is indexed under the start of each of its words ("chicken-breast"
+matches both "chi" and "bre"). The keys sit in one sorted list: a prefix lookup is a
+`bisect` range, and the best matches in it are picked by weight. For one- and
+two-character prefixes, where that range is large, the top results are precomputed
+at build time. Each list also holds parallel arrays of entry ids, and there is one
+index per kind plus one over all kinds.
+
+Weights are counts, scaled per kind so each kind's top entry weighs 1.0: recipes per
+ingredient / cuisine / tag, and distinct searching users per query over the last
+AUTOCOMPLETE_QUERY_DAYS days. A rebuild runs every AUTOCOMPLETE_REFRESH_INTERVAL_S.
+It reads everything first, builds off the event loop, then swaps the finished index
+in with one assignment, so requests never wait on it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.db import AsyncSessionLocal
+from app.core.metrics import gauge
+from app.core.mongo import get_mongo_database
+from app.core.vocabularies import TAG_VOCABULARIES
+from app.repositories.analytics_repo import AnalyticsRepository
+
+logger = logging.getLogger(__name__)
+
+KINDS = ("ingredient", "cuisine", "dietary", "allergen", "flavour", "technique", "query")
+# recipe field -> suggestion kind
+FIELD_KINDS = {
+    "ingredient_tags": "ingredient",
+    "cuisine": "cuisine",
+    "dietary_tags": "dietary",
+    "allergen_tags": "allergen",
+    "flavour_tags": "flavour",
+    "technique_tags": "technique",
+}
+PRECOMPUTED_PREFIX_LEN = 2
+MAX_LIMIT = 20
+
+_SEPARATORS = re.compile(r"[\s\-_/]+")
+
+
+class Suggestion(NamedTuple):
+    text: str
+    kind: str
+    weight: float
+
+
+def normalize(text: str) -> str:
+    """Lowercase, with '-', '_', '/' and runs of whitespace collapsed to one space."""
+    return _SEPARATORS.sub(" ", text.lower()).strip()
+
+
+class PrefixIndex:
+    def __init__(self, entries: Sequence[Suggestion]) -> None:
+        self.entries = list(entries)
+        keyed: List[Tuple[str, int]] = []
+        for entry_id, entry in enumerate(self.entries):
+            words = normalize(entry.text).split(" ")
+            # one key per word start: "chicken breast", "breast"
+            for i in range(len(words)):
+                keyed.append((" ".join(words[i:]), entry_id))
+        keyed.sort()
+        self.keys: List[str] = [key for key, _ in keyed]
+        self.entry_ids = array("I", (entry_id for _, entry_id in keyed))
+        self.top_by_prefix = self._precompute()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _precompute(self) -> Dict[str, List[int]]:
+        candidates: Dict[str, set] = defaultdict(set)
+        for key, entry_id in zip(self.keys, self.entry_ids):
+            for n in range(PRECOMPUTED_PREFIX_LEN + 1):
+                candidates[key[:n]].add(entry_id)
+        return {prefix: self._best(ids, MAX_LIMIT) for prefix, ids in candidates.items()}
+
+    def _best(self, entry_ids: Iterable[int], limit: int) -> List[int]:
+        return heapq.nlargest(limit, set(entry_ids), key=lambda i: (self.entries[i].weight, -i))
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Suggestion]:
+        prefix = normalize(prefix)
+        if len(prefix) <= PRECOMPUTED_PREFIX_LEN:
+            ids = self.top_by_prefix.get(prefix, [])[:limit]
+        else:
+            lo = bisect_left(self.keys, prefix)
+            hi = bisect_left(self.keys, prefix + "\uffff", lo)
+            ids = self._best(self.entry_ids[lo:hi], limit)
+        return [self.entries[i] for i in ids]
+
+
+def _scaled(kind: str, counts: Iterable[Tuple[str, int]]) -> List[Suggestion]:
+    counts = [(text, n) for text, n in counts if isinstance(text, str) and text.strip()]
+    top = max((n for _, n in counts), default=1) or 1
+    return [Suggestion(text, kind, n / top) for text, n in counts]
+
+
+def build_indexes(entries: Sequence[Suggestion]) -> Dict[str, PrefixIndex]:
+    """One index over everything ("all") and one per kind (CPU-bound; run off the event loop)."""
+    by_kind: Dict[str, List[Suggestion]] = defaultdict(list)
+    for entry in entries:
+        by_kind[entry.kind].append(entry)
+    indexes = {kind: PrefixIndex(items) for kind, items in by_kind.items()}
+    indexes["all"] = PrefixIndex(entries)
+    return indexes
+
+
+async def _field_counts(field: str) -> List[Tuple[str, int]]:
+    pipeline: List[dict] = []
+    if field.endswith("_tags"):
+        pipeline.append({"$unwind": f"${field}"})
+    pipeline += [
+        {"$match": {field: {"$type": "string"}}},
+        {"$group": {"_id": f"${field}", "n": {"$sum": 1}}},
+    ]
+    cursor = get_mongo_database().recipes.aggregate(pipeline, allowDiskUse=True)
+    return [(doc["_id"], doc["n"]) async for doc in cursor]
+
+
+async def _popular_queries() -> List[Tuple[str, int]]:
+    async with AsyncSessionLocal() as session:
+        rows = await AnalyticsRepository(session).get_popular_searches(
+            days=settings.AUTOCOMPLETE_QUERY_DAYS,
+            min_count=settings.AUTOCOMPLETE_MIN_QUERY_COUNT,
+            limit=settings.AUTOCOMPLETE_MAX_QUERIES,
+        )
+    return [(row["query"], row["searches"]) for row in rows]
+
+
+async def load_suggestions() -> List[Suggestion]:
+    fields = list(FIELD_KINDS)
+    *field_counts, queries = await asyncio.gather(*(_field_counts(f) for f in fields), _popular_queries())
+    entries: List[Suggestion] = []
+    for field, counts in zip(fields, field_counts):
+        # vocabulary values no recipe uses yet are still valid preference values
+        seen = {text for text, _ in counts}
+        counts += [(tag, 0) for tag in TAG_VOCABULARIES.get(field, ()) if tag not in seen]
+        entries += _scaled(FIELD_KINDS[field], counts)
+    entries += _scaled("query", queries)
+    return entries
+
+
+class Autocomplete:
+    """Holds the current indexes and rebuilds them in the background."""
+
+    def __init__(self) -> None:
+        self.indexes: Dict[str, PrefixIndex] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.indexes)
+
+    def complete(self, prefix: str, kind: str = "all", limit: int = 10) -> List[Suggestion]:
+        index = self.indexes.get(kind)
+        return index.complete(prefix, min(limit, MAX_LIMIT)) if index else []
+
+    async def rebuild(self) -> None:
+        entries = await load_suggestions()
+        indexes = await asyncio.to_thread(build_indexes, entries)
+        self.indexes = indexes
+        logger.info("Built autocomplete index with %d suggestions", len(entries))
+
+    # ----- lifecycle -----
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="autocomplete-rebuild")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.AUTOCOMPLETE_REFRESH_INTERVAL_S)
+            try:
+                await self.rebuild()
+            except Exception:  # pragma: no cover - store errors surface at runtime
+                # Keep serving the previous index; the next tick retries.
+                logger.exception("Autocomplete rebuild failed")
+
+
+@lru_cache(maxsize=1)
+def get_autocomplete() -> Autocomplete:
+    return Autocomplete()
+
+
+gauge(
+    "autocomplete_suggestions",
+    "Suggestions in the autocomplete index by kind.",
+    lambda: {(kind,): len(index) for kind, index in get_autocomplete().indexes.items() if kind != "all"},
+    label_names=("kind",),
+)
@@ -0,0 +1,373 @@
+"""
+Single-pass catalog loader: one read of the recipe JSONL feeds Mongo, Qdrant and Postgres.
+
+Each line is parsed once (extended JSON, as mongoimport reads it) and checked with
+`validate_recipe`. Invalid documents go to a rejects file instead of any sink.
+Valid ones get a deterministic `_id`: an existing `_id` is kept, otherwise it is
+derived from (slug, source_url). Before a batch reaches any sink, Mongo is asked
+for recipes that already hold those `_id`s or (slug, source_url) keys: a derived
+`_id` gives way to the stored one (e.g. a random `_id` from mongoimport), a
+conflicting explicit `_id` sends the document to the rejects file, and the
+stored `created_at` is kept. Re-running a file, edited or not, therefore
+replaces the same documents, points and rows in all three stores. Batches are
+then fanned out to one worker per sink, each with its own bounded queue:
+  * mongo:    unordered `bulk_write` of `ReplaceOne(upsert=True)` by `_id`
+  * qdrant:   embeds title + steps / ingredient tags and upserts the points
+              (same ids and payload as app.core.catalog)
+  * postgres: COPY + merge into `recipe_metadata`
+A sink prepares batch N+1 (e.g. embeds it) while batch N is being written. Failed
+writes are retried with exponential backoff. After every write the sink's last
+loaded line is saved to the checkpoint file, so a re-run resumes each sink
+where it stopped. The slowest sink sets the pace through the queues.
+
+Run: python -m app.services.catalog_loader --jsonl mongoDB/init/03_recipe_csv_sample.jsonl
+     [--sinks mongo,qdrant,postgres] [--batch-size 512] [--checkpoint .catalog_load.json] [--restart]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, TextIO
+
+from bson import json_util
+from pymongo import ReplaceOne
+from qdrant_client.models import Distance, PayloadSchemaType, VectorParams
+
+from app.core.catalog import ING_VECTOR_NAME, TEXT_VECTOR_NAME, build_points, embed_documents, recipe_id
+from app.core.config import settings
+from app.core.db import engine, raw_connection
+from app.core.embeddings import get_embedding_model
+from app.core.mongo import get_mongo_database
+from app.core.qdrant import get_qdrant_client
+from app.core.vocabularies import validate_recipe
+from app.repositories.recipe_repo import to_metadata_row, upsert_recipe_metadata
+
+logger = logging.getLogger(__name__)
+
+SINK_NAMES = ("mongo", "qdrant", "postgres")
+PROGRESS_EVERY_S = 10.0
+
+
+class Batch(NamedTuple):
+    last_line: int
+    docs: List[Dict[str, Any]]
+    lines: List[int]
+
+
+def write_reject(rejects: Optional[TextIO], line_no: int, slug: Any, problems: List[str]) -> None:
+    if rejects is not None:
+        rejects.write(json.dumps({"line": line_no, "slug": slug, "problems": problems}, default=str) + "\n")
+
+
+def read_batches(
+    path: Path,
+    batch_size: int,
+    skip_lines: int,
+    rejects: Optional[TextIO],
+    stats: Dict[str, int],
+) -> Iterator[Batch]:
+    """Parse and validate the JSONL after `skip_lines`; yields batches of valid documents."""
+    docs: List[Dict[str, Any]] = []
+    lines: List[int] = []
+    line_no = 0
+    with path.open("r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if line_no <= skip_lines or not line.strip():
+                continue
+            try:
+                doc = json_util.loads(line)
+                problems = validate_recipe(doc) if isinstance(doc, dict) else ["not a JSON object"]
+            except ValueError as exc:
+                doc, problems = {}, [f"invalid JSON: {exc}"]
+            if problems:
+                stats["rejected"] += 1
+                write_reject(rejects, line_no, doc.get("slug") if isinstance(doc, dict) else None, problems)
+                continue
+            doc.setdefault("_id", recipe_id(doc, line_no))
+            docs.append(doc)
+            lines.append(line_no)
+            stats["valid"] += 1
+            if len(docs) >= batch_size:
+                yield Batch(line_no, docs, lines)
+                docs, lines = [], []
+    if docs or line_no > skip_lines:
+        # An empty final batch still advances the checkpoints past trailing rejects.
+        yield Batch(line_no, docs, lines)
+
+
+async def match_stored(batch: Batch, rejects: Optional[TextIO], stats: Dict[str, int]) -> Batch:
+    """Line the batch up with the recipes Mongo already holds, so every sink writes the same `_id`."""
+    if not batch.docs:
+        return batch
+    keyed = [doc for doc in batch.docs if doc.get("slug")]
+    query = {
+        "$or": [
+            {"_id": {"$in": [doc["_id"] for doc in batch.docs]}},
+            *({"slug": doc["slug"], "source_url": doc.get("source_url")} for doc in keyed),
+        ]
+    }
+    cursor = get_mongo_database().recipes.find(query, {"slug": 1, "source_url": 1, "created_at": 1})
+    by_id = {stored["_id"]: stored async for stored in cursor}
+    by_key = {(stored.get("slug"), stored.get("source_url")): stored for stored in by_id.values() if stored.get("slug")}
+
+    now = datetime.now(timezone.utc)
+    docs, lines = [], []
+    for doc, line_no in zip(batch.docs, batch.lines):
+        holder = by_key.get((doc["slug"], doc.get("source_url"))) if doc.get("slug") else None
+        if holder is not None and holder["_id"] != doc["_id"]:
+            if doc["_id"] != recipe_id(doc, line_no):
+                stats["valid"] -= 1
+                stats["rejected"] += 1
+                problem = f"_id {doc['_id']} conflicts with stored recipe {holder['_id']} on (slug, source_url)"
+                write_reject(rejects, line_no, doc["slug"], [problem])
+                continue
+            doc["_id"] = holder["_id"]
+        stored = by_id.get(doc["_id"])
+        if stored is not None and stored.get("created_at") is not None:
+            doc["created_at"] = stored["created_at"]
+        else:
+            doc.setdefault("created_at", now)
+        docs.append(doc)
+        lines.append(line_no)
+    return Batch(batch.last_line, docs, lines)
+
+
+class Checkpoint:
+    """Last loaded line per sink, saved as JSON next to the run; tied to the input file's size and mtime."""
+
+    def __init__(self, path: Path, source: Path) -> None:
+        self.path = path
+        stat = source.stat()
+        self.source = {"path": str(source.resolve()), "size": stat.st_size, "mtime": stat.st_mtime}
+        self.lines: Dict[str, int] = {}
+        if path.exists():
+            saved = json.loads(path.read_text(encoding="utf-8"))
+            if saved.get("source") == self.source:
+                self.lines = saved.get("lines", {})
+            else:
+                logger.warning("Checkpoint %s is for another input file; starting over", path)
+
+    def line(self, sink: str) -> int:
+        return self.lines.get(sink, 0)
+
+    def mark(self, sink: str, line: int) -> None:
+        self.lines[sink] = max(line, self.line(sink))
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps({"source": self.source, "lines": self.lines}), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+class Sink:
+    """One load target: `prepare` builds a batch's payload, `write` sends it (retried)."""
+
+    name = ""
+
+    def __init__(self, retries: int, retry_delay_s: float) -> None:
+        self.retries = retries
+        self.retry_delay_s = retry_delay_s
+        self.written = 0
+        self.started = time.perf_counter()
+        self._logged_at = time.monotonic()
+
+    async def setup(self) -> None:
+        pass
+
+    async def prepare(self, docs: List[Dict[str, Any]]) -> Any:
+        return docs
+
+    async def write(self, prepared: Any) -> int:
+        raise NotImplementedError
+
+    async def with_retries(self, call: Callable[[], Awaitable[int]]) -> int:
+        for attempt in range(1, self.retries):
+            try:
+                return await call()
+            except Exception as exc:
+                delay = self.retry_delay_s * 2 ** (attempt - 1)
+                logger.warning("%s: write failed (%s), retry %d/%d in %.1fs", self.name, exc, attempt, self.retries - 1, delay)
+                await asyncio.sleep(delay)
+        return await call()
+
+    def progress(self, line: int, final: bool = False) -> None:
+        if final or time.monotonic() - self._logged_at >= PROGRESS_EVERY_S:
+            rate = self.written / max(time.perf_counter() - self.started, 1e-9)
+            logger.info("%s: %d documents written (%.0f/s), through line %d", self.name, self.written, rate, line)
+            self._logged_at = time.monotonic()
+
+
+class MongoSink(Sink):
+    name = "mongo"
+
+    async def write(self, docs: List[Dict[str, Any]]) -> int:
+        if not docs:
+            return 0
+        # Stamped right before the write, never taken from the file: the tag index refreshes
+        # by `updated_at > watermark`, so an older value would hide the document until the
+        # next full rebuild.
+        now = datetime.now(timezone.utc)
+        # `_id`s were matched to the stored recipes (match_stored), so a duplicate key here
+        # means a concurrent writer; it fails the batch instead of leaving the sinks apart.
+        requests = [ReplaceOne({"_id": doc["_id"]}, {**doc, "updated_at": now}, upsert=True) for doc in docs]
+        await get_mongo_database().recipes.bulk_write(requests, ordered=False)
+        return len(docs)
+
+
+class QdrantSink(Sink):
+    name = "qdrant"
+
+    async def setup(self) -> None:
+        client = get_qdrant_client()
+        if not await asyncio.to_thread(client.collection_exists, settings.QDRANT_COLLECTION):
+            dim = get_embedding_model().get_sentence_embedding_dimension()
+            params = VectorParams(size=dim, distance=Distance.COSINE)
+            await asyncio.to_thread(
+                client.create_collection,
+                settings.QDRANT_COLLECTION,
+                vectors_config={TEXT_VECTOR_NAME: params, ING_VECTOR_NAME: params},
+            )
+        await asyncio.to_thread(
+            client.create_payload_index, settings.QDRANT_COLLECTION, "mongo_id", field_schema=PayloadSchemaType.KEYWORD
+        )
+
+    async def prepare(self, docs: List[Dict[str, Any]]) -> Any:
+        with_slug = [doc for doc in docs if (doc.get("slug") or "").strip()]
+        if not with_slug:
+            return []
+        text_vecs, ing_vecs = await asyncio.to_thread(embed_documents, get_embedding_model(), with_slug)
+        return build_points(with_slug, text_vecs, ing_vecs)
+
+    async def write(self, points: List[Any]) -> int:
+        if points:
+            await asyncio.to_thread(get_qdrant_client().upsert, settings.QDRANT_COLLECTION, points, wait=True)
+        return len(points)
+
+
+class PostgresSink(Sink):
+    name = "postgres"
+
+    async def prepare(self, docs: List[Dict[str, Any]]) -> Any:
+        return [to_metadata_row(doc) for doc in docs]
+
+    async def write(self, rows: List[Any]) -> int:
+        async with raw_connection() as conn:
+            async with conn.transaction():
+                return await upsert_recipe_metadata(conn, rows)
+
+
+SINKS = {sink.name: sink for sink in (MongoSink, QdrantSink, PostgresSink)}
+
+
+async def run_sink(sink: Sink, queue: asyncio.Queue, checkpoint: Checkpoint) -> None:
+    async def commit(prepared: Any, batch: Batch) -> None:
+        sink.written += await sink.with_retries(lambda: sink.write(prepared))
+        checkpoint.mark(sink.name, batch.last_line)
+        sink.progress(batch.last_line)
+
+    pending: Optional[asyncio.Task] = None
+    last_line = checkpoint.line(sink.name)
+    while (batch := await queue.get()) is not None:
+        if batch.last_line <= checkpoint.line(sink.name):
+            continue
+        prepared = await sink.prepare(batch.docs)
+        if pending is not None:
+            await pending
+        pending = asyncio.create_task(commit(prepared, batch))
+        last_line = batch.last_line
+    if pending is not None:
+        await pending
+    sink.progress(last_line, final=True)
+
+
+async def _put(queue: asyncio.Queue, item: Optional[Batch], worker: asyncio.Task) -> None:
+    """queue.put that surfaces the worker's exception instead of blocking forever on a dead worker."""
+    put = asyncio.ensure_future(queue.put(item))
+    await asyncio.wait({put, worker}, return_when=asyncio.FIRST_COMPLETED)
+    if not put.done():
+        put.cancel()
+        worker.result()
+
+
+async def load_catalog(
+    path: Path,
+    sink_names: Sequence[str],
+    checkpoint: Checkpoint,
+    batch_size: int = 512,
+    queue_depth: int = 4,
+    retries: int = 5,
+    retry_delay_s: float = 1.0,
+    rejects_path: Optional[Path] = None,
+) -> Dict[str, int]:
+    """Stream `path` once into the selected sinks. Returns document counts."""
+    sinks = [SINKS[name](retries, retry_delay_s) for name in sink_names]
+    for sink in sinks:
+        await sink.setup()
+    skip = min(checkpoint.line(sink.name) for sink in sinks)
+    if skip:
+        logger.info("Resuming after line %d (%s)", skip, {s.name: checkpoint.line(s.name) for s in sinks})
+
+    queues = {sink.name: asyncio.Queue(maxsize=queue_depth) for sink in sinks}
+    workers = {sink.name: asyncio.create_task(run_sink(sink, queues[sink.name], checkpoint)) for sink in sinks}
+    stats = {"valid": 0, "rejected": 0}
+    rejects = rejects_path.open("a", encoding="utf-8") if rejects_path else None
+    try:
+        batches = read_batches(path, batch_size, skip, rejects, stats)
+        # Parsing runs on a thread so the sinks keep writing meanwhile.
+        while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+            batch = await match_stored(batch, rejects, stats)
+            for name, queue in queues.items():
+                await _put(queue, batch, workers[name])
+        for name, queue in queues.items():
+            await _put(queue, None, workers[name])
+        await asyncio.gather(*workers.values())
+    finally:
+        for worker in workers.values():
+            worker.cancel()
+        if rejects is not None:
+            rejects.close()
+    stats.update({f"{sink.name}_written": sink.written for sink in sinks})
+    return stats
+
+
+async def main(args: argparse.Namespace) -> None:
+    sink_names = [name.strip() for name in args.sinks.split(",") if name.strip()]
+    unknown = set(sink_names) - set(SINK_NAMES)
+    if unknown:
+        raise SystemExit(f"Unknown sinks {sorted(unknown)}; choose from {', '.join(SINK_NAMES)}")
+    if args.restart:
+        args.checkpoint.unlink(missing_ok=True)
+    started = time.perf_counter()
+    try:
+        stats = await load_catalog(
+            args.jsonl,
+            sink_names,
+            Checkpoint(args.checkpoint, args.jsonl),
+            batch_size=args.batch_size,
+            queue_depth=args.queue_depth,
+            retries=args.retries,
+            rejects_path=args.rejects,
+        )
+    finally:
+        await engine.dispose()
+    logger.info("Loaded %s in %.1fs", stats, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jsonl", type=Path, required=True)
+    parser.add_argument("--sinks", default=",".join(SINK_NAMES))
+    parser.add_argument("--batch-size", type=int, default=512)
+    parser.add_argument("--queue-depth", type=int, default=4, help="batches buffered per sink")
+    parser.add_argument("--retries", type=int, default=5)
+    parser.add_argument("--checkpoint", type=Path, default=Path(".catalog_load.json"))
+    parser.add_argument("--rejects", type=Path, default=Path("catalog_rejects.jsonl"))
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and load every sink from the top")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(main(args))
@@ -0,0 +1,271 @@
+"""
+Change-stream sync from Mongo `recipes` into Qdrant and Postgres `recipe_metadata`.
+
+Tails `recipes.watch(full_document="updateLookup")` and processes changes in
+micro-batches. A batch closes at SYNC_BATCH_SIZE changes, after
+SYNC_BATCH_DELAY_S, or as soon as the stream is idle. Only the last change per
+document counts. For each batch:
+  * Qdrant: points whose `input_hash` (title + steps, ingredient tags) is
+    unchanged only get their payload overwritten; the rest are re-embedded and
+    upserted. Points of deleted recipes, and of recipes whose slug (and so point
+    id) changed, are deleted by their `mongo_id` payload. All of this goes in one
+    batch request.
+  * Postgres: `recipe_metadata` upsert + delete in one transaction.
+The resume token is saved to `sync_state` only after both sinks succeed, so a
+restart replays at most the last batch (every write is idempotent). The same
+document holds the lag and throughput numbers: db.sync_state.findOne({_id: "recipes"}).
+
+Dropping or renaming `recipes` (or dropping the database, as rebuild_mongo.sh
+does) invalidates the stream. The worker then saves the invalidate token and
+reopens with `start_after`, so it follows the new collection. Qdrant and
+recipe_metadata still hold the old catalog then and need a backfill with the
+catalog loader.
+
+Change streams need a replica set (a single-node one is fine, see README).
+
+Run: python -m app.services.catalog_sync [--batch-size 256] [--reset]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pymongo.errors import OperationFailure
+from qdrant_client.models import (
+    DeleteOperation,
+    FieldCondition,
+    Filter,
+    FilterSelector,
+    HasIdCondition,
+    MatchAny,
+    OverwritePayloadOperation,
+    PayloadSchemaType,
+    PointsList,
+    SetPayload,
+    UpsertOperation,
+)
+
+from app.core.catalog import build_payload, build_points, embed_documents, input_hash, point_id
+from app.core.config import settings
+from app.core.db import engine, raw_connection
+from app.core.embeddings import get_embedding_model
+from app.core.mongo import get_mongo_database
+from app.core.qdrant import get_qdrant_client
+from app.repositories.recipe_repo import delete_recipe_metadata, to_metadata_row, upsert_recipe_metadata
+
+logger = logging.getLogger(__name__)
+
+STATE_ID = "recipes"
+# drop / rename / dropDatabase are always followed by an `invalidate` that closes the stream
+INVALIDATING = ("drop", "rename", "dropDatabase", "invalidate")
+PIPELINE = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete", *INVALIDATING]}}}]
+# Mongo error code when the resume token has fallen off the oplog
+CHANGE_STREAM_HISTORY_LOST = 286
+
+
+def split_changes(changes: Sequence[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Any]]:
+    """(current documents, deleted ids) from a batch; only the last change per document counts."""
+    latest: Dict[Any, Dict[str, Any]] = {}
+    for change in changes:
+        latest[change["documentKey"]["_id"]] = change
+    upserts, deleted = [], []
+    for doc_id, change in latest.items():
+        # fullDocument is None when an updated document was deleted before the lookup
+        doc = change.get("fullDocument")
+        if change["operationType"] == "delete" or doc is None:
+            deleted.append(doc_id)
+        else:
+            upserts.append(doc)
+    return upserts, deleted
+
+
+class CatalogSync:
+    def __init__(self, batch_size: int, batch_delay_s: float) -> None:
+        self.batch_size = batch_size
+        self.batch_delay_s = batch_delay_s
+        db = get_mongo_database()
+        self.recipes = db.recipes
+        self.state = db.sync_state
+        self.token: Optional[Dict[str, Any]] = None
+        # True when `token` is an invalidate event, which only `start_after` accepts
+        self.start_after = False
+        self._saved_at = 0.0
+
+    # ----- state -----
+    async def load_token(self) -> None:
+        doc = await self.state.find_one({"_id": STATE_ID}, {"resume_token": 1, "start_after": 1}) or {}
+        self.token = doc.get("resume_token")
+        self.start_after = bool(doc.get("start_after"))
+
+    async def save_state(self, stats: Optional[Dict[str, Any]] = None) -> None:
+        update: Dict[str, Any] = {
+            "$set": {"resume_token": self.token, "start_after": self.start_after, "updated_at": datetime.now(timezone.utc)}
+        }
+        if stats:
+            update["$set"].update({key: value for key, value in stats.items() if not key.endswith("_total")})
+            update["$inc"] = {key: value for key, value in stats.items() if key.endswith("_total")}
+        await self.state.update_one({"_id": STATE_ID}, update, upsert=True)
+        self._saved_at = time.monotonic()
+
+    # ----- sinks -----
+    def _sync_qdrant(self, docs: List[Dict[str, Any]], deleted: List[Any]) -> int:
+        """Apply a batch to Qdrant (blocking). Returns how many documents were re-embedded."""
+        client = get_qdrant_client()
+        with_slug = {point_id(doc): doc for doc in docs if (doc.get("slug") or "").strip()}
+        stored = {}
+        if with_slug:
+            points = client.retrieve(
+                settings.QDRANT_COLLECTION, ids=list(with_slug), with_payload=["input_hash"], with_vectors=False
+            )
+            stored = {point.id: (point.payload or {}).get("input_hash") for point in points}
+        changed = [doc for pid, doc in with_slug.items() if stored.get(pid) != input_hash(doc)]
+        unchanged = [(pid, doc) for pid, doc in with_slug.items() if stored.get(pid) == input_hash(doc)]
+
+        operations: List[Any] = []
+        # Drops the points of deleted recipes and any old point of a recipe whose slug changed.
+        mongo_ids = [str(doc["_id"]) for doc in docs] + [str(doc_id) for doc_id in deleted]
+        if mongo_ids:
+            stale = Filter(
+                must=[FieldCondition(key="mongo_id", match=MatchAny(any=mongo_ids))],
+                must_not=[HasIdCondition(has_id=list(with_slug))] if with_slug else None,
+            )
+            operations.append(DeleteOperation(delete=FilterSelector(filter=stale)))
+        if changed:
+            text_vecs, ing_vecs = embed_documents(get_embedding_model(), changed)
+            operations.append(UpsertOperation(upsert=PointsList(points=build_points(changed, text_vecs, ing_vecs))))
+        operations.extend(
+            OverwritePayloadOperation(overwrite_payload=SetPayload(payload=build_payload(doc), points=[pid]))
+            for pid, doc in unchanged
+        )
+        if operations:
+            client.batch_update_points(settings.QDRANT_COLLECTION, operations)
+        return len(changed)
+
+    async def _sync_postgres(self, docs: List[Dict[str, Any]], deleted: List[Any]) -> None:
+        async with raw_connection() as conn:
+            async with conn.transaction():
+                await upsert_recipe_metadata(conn, [to_metadata_row(doc) for doc in docs])
+                await delete_recipe_metadata(conn, [str(doc_id) for doc_id in deleted])
+
+    async def process(self, changes: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply one micro-batch to both sinks; returns the stats saved with the resume token."""
+        started = time.perf_counter()
+        docs, deleted = split_changes(changes)
+        embedded, _ = await asyncio.gather(
+            asyncio.to_thread(self._sync_qdrant, docs, deleted),
+            self._sync_postgres(docs, deleted),
+        )
+        elapsed = time.perf_counter() - started
+        newest = changes[-1]["clusterTime"].as_datetime()
+        lag = (datetime.now(timezone.utc) - newest).total_seconds()
+        logger.info(
+            "Synced %d changes (%d upserted, %d deleted, %d re-embedded) in %.2fs, lag %.1fs",
+            len(changes), len(docs), len(deleted), embedded, elapsed, lag,
+        )
+        return {
+            "lag_seconds": lag,
+            "last_change_at": newest,
+            "last_batch_size": len(changes),
+            "last_batch_seconds": elapsed,
+            "changes_per_second": len(changes) / elapsed if elapsed > 0 else None,
+            "changes_total": len(changes),
+            "upserted_total": len(docs),
+            "deleted_total": len(deleted),
+            "embedded_total": embedded,
+            "batches_total": 1,
+        }
+
+    # ----- stream -----
+    async def _next_batch(self, stream: Any) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """(document changes, the invalidate event if the stream ended with one)."""
+        changes: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.batch_delay_s
+        while len(changes) < self.batch_size and time.monotonic() < deadline:
+            # Waits up to max_await_time_ms when nothing is buffered; None means the stream is idle.
+            change = await stream.try_next()
+            if change is None:
+                break
+            if change["operationType"] == "invalidate":
+                return changes, change
+            if change["operationType"] in INVALIDATING:
+                logger.warning("recipes saw %s; the change stream is about to be invalidated", change["operationType"])
+                continue
+            changes.append(change)
+        return changes, None
+
+    async def _tail(self) -> None:
+        resume = {"start_after" if self.start_after else "resume_after": self.token}
+        async with self.recipes.watch(
+            PIPELINE,
+            full_document="updateLookup",
+            batch_size=self.batch_size,
+            max_await_time_ms=int(self.batch_delay_s * 1000),
+            **resume,
+        ) as stream:
+            logger.info("Tailing recipes change stream (%s)", "resumed" if self.token else "from now")
+            while stream.alive:
+                changes, invalidate = await self._next_batch(stream)
+                stats = await self.process(changes) if changes else None
+                if invalidate is not None:
+                    self.token, self.start_after = invalidate["_id"], True
+                    await self.save_state(stats)
+                    logger.error(
+                        "recipes was dropped or renamed; following the new collection. Qdrant and "
+                        "recipe_metadata still hold the old catalog: re-run the catalog loader to backfill."
+                    )
+                    return
+                self.token, self.start_after = stream.resume_token, False
+                # While idle the token still advances; checkpoint it now and then so it
+                # stays inside the oplog window.
+                if stats or time.monotonic() - self._saved_at > settings.SYNC_IDLE_CHECKPOINT_S:
+                    await self.save_state(stats)
+
+    async def run(self) -> None:
+        await asyncio.to_thread(
+            get_qdrant_client().create_payload_index,
+            settings.QDRANT_COLLECTION,
+            "mongo_id",
+            field_schema=PayloadSchemaType.KEYWORD,
+        )
+        await self.load_token()
+        while True:
+            try:
+                await self._tail()
+            except OperationFailure as exc:
+                if exc.code != CHANGE_STREAM_HISTORY_LOST:
+                    raise
+                logger.error(
+                    "Resume token is no longer in the oplog; restarting from now. "
+                    "Changes in the gap are missing: re-run the catalog loader to backfill."
+                )
+                self.token, self.start_after = None, False
+                await self.save_state()
+            except Exception:
+                # Mongo, Qdrant or Postgres hiccup: the failed batch is replayed from self.token.
+                logger.exception("Catalog sync failed; resuming after the last applied change")
+                await asyncio.sleep(settings.SYNC_RETRY_DELAY_S)
+
+
+async def main(batch_size: int, batch_delay_s: float, reset: bool) -> None:
+    sync = CatalogSync(batch_size, batch_delay_s)
+    if reset:
+        await sync.state.delete_one({"_id": STATE_ID})
+    try:
+        await sync.run()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.SYNC_BATCH_SIZE)
+    parser.add_argument("--batch-delay", type=float, default=settings.SYNC_BATCH_DELAY_S)
+    parser.add_argument("--reset", action="store_true", help="forget the saved resume token and start from now")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(main(args.batch_size, args.batch_delay, args.reset))
@@ -0,0 +1,78 @@
+"""
+Bulk sync of recipe metadata from Mongo into Postgres `recipe_metadata`.
+
+Streams `_id`, `title`, `cuisine` and `rating.value` from `recipes` in large
+batches and merges each batch with COPY + `INSERT ... ON CONFLICT (mongo_id)`.
+Reading the next batch from Mongo overlaps with writing the previous one.
+
+Run: python -m app.services.metadata_sync [--batch-size 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.db import engine, raw_connection
+from app.core.mongo import get_mongo_database
+from app.repositories.recipe_repo import RecipeMetadataRow, to_metadata_row, upsert_recipe_metadata
+
+logger = logging.getLogger(__name__)
+
+METADATA_PROJECTION = {"_id": 1, "title": 1, "cuisine": 1, "rating.value": 1}
+
+
+async def write_metadata_batch(rows: List[RecipeMetadataRow]) -> int:
+    """Upsert one batch in its own transaction."""
+    async with raw_connection() as conn:
+        async with conn.transaction():
+            return await upsert_recipe_metadata(conn, rows)
+
+
+async def sync_recipe_metadata(
+    mongo_db: AsyncIOMotorDatabase,
+    batch_size: int = 5000,
+    query: Optional[dict] = None,
+) -> int:
+    """Mirror matching Mongo recipes into `recipe_metadata`. Returns rows written."""
+    cursor = mongo_db.recipes.find(query or {}, METADATA_PROJECTION, batch_size=batch_size)
+
+    total = 0
+    pending: Optional[asyncio.Task] = None
+    batch: List[RecipeMetadataRow] = []
+    async for doc in cursor:
+        batch.append(to_metadata_row(doc))
+        if len(batch) >= batch_size:
+            if pending is not None:
+                total += await pending
+            pending = asyncio.create_task(write_metadata_batch(batch))
+            batch = []
+
+    if pending is not None:
+        total += await pending
+    if batch:
+        total += await write_metadata_batch(batch)
+    return total
+
+
+async def main(batch_size: int) -> None:
+    started = time.perf_counter()
+    try:
+        total = await sync_recipe_metadata(get_mongo_database(), batch_size=batch_size)
+    finally:
+        await engine.dispose()
+    elapsed = time.perf_counter() - started
+    logger.info("Synced %d recipes into recipe_metadata in %.1fs", total, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(main(args.batch_size))
@@ -1,18 +1,64 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterable, List, Optional
+import asyncio
+import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
 
 from bson import ObjectId
 from fastapi import HTTPException
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from qdrant_client import QdrantClient
-from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.embeddings import get_embedding_model
+from app.core.embeddings import embed_query
+from app.core.local_vectors import get_local_index
+from app.core.metrics import stage
+from app.core.singleflight import SingleFlight
+from app.core.tag_index import get_tag_index, rank_key
+from app.core.vector_cache import normalize_query
+from app.repositories.recipe_repo import RecipeRepository
+from app.repositories.taste_repo import TasteRepository
 from app.repositories.user_repo import UserRepository
 
+if TYPE_CHECKING:
+    # qdrant_client takes ~0.7s to import; app.core.qdrant loads it on first use.
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import FieldCondition, Filter
+
+logger = logging.getLogger(__name__)
+
+ResultList = List[Dict[str, Any]]
+
+RECIPE_PROJECTION = {
+    "_id": 1,
+    "slug": 1,
+    "title": 1,
+    "summary": 1,
+    "description": 1,
+    "cuisine": 1,
+    "course": 1,
+    "dietary_tags": 1,
+    "allergen_tags": 1,
+    "ingredient_tags": 1,
+    "ingredients": 1,
+    "rating": 1,
+}
+
+
+@lru_cache(maxsize=1)
+def get_recommendation_flight() -> SingleFlight[ResultList]:
+    """Process-wide coalescing for search / recommendation results (keys include the prefs)."""
+    return SingleFlight(
+        "recommendations",
+        ttl=settings.RECOMMENDATION_CACHE_TTL_S,
+        max_entries=settings.RECOMMENDATION_CACHE_SIZE,
+    )
+
+
+def prefs_signature(prefs: Dict[str, List[str]]) -> Tuple[Tuple[str, ...], ...]:
+    return tuple(tuple(sorted(set(prefs[field]))) for field in ("diet_type", "allergies", "dislikes"))
+
 
 class RecommendationService:
     """Coordinates user preferences, MongoDB filtering, and Qdrant similarity search."""
@@ -24,6 +70,8 @@ class RecommendationService:
         qdrant_client: QdrantClient,
     ) -> None:
         self.user_repo = UserRepository(db_session)
+        self.taste_repo = TasteRepository(db_session)
+        self.recipe_repo = RecipeRepository(db_session)
         self.mongo_db = mongo_db
         self.qdrant = qdrant_client
         self.collection = settings.QDRANT_COLLECTION
@@ -33,34 +81,43 @@ class RecommendationService:
         user_id: int,
         limit: int = 12,
     ) -> List[Dict[str, Any]]:
-        prefs = await self._load_preferences(user_id)
-        query = self._build_mongo_query(prefs)
-
-        projection = {
-            "_id": 1,
-            "slug": 1,
-            "title": 1,
-            "summary": 1,
-            "description": 1,
-            "cuisine": 1,
-            "course": 1,
-            "dietary_tags": 1,
-            "allergen_tags": 1,
-            "ingredient_tags": 1,
-            "ingredients": 1,
-            "rating": 1,
-        }
-
-        cursor = (
-            self.mongo_db.recipes.find(query, projection)
-            .sort([("rating.value", -1), ("title", 1)])
-            .limit(limit)
-        )
-        docs = await cursor.to_list(length=limit)
+        with stage("prefs"):
+            prefs = await self._load_preferences(user_id)
+        with stage("taste"):
+            taste = await self.taste_repo.get_taste(user_id)
+        if taste and taste["weight"] >= settings.TASTE_MIN_WEIGHT:
+            key = ("taste", user_id, prefs_signature(prefs), limit)
+            return list(
+                await get_recommendation_flight().do(key, lambda: self._vector_ranked(taste["taste"], prefs, limit))
+            )
+        # Cold start: everything after the prefs lookup depends only on the key, not on the user or the
+        # request's DB session, so identical concurrent calls can share it.
+        key = ("recommended", prefs_signature(prefs), limit)
+        return list(await get_recommendation_flight().do(key, lambda: self._personalized(prefs, limit)))
+
+    async def _personalized(self, prefs: Dict[str, List[str]], limit: int) -> ResultList:
+        index = get_tag_index()
+        if index is not None:
+            with stage("tag_index"):
+                candidates = index.top(prefs, limit)
+            with stage("hydrate"):
+                docs = await self.mongo_db.recipes.find({"_id": {"$in": candidates}}, RECIPE_PROJECTION).to_list(
+                    length=len(candidates)
+                )
+            docs = sorted(docs, key=rank_key)[:limit]
+        else:
+            cursor = (
+                self.mongo_db.recipes.find(self._build_mongo_query(prefs), RECIPE_PROJECTION)
+                .sort([("rating.value", -1), ("title", 1)])
+                .limit(limit)
+            )
+            with stage("mongo_find"):
+                docs = await cursor.to_list(length=limit)
         if not docs:
             return []
 
-        return [self._format_recipe(doc) for doc in docs]
+        with stage("format"):
+            return [self._format_recipe(doc) for doc in docs]
 
     async def search_with_vector_store(
         self,
@@ -71,35 +128,34 @@ class RecommendationService:
         if not query_text.strip():
             raise HTTPException(status_code=400, detail="Query text cannot be empty.")
 
-        prefs = await self._load_preferences(user_id)
-        q_filter = self._build_qdrant_filter(prefs)
-        model = get_embedding_model()
+        with stage("prefs"):
+            prefs = await self._load_preferences(user_id)
+        query_text = normalize_query(query_text)
+        key = ("search", query_text, prefs_signature(prefs), limit)
+        return list(await get_recommendation_flight().do(key, lambda: self._search(query_text, prefs, limit)))
 
+    async def _search(self, query_text: str, prefs: Dict[str, List[str]], limit: int) -> ResultList:
         try:
-            vector = model.encode([query_text], normalize_embeddings=True)[0].tolist()
+            with stage("encode"):
+                vector = await embed_query(query_text)
         except Exception as err:  # pragma: no cover - model errors surface at runtime
             raise HTTPException(status_code=500, detail="Embedding model failure.") from err
+        return await self._vector_ranked(vector, prefs, limit)
 
-        try:
-            hits = self.qdrant.search(
-                collection_name=self.collection,
-                query_vector=("v_text", vector),
-                limit=max(limit, 5),
-                query_filter=q_filter,
-                with_payload=True,
-            )
-        except Exception as err:  # pragma: no cover - network errors at runtime
-            raise HTTPException(
-                status_code=502,
-                detail="Vector search service is unavailable.",
-            ) from err
-
+    async def _vector_ranked(self, vector: List[float], prefs: Dict[str, List[str]], limit: int) -> ResultList:
+        """Recipes nearest to `vector` (a query embedding or a taste vector) that satisfy the prefs."""
+        hits = await self._vector_search(vector, max(limit, 5), self._build_qdrant_filter(prefs))
         if not hits:
             return []
 
         slugs_in_order = [hit.payload.get("slug") for hit in hits if hit.payload]
-        docs_by_slug = await self._load_recipes_by_slugs(slugs_in_order)
+        with stage("hydrate"):
+            docs_by_slug = await self._load_recipes_by_slugs(slugs_in_order)
 
+        with stage("format"):
+            return self._merge_hits(hits, docs_by_slug)[:limit]
+
+    def _merge_hits(self, hits: List[Any], docs_by_slug: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
         results: List[Dict[str, Any]] = []
         for hit in hits:
             payload = hit.payload or {}
@@ -130,7 +186,59 @@ class RecommendationService:
             formatted["score"] = hit.score
             results.append(formatted)
 
-        return results[:limit]
+        return results
+
+    async def get_facet_counts(self, user_id: int) -> Dict[str, Any]:
+        """
+        Recipes per topic / cuisine / course / dietary tag under the user's diet and
+        allergy filter, from the precomputed facet table. Dislikes are ingredient tags,
+        which the table does not break down by, so they are not applied.
+        """
+        with stage("prefs"):
+            prefs = await self._load_preferences(user_id)
+        rows = await self.recipe_repo.get_facet_counts(prefs["diet_type"], prefs["allergies"])
+
+        facets: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            entry: Dict[str, Any] = {"value": row["value"], "count": int(row["count"])}
+            if row["label"] is not None:
+                entry["label"] = row["label"]
+            facets.setdefault(row["facet"], []).append(entry)
+        return {"facets": facets, "filters": {"diet": prefs["diet_type"], "allergies": prefs["allergies"]}}
+
+    async def _vector_search(self, vector: List[float], limit: int, q_filter: Optional[Filter]) -> List[Any]:
+        """Search Qdrant or the in-process index (see VECTOR_BACKEND); both return hits with .payload/.score."""
+        local = get_local_index()
+        use_local = local is not None and (
+            settings.VECTOR_BACKEND == "local"
+            or (settings.VECTOR_BACKEND == "auto" and len(local) <= settings.LOCAL_VECTOR_MAX_POINTS)
+        )
+        if use_local:
+            with stage("vector_search_local"):
+                return await asyncio.to_thread(local.search, vector, limit, q_filter)
+
+        try:
+            with stage("vector_search"):
+                # The client is synchronous; keep the HTTP round trip off the event loop.
+                response = await asyncio.to_thread(
+                    self.qdrant.query_points,
+                    collection_name=self.collection,
+                    query=vector,
+                    using="v_text",
+                    limit=limit,
+                    query_filter=q_filter,
+                    with_payload=True,
+                )
+                return response.points
+        except Exception as err:  # pragma: no cover - network errors at runtime
+            if local is not None and settings.LOCAL_VECTOR_FALLBACK:
+                logger.warning("Qdrant search failed (%s); serving from the local vector index", err)
+                with stage("vector_search_local"):
+                    return await asyncio.to_thread(local.search, vector, limit, q_filter)
+            raise HTTPException(
+                status_code=502,
+                detail="Vector search service is unavailable.",
+            ) from err
 
     async def _load_preferences(self, user_id: int) -> Dict[str, List[str]]:
         prefs = await self.user_repo.get_user_prefs(user_id)
@@ -151,21 +259,7 @@ class RecommendationService:
         if not slugs:
             return {}
 
-        projection = {
-            "_id": 1,
-            "slug": 1,
-            "title": 1,
-            "summary": 1,
-            "description": 1,
-            "cuisine": 1,
-            "course": 1,
-            "dietary_tags": 1,
-            "allergen_tags": 1,
-            "ingredient_tags": 1,
-            "ingredients": 1,
-            "rating": 1,
-        }
-        cursor = self.mongo_db.recipes.find({"slug": {"$in": slugs}}, projection)
+        cursor = self.mongo_db.recipes.find({"slug": {"$in": slugs}}, RECIPE_PROJECTION)
         docs = await cursor.to_list(length=len(slugs))
         return {doc.get("slug"): doc for doc in docs if doc.get("slug")}
 
@@ -184,6 +278,8 @@ class RecommendationService:
         return query
 
     def _build_qdrant_filter(self, prefs: Dict[str, List[str]]) -> Optional[Filter]:
+        from qdrant_client.models import FieldCondition, Filter, MatchAny, MatchValue
+
         must: List[FieldCondition] = []
         must_not: List[FieldCondition] = []
 
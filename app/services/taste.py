@@ -0,0 +1,97 @@
+"""
+Per-user taste vectors from view / like analytics events.
+
+A taste vector is the exponentially decayed sum of the `v_text` vectors of the
+recipes a user viewed or liked. A like counts TASTE_LIKE_WEIGHT, a view
+TASTE_VIEW_WEIGHT, and both halve in influence every TASTE_HALF_LIFE_DAYS.
+Because the decay is exponential, the stored sum updates in O(dim) per event and
+never needs the event history again. The analytics flusher calls
+`taste_increments` on each batch. It fetches the recipe vectors from Qdrant and
+sums each user's events into one increment, which is written in the same
+transaction as the events (see taste_repo).
+
+Events must name the recipe, e.g.
+  {"event_type": "like", "user_id": 7, "details": {"slug": "miso-glazed-salmon"}}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+from collections import defaultdict
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+
+from app.core.catalog import stable_id
+from app.core.config import settings
+from app.core.qdrant import get_qdrant_client
+from app.repositories.analytics_repo import AnalyticsEvent
+from app.repositories.taste_repo import TasteIncrement
+
+logger = logging.getLogger(__name__)
+
+
+def event_weights() -> Dict[str, float]:
+    return {"view": settings.TASTE_VIEW_WEIGHT, "like": settings.TASTE_LIKE_WEIGHT}
+
+
+def _recipe_slug(event: AnalyticsEvent) -> str | None:
+    details = event.event_details or {}
+    slug = details.get("slug") or details.get("recipe_slug")
+    return slug if isinstance(slug, str) and slug else None
+
+
+def _fetch_vectors(slugs: Iterable[str]) -> Dict[str, np.ndarray]:
+    """Unit-length v_text vectors by slug (blocking Qdrant call); unknown slugs are left out."""
+    by_id = {stable_id(slug): slug for slug in slugs}
+    points = get_qdrant_client().retrieve(
+        collection_name=settings.QDRANT_COLLECTION,
+        ids=list(by_id),
+        with_vectors=["v_text"],
+        with_payload=False,
+    )
+    vectors: Dict[str, np.ndarray] = {}
+    for point in points:
+        vector = np.asarray(point.vector["v_text"], dtype=np.float64)
+        vectors[by_id[point.id]] = vector / max(float(np.linalg.norm(vector)), 1e-12)
+    return vectors
+
+
+def fold_events(
+    events: Sequence[AnalyticsEvent],
+    vectors: Dict[str, np.ndarray],
+    half_life_s: float,
+) -> List[TasteIncrement]:
+    """One increment per user: the weighted vectors decayed to the user's latest event in the batch."""
+    weights = event_weights()
+    per_user: Dict[int, List[AnalyticsEvent]] = defaultdict(list)
+    for event in events:
+        if event.user_id is not None and _recipe_slug(event) in vectors:
+            per_user[event.user_id].append(event)
+
+    increments: List[TasteIncrement] = []
+    for user_id, user_events in per_user.items():
+        latest = max(event.created_at for event in user_events)
+        taste = np.zeros_like(next(iter(vectors.values())))
+        weight = 0.0
+        for event in user_events:
+            age = (latest - event.created_at).total_seconds()
+            w = weights[event.event_type] * math.exp(-math.log(2) * age / half_life_s)
+            taste += w * vectors[_recipe_slug(event)]
+            weight += w
+        increments.append(TasteIncrement(user_id, taste.tolist(), weight, len(user_events), half_life_s, latest))
+    return increments
+
+
+async def taste_increments(batch: Sequence[AnalyticsEvent]) -> List[TasteIncrement]:
+    """Taste increments for the view / like events of an analytics batch."""
+    weights = event_weights()
+    events = [e for e in batch if e.event_type in weights and e.user_id is not None and _recipe_slug(e)]
+    if not events:
+        return []
+    vectors = await asyncio.to_thread(_fetch_vectors, {_recipe_slug(e) for e in events})
+    if not vectors:
+        return []
+    return fold_events(events, vectors, settings.TASTE_HALF_LIFE_DAYS * 86_400.0)
@@ -0,0 +1,141 @@
+"""
+Bulk import of users with preferences from CSV or NDJSON.
+
+Input fields: email, password (or an existing bcrypt `password_hash`),
+diet_type, allergies, dislikes. In CSV the list fields are `|`-separated;
+in NDJSON they are JSON arrays.
+
+Rows are read in batches; plain-text passwords are hashed in parallel across
+all cores while the previous batch is loaded into Postgres with COPY and one
+set-based INSERT (see `import_users_from_stage.sql`). Existing emails are skipped.
+Rows with neither a password nor a well-formed bcrypt hash are rejected.
+
+Run: python -m app.services.user_import users.ndjson [--batch-size 5000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import re
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.db import engine, raw_connection
+from app.core.security import hash_passwords, shutdown_pool
+from app.repositories.user_repo import UserImportRow, import_users
+
+logger = logging.getLogger(__name__)
+
+LIST_FIELDS = ("diet_type", "allergies", "dislikes")
+BCRYPT_HASH = re.compile(r"^\$2[aby]\$\d{2}\$.{53}$")
+
+
+def _as_list(value: Any) -> Optional[List[str]]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = value.split("|")
+    return [str(item).strip().lower() for item in value if str(item).strip()]
+
+
+def iter_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """Stream raw records from a .csv or .ndjson/.jsonl file."""
+    with path.open("r", encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            yield from csv.DictReader(f)
+            return
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def iter_batches(path: Path, batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for record in iter_records(path):
+        if not (record.get("email") or "").strip():
+            continue
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def prepare_batch(records: List[Dict[str, Any]]) -> Tuple[List[UserImportRow], int]:
+    """
+    Hash the plain-text passwords of a batch in the process pool. Returns the rows
+    and how many records were rejected (no password, or a malformed `password_hash`).
+    """
+    hashes: Dict[int, str] = {}
+    to_hash: List[int] = []
+    for i, record in enumerate(records):
+        supplied = str(record.get("password_hash") or "")
+        if supplied:
+            if BCRYPT_HASH.match(supplied):
+                hashes[i] = supplied
+        elif record.get("password"):
+            to_hash.append(i)
+    hashed = await hash_passwords([str(records[i]["password"]) for i in to_hash])
+    hashes.update(zip(to_hash, hashed))
+
+    rows = [
+        UserImportRow(
+            email=record["email"].strip()[:255],
+            password_hash=hashes[i],
+            **{field: _as_list(record.get(field)) for field in LIST_FIELDS},
+        )
+        for i, record in enumerate(records)
+        if i in hashes
+    ]
+    return rows, len(records) - len(rows)
+
+
+async def load_batch(rows: List[UserImportRow]) -> int:
+    async with raw_connection() as conn:
+        async with conn.transaction():
+            return await import_users(conn, rows)
+
+
+async def import_file(path: Path, batch_size: int = 5000) -> Dict[str, int]:
+    """Import `path`; hashing of batch N+1 overlaps with loading batch N."""
+    read = created = rejected = 0
+    pending: Optional[asyncio.Task] = None
+    for records in iter_batches(path, batch_size):
+        rows, batch_rejected = await prepare_batch(records)
+        read += len(rows)
+        rejected += batch_rejected
+        if pending is not None:
+            created += await pending
+        pending = asyncio.create_task(load_batch(rows))
+        logger.info("Prepared %d rows", read)
+    if pending is not None:
+        created += await pending
+    if rejected:
+        logger.warning("Rejected %d rows without a password or with a malformed password_hash", rejected)
+    return {"read": read, "created": created, "skipped": read - created, "rejected": rejected}
+
+
+async def main(path: Path, batch_size: int) -> None:
+    started = time.perf_counter()
+    try:
+        stats = await import_file(path, batch_size)
+    finally:
+        shutdown_pool()
+        await engine.dispose()
+    logger.info("Imported %s in %.1fs", stats, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(main(args.path, args.batch_size))
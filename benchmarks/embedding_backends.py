@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Parity and latency of the ONNX embedding backend against the torch model.
+
+Encodes a fixed query set with SentenceTransformer (the reference), the fp32
+ONNX export and the int8 export (when present), all with
+normalize_embeddings=True. It reports the min/mean cosine similarity to the
+reference and the latency of single-query and batched encodes. Exits non-zero
+when a backend's worst-case cosine falls below its threshold.
+
+  python benchmarks/embedding_backends.py [--runs 200] [--min-cosine-fp32 0.9999] [--min-cosine-int8 0.98]
+Exports the model first if EMBEDDING_ONNX_DIR has no export yet.
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.report import write_report  # noqa: E402
+
+# Fixed set: short, long, punctuation, non-ASCII and out-of-vocabulary inputs.
+QUERIES = [
+    "chicken curry",
+    "vegan brownies",
+    "spicy noodle soup",
+    "quick weeknight pasta with garlic and parmesan",
+    "gluten-free banana bread without eggs",
+    "What can I cook with leftover rice, two eggs and some frozen peas?",
+    "slow cooker beef stew",
+    "thai green curry with tofu",
+    "crème brûlée",
+    "jalapeño poppers",
+    "bibimbap",
+    "shakshuka",
+    "low carb high protein breakfast",
+    "kid friendly dinner",
+    "summer salad",
+    "how to make sourdough starter from scratch in a cold kitchen",
+    "pho",
+    "nut-free dessert for a birthday party",
+    "smoky bbq pulled pork sandwiches with coleslaw",
+    "miso glazed salmon",
+    "a",
+    "recipe",
+    "lemon",
+    "Mediterranean chickpea bowl with tahini dressing and roasted vegetables " * 8,
+]
+
+
+def latency(fn: Callable[[List[str]], Any], texts: List[str], runs: int) -> Dict[str, float]:
+    fn(texts)  # warm-up
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn(texts)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    return {
+        "p50_ms": round(samples[len(samples) // 2] * 1000, 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1] * 1000, 3),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=32, help="batch size for the batched latency")
+    parser.add_argument("--min-cosine-fp32", type=float, default=0.9999)
+    parser.add_argument("--min-cosine-int8", type=float, default=0.98)
+    parser.add_argument("--out", type=Path)
+    args = parser.parse_args()
+
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+
+    from app.core.config import settings
+    from app.core.onnx_embedder import INT8_FILE, OnnxEmbedder, export_onnx, model_dir
+
+    directory = model_dir()
+    if not (directory / "meta.json").exists():
+        export_onnx(settings.EMBEDDING_MODEL_NAME, directory, quantize=True)
+
+    backends: Dict[str, Any] = {"torch": SentenceTransformer(settings.EMBEDDING_MODEL_NAME, device="cpu")}
+    backends["onnx-fp32"] = OnnxEmbedder(directory, quantized=False, threads=settings.EMBEDDING_ONNX_THREADS)
+    if (directory / INT8_FILE).exists():
+        backends["onnx-int8"] = OnnxEmbedder(directory, quantized=True, threads=settings.EMBEDDING_ONNX_THREADS)
+    thresholds = {"onnx-fp32": args.min_cosine_fp32, "onnx-int8": args.min_cosine_int8}
+
+    reference = backends["torch"].encode(QUERIES, normalize_embeddings=True)
+    batch = (QUERIES * (args.batch // len(QUERIES) + 1))[: args.batch]
+
+    results: List[Dict[str, Any]] = []
+    failures = []
+    for name, model in backends.items():
+        vectors = np.asarray(model.encode(QUERIES, normalize_embeddings=True))
+        cosines = (vectors * reference).sum(axis=1)  # both sides are unit length
+        single = latency(lambda t: model.encode(t, normalize_embeddings=True), [QUERIES[0]], args.runs)
+        batched = latency(lambda t: model.encode(t, normalize_embeddings=True, batch_size=args.batch), batch,
+                          max(args.runs // 10, 5))
+        result = {
+            "backend": name,
+            "cosine_min": round(float(cosines.min()), 6),
+            "cosine_mean": round(float(cosines.mean()), 6),
+            "norm_max_error": round(float(np.abs(np.linalg.norm(vectors, axis=1) - 1).max()), 7),
+            "single": single,
+            f"batch_{args.batch}": batched,
+        }
+        results.append(result)
+        if name in thresholds and result["cosine_min"] < thresholds[name]:
+            failures.append(f"{name}: min cosine {result['cosine_min']} < {thresholds[name]}")
+
+    print(f"{'backend':<10} {'cos min':>9} {'cos mean':>9} {'1q p50 ms':>10} {'1q p95 ms':>10} {f'b{args.batch} p50 ms':>11}")
+    for r in results:
+        print(f"{r['backend']:<10} {r['cosine_min']:>9.5f} {r['cosine_mean']:>9.5f} {r['single']['p50_ms']:>10.2f}"
+              f" {r['single']['p95_ms']:>10.2f} {r[f'batch_{args.batch}']['p50_ms']:>11.2f}")
+
+    out = write_report(
+        "embedding-backends",
+        {"model": settings.EMBEDDING_MODEL_NAME, "runs": args.runs, "batch": args.batch,
+         "threads": settings.EMBEDDING_ONNX_THREADS, "queries": len(QUERIES)},
+        results,
+        args.out,
+    )
+    print(f"\nWrote {out}")
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Endpoint benchmark for the recipe and user-prefs routes.
+
+Builds a synthetic catalog and drives the ASGI app in-process (httpx
+ASGITransport, no network hop) at increasing concurrency. The app's lifespan
+runs first and the benchmark waits for /health/ready, so warm-up, the tag index
+and autocomplete are in place as in production. Every bench user then likes a
+few recipes, which gives them taste vectors for the taste-ranked
+/recipes/recommended path. For each endpoint
+and concurrency level it reports throughput, p50/p95/p99 latency and the mean
+time per request stage (prefs, encode, vector_search, ...).
+
+Stand-ins:
+  * Qdrant: local in-process mode (QDRANT_URL=`:memory:`) by default, or a server via
+    --qdrant-url (collection `recipes_bench`). Point ids are `stable_id(slug)` as in the
+    real catalog.
+  * Mongo: the configured server, database `flavornet_bench` (dropped and re-seeded).
+  * Postgres: the configured server, database `flavornet_bench` (created with the
+    sql/init schema on first run); bench users are `bench-<n>@bench.flavornet.invalid`
+    and are created once, then reused.
+The bench names are forced over any .env values, and the run stops if the resolved
+settings point anywhere else, so the real catalog and users are never touched.
+Start Mongo and Postgres with `make up` (or any local servers and the usual env vars).
+
+Catalog vectors are random unit vectors by default, so seeding takes seconds;
+query encoding always runs the real model. Use --embed-catalog for real
+catalog embeddings.
+
+Results are written as JSON tagged with the git commit, so runs can be compared:
+  python benchmarks/endpoints.py --recipes 5000 --users 200 --concurrency 1,8,32
+  python benchmarks/endpoints.py --baseline benchmarks/results/endpoints-<sha>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.report import load_results, write_report  # noqa: E402
+
+BENCH_DATABASE = "flavornet_bench"
+BENCH_COLLECTION = "recipes_bench"
+
+# Must be set before app modules read Settings. Environment variables win over .env,
+# so these always replace the real names: the bench drops and re-seeds them.
+os.environ["MONGO_INITDB_DATABASE"] = BENCH_DATABASE
+os.environ["POSTGRES_DB"] = BENCH_DATABASE
+os.environ["QDRANT_COLLECTION"] = BENCH_COLLECTION
+os.environ.setdefault("WARMUP_EMBEDDING_MODEL", "false")
+
+# Mirrors the controlled vocabularies in mongoDB/init/01_collections.js.
+DIETARY = ["vegan", "vegetarian", "pescatarian", "halal", "kosher", "gluten-free", "dairy-free",
+           "nut-free", "egg-free", "low-carb", "low-fat"]
+ALLERGENS = ["gluten", "dairy", "egg", "peanut", "tree-nut", "soy", "shellfish", "fish", "sesame"]
+COURSES = ["breakfast", "starter", "main", "side", "dessert", "drink", "snack"]
+CUISINES = ["italian", "mexican", "indian", "thai", "japanese", "chinese", "french", "greek",
+            "middle-eastern", "korean", "spanish", "american"]
+INGREDIENTS = ["garlic", "onion", "tomato", "basil", "chicken", "beef", "tofu", "rice", "noodles",
+               "ginger", "chili", "lemon", "coconut-milk", "chickpeas", "spinach", "mushroom",
+               "potato", "cheese", "egg", "salmon", "shrimp", "lentils", "cumin", "coriander"]
+QUERIES = ["spicy noodle soup", "quick vegan dinner", "creamy pasta with mushrooms",
+           "grilled fish with lemon", "chocolate dessert", "healthy breakfast bowl",
+           "indian curry with chickpeas", "crispy tofu stir fry"]
+
+BENCH_EMAIL = "bench-{}@bench.flavornet.invalid"
+# Never verified by these routes; only needs to look like a bcrypt hash.
+BENCH_PASSWORD_HASH = "$2b$12$" + "b" * 53
+VECTOR_DIM = 384
+LIKES_PER_USER = 5
+READY_TIMEOUT_S = 120.0
+
+
+# ---------------------- bench targets ----------------------
+def check_bench_targets(settings) -> None:
+    """Refuse to run against anything but the bench database and collection."""
+    resolved = {
+        "MONGO_INITDB_DATABASE": settings.MONGO_INITDB_DATABASE,
+        "POSTGRES_DB": settings.POSTGRES_DB,
+        "QDRANT_COLLECTION": settings.QDRANT_COLLECTION,
+    }
+    expected = {"MONGO_INITDB_DATABASE": BENCH_DATABASE, "POSTGRES_DB": BENCH_DATABASE, "QDRANT_COLLECTION": BENCH_COLLECTION}
+    if resolved != expected:
+        raise SystemExit(f"Refusing to run: settings resolve to {resolved}, expected {expected}")
+
+
+async def ensure_bench_postgres(settings) -> None:
+    """Create the bench database with the sql/init schema (no seed data) if it does not exist."""
+    import asyncpg
+
+    connect = dict(user=settings.POSTGRES_USER, password=settings.POSTGRES_PASSWORD, host=settings.PGHOST, port=settings.PGPORT)
+    admin = await asyncpg.connect(database="postgres", **connect)
+    try:
+        if await admin.fetchval("SELECT 1 FROM pg_database WHERE datname = $1", BENCH_DATABASE):
+            return
+        await admin.execute(f'CREATE DATABASE "{BENCH_DATABASE}"')
+    finally:
+        await admin.close()
+    conn = await asyncpg.connect(database=BENCH_DATABASE, **connect)
+    try:
+        for name in ("01_schema.sql", "02_constraints.sql", "04_views.sql"):
+            await conn.execute((REPO_ROOT / "sql/init" / name).read_text(encoding="utf-8"))
+    finally:
+        await conn.close()
+
+
+# ---------------------- synthetic data ----------------------
+def make_recipe(i: int, rng: random.Random) -> Dict[str, Any]:
+    cuisine = rng.choice(CUISINES)
+    ingredients = rng.sample(INGREDIENTS, rng.randint(4, 10))
+    title = f"{cuisine.replace('-', ' ').title()} {rng.choice(ingredients)} {rng.choice(['bowl', 'stew', 'salad', 'bake', 'curry'])} {i}"
+    return {
+        "slug": f"bench-recipe-{i}",
+        "title": title,
+        "summary": f"A {cuisine} dish with {', '.join(ingredients[:3])}.",
+        "description": f"Synthetic benchmark recipe {i}.",
+        "cuisine": cuisine,
+        "course": rng.choice(COURSES),
+        "dietary_tags": rng.sample(DIETARY, rng.randint(0, 3)),
+        "allergen_tags": rng.sample(ALLERGENS, rng.randint(0, 2)),
+        "ingredient_tags": ingredients,
+        "ingredients": [{"name": name, "raw": f"1 cup {name}"} for name in ingredients],
+        "steps": [f"Prepare the {name}." for name in ingredients[:3]] + ["Serve."],
+        "rating": {"value": round(rng.uniform(2.5, 5.0), 2), "count": rng.randint(0, 500)},
+    }
+
+
+def random_unit_vector(rng: random.Random, dim: int = VECTOR_DIM) -> List[float]:
+    v = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = math.sqrt(sum(x * x for x in v)) or 1.0
+    return [x / norm for x in v]
+
+
+async def seed_mongo(recipes: List[Dict[str, Any]]) -> None:
+    from app.core.mongo import get_mongo_database
+
+    db = get_mongo_database()
+    await db.recipes.drop()
+    for start in range(0, len(recipes), 5000):
+        # insert_many adds _id to the dicts; copy so the Qdrant payloads stay clean
+        await db.recipes.insert_many([dict(r) for r in recipes[start:start + 5000]], ordered=False)
+    # the indexes from mongoDB/init/02_indexes.js that these routes use
+    await db.recipes.create_index("slug")
+    await db.recipes.create_index("dietary_tags")
+    await db.recipes.create_index("allergen_tags")
+    await db.recipes.create_index("ingredient_tags")
+    await db.recipes.create_index([("rating.value", -1), ("title", 1)])
+
+
+def seed_qdrant(client, collection: str, recipes: List[Dict[str, Any]], rng: random.Random, embed: bool) -> None:
+    from qdrant_client.models import Distance, PointStruct, VectorParams
+
+    from app.core.catalog import stable_id
+
+    if client.collection_exists(collection):
+        client.delete_collection(collection)
+    client.create_collection(
+        collection,
+        vectors_config={
+            "v_text": VectorParams(size=VECTOR_DIM, distance=Distance.COSINE),
+            "v_ingredients": VectorParams(size=VECTOR_DIM, distance=Distance.COSINE),
+        },
+    )
+    if embed:
+        from app.core.embeddings import get_embedding_model
+
+        model = get_embedding_model()
+        text_vectors = model.encode([f"{r['title']}. {' '.join(r['steps'])}" for r in recipes],
+                                    normalize_embeddings=True, batch_size=128).tolist()
+        ing_vectors = model.encode([" ".join(r["ingredient_tags"]) for r in recipes],
+                                   normalize_embeddings=True, batch_size=128).tolist()
+    else:
+        text_vectors = [random_unit_vector(rng) for _ in recipes]
+        ing_vectors = [random_unit_vector(rng) for _ in recipes]
+
+    payload_keys = ("slug", "title", "summary", "cuisine", "course", "dietary_tags", "allergen_tags", "ingredient_tags")
+    for start in range(0, len(recipes), 512):
+        client.upsert(collection, [
+            PointStruct(
+                id=stable_id(recipes[i]["slug"]),
+                vector={"v_text": text_vectors[i], "v_ingredients": ing_vectors[i]},
+                payload={**{k: recipes[i][k] for k in payload_keys}, "rating_value": recipes[i]["rating"]["value"]},
+            )
+            for i in range(start, min(start + 512, len(recipes)))
+        ])
+
+
+async def seed_users(n: int, rng: random.Random) -> List[int]:
+    from sqlalchemy import text
+
+    from app.core.db import AsyncSessionLocal, raw_connection
+    from app.repositories.user_repo import UserImportRow, import_users
+
+    rows = [
+        UserImportRow(
+            email=BENCH_EMAIL.format(i),
+            password_hash=BENCH_PASSWORD_HASH,
+            diet_type=rng.sample(DIETARY, rng.randint(0, 1)),
+            allergies=rng.sample(ALLERGENS, rng.randint(0, 2)),
+            dislikes=rng.sample(INGREDIENTS, rng.randint(0, 2)),
+        )
+        for i in range(n)
+    ]
+    async with raw_connection() as conn:
+        async with conn.transaction():
+            await import_users(conn, rows)
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            text("SELECT user_id FROM users WHERE email = ANY(:emails) ORDER BY user_id"),
+            {"emails": [row.email for row in rows]},
+        )
+        return [row[0] for row in result]
+
+
+# ---------------------- app under test ----------------------
+async def wait_ready(client, timeout_s: float = READY_TIMEOUT_S) -> None:
+    """Poll /health/ready until the lifespan warm-up has finished."""
+    deadline = time.monotonic() + timeout_s
+    while True:
+        response = await client.get("/health/ready")
+        if response.status_code == 200:
+            print(f"App ready, warm-up {response.json()['warmup_seconds']}")
+            return
+        if time.monotonic() > deadline:
+            raise SystemExit(f"App not ready after {timeout_s:.0f}s: {response.json()}")
+        await asyncio.sleep(0.5)
+
+
+async def seed_likes(client, user_ids: List[int], recipes: List[Dict[str, Any]], rng: random.Random) -> None:
+    """Send like events through the API and wait until they are flushed into taste vectors."""
+    events = [
+        {"event_type": "like", "user_id": user_id, "details": {"slug": recipe["slug"]}}
+        for user_id in user_ids
+        for recipe in rng.sample(recipes, min(LIKES_PER_USER, len(recipes)))
+    ]
+    for start in range(0, len(events), 1000):
+        response = await client.post("/analytics/events", json={"events": events[start:start + 1000]})
+        response.raise_for_status()
+    deadline = time.monotonic() + READY_TIMEOUT_S
+    while True:
+        stats = (await client.get("/analytics/ingest-stats")).json()
+        if stats["pending"] == 0 and stats["written"] + stats["failed"] >= stats["accepted"]:
+            break
+        if time.monotonic() > deadline:
+            raise SystemExit(f"Like events not flushed after {READY_TIMEOUT_S:.0f}s: {stats}")
+        await asyncio.sleep(0.5)
+    if stats["failed"] or stats["dropped"]:
+        print(f"  warning: like events not all written: {stats}")
+
+
+# ---------------------- load generation ----------------------
+RequestFactory = Callable[[int], Tuple[str, str, Optional[Dict[str, Any]]]]
+
+
+def endpoint_factories(user_ids: List[int]) -> Dict[str, RequestFactory]:
+    def uid(i: int) -> int:
+        return user_ids[i % len(user_ids)]
+
+    def patch_prefs(i: int):
+        # alternate add/remove of the same tag so the stored prefs do not drift
+        op = "add" if (i // len(user_ids)) % 2 == 0 else "remove"
+        return "PATCH", f"/users/{uid(i)}/prefs", {op: {"dislikes": ["bench-tag"]}}
+
+    return {
+        "GET /recipes/recommended": lambda i: ("GET", f"/recipes/recommended?user_id={uid(i)}", None),
+        "GET /recipes/search": lambda i: ("GET", f"/recipes/search?user_id={uid(i)}&query={QUERIES[i % len(QUERIES)]}", None),
+        "GET /users/{id}/prefs": lambda i: ("GET", f"/users/{uid(i)}/prefs", None),
+        "PATCH /users/{id}/prefs": patch_prefs,
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+async def run_level(client, make_request: RequestFactory, concurrency: int, total: int, warmup: int) -> Dict[str, Any]:
+    from app.core.metrics import STAGE_LATENCY
+
+    async def send(i: int) -> Tuple[float, bool]:
+        method, url, body = make_request(i)
+        started = time.perf_counter()
+        response = await client.request(method, url, json=body)
+        return time.perf_counter() - started, response.status_code < 400
+
+    for i in range(warmup):
+        await send(i)
+    STAGE_LATENCY.children.clear()
+
+    latencies: List[float] = []
+    errors = 0
+    next_index = 0
+
+    async def worker() -> None:
+        nonlocal next_index, errors
+        while next_index < total:
+            i, next_index = next_index, next_index + 1
+            elapsed, ok = await send(warmup + i)
+            latencies.append(elapsed)
+            errors += not ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "throughput_rps": round(total / wall, 1),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "stages_mean_ms": {
+            labels[0]: round(h.sum / h.count * 1000, 3)
+            for labels, h in sorted(STAGE_LATENCY.children.items())
+            if h.count
+        },
+    }
+
+
+# ---------------------- reporting ----------------------
+def print_table(results: List[Dict[str, Any]], baseline: Optional[Dict[Tuple[str, int], Dict[str, Any]]]) -> None:
+    header = f"{'endpoint':<26} {'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    if baseline:
+        header += f" {'Δp50':>8} {'Δreq/s':>8}"
+    print(header)
+    for r in results:
+        line = (f"{r['endpoint']:<26} {r['concurrency']:>5} {r['throughput_rps']:>9.1f} {r['p50_ms']:>9.2f}"
+                f" {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['errors']:>7}")
+        base = (baseline or {}).get((r["endpoint"], r["concurrency"]))
+        if base:
+            line += f" {(r['p50_ms'] / base['p50_ms'] - 1) * 100:>+7.1f}% {(r['throughput_rps'] / base['throughput_rps'] - 1) * 100:>+7.1f}%"
+        print(line)
+
+
+async def main(args: argparse.Namespace) -> int:
+    # Before Settings is read, so the app's own client (lifespan, taste vectors) is the bench one.
+    os.environ["QDRANT_URL"] = args.qdrant_url or ":memory:"
+
+    import httpx
+
+    from app.core.config import settings
+    from app.core.embeddings import embed_query
+    from app.core.qdrant import get_qdrant_client
+    from app.main import app
+
+    check_bench_targets(settings)
+    await ensure_bench_postgres(settings)
+    rng = random.Random(args.seed)
+    qdrant = get_qdrant_client()
+
+    print(f"Seeding {args.recipes} recipes and {args.users} users ...")
+    started = time.perf_counter()
+    recipes = [make_recipe(i, rng) for i in range(args.recipes)]
+    seed_qdrant(qdrant, settings.QDRANT_COLLECTION, recipes, rng, args.embed_catalog)
+    await seed_mongo(recipes)
+    user_ids = await seed_users(args.users, rng)
+    await embed_query("warm-up query")
+    print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+    factories = endpoint_factories(user_ids)
+    selected = [name for name in factories if not args.endpoints or any(e in name for e in args.endpoints)]
+    results: List[Dict[str, Any]] = []
+    # ASGITransport does not send lifespan events; run the lifespan here so the app starts
+    # (and on exit shuts down, closing the pools and clients) as it does under uvicorn.
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+            await wait_ready(client)
+            await seed_likes(client, user_ids, recipes, rng)
+            for name in selected:
+                for concurrency in args.concurrency:
+                    result = await run_level(client, factories[name], concurrency, args.requests, args.warmup)
+                    results.append({"endpoint": name, **result})
+                    print(f"  {name} c={concurrency}: {result['throughput_rps']} req/s, p99 {result['p99_ms']} ms")
+
+    baseline = None
+    if args.baseline:
+        baseline = {(r["endpoint"], r["concurrency"]): r for r in load_results(args.baseline)}
+    print()
+    print_table(results, baseline)
+
+    out = write_report(
+        "endpoints",
+        {
+            "recipes": args.recipes,
+            "users": args.users,
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "qdrant": args.qdrant_url or ":memory:",
+            "embed_catalog": args.embed_catalog,
+            "embedding_model": settings.EMBEDDING_MODEL_NAME,
+        },
+        results,
+        args.out,
+    )
+    print(f"\nWrote {out}")
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipes", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=500, help="measured requests per endpoint and level")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 4, 16, 64])
+    parser.add_argument("--endpoints", nargs="*", help="substring filter, e.g. search prefs")
+    parser.add_argument("--qdrant-url", help="use a Qdrant server instead of local in-process mode")
+    parser.add_argument("--embed-catalog", action="store_true", help="embed the catalog with the real model")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=Path, help="result JSON path (default benchmarks/results/endpoints-<sha>.json)")
+    parser.add_argument("--baseline", type=Path, help="earlier result JSON to diff against")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the API.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter,
+prints the slowest modules by cumulative time, and exits non-zero when
+  * any heavy ML module (torch, transformers, sentence_transformers, ...) is
+    imported eagerly, or
+  * the total import time of `app.main` exceeds the budget.
+
+Run from the repo root:
+  python benchmarks/import_time.py [--budget-ms 1500] [--top 25] [--module app.main]
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Only loaded on first embedding (app.core.embeddings) or inside offline jobs.
+FORBIDDEN = ("torch", "transformers", "sentence_transformers", "onnxruntime", "bertopic", "sklearn")
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)$")
+
+# Settings() requires these; values are never used because nothing connects at import.
+_DUMMY_ENV = {"POSTGRES_USER": "bench", "POSTGRES_PASSWORD": "bench", "POSTGRES_DB": "bench"}
+
+
+def measure(module: str) -> List[Tuple[str, int, int, int]]:
+    """Return `(module, self_us, cumulative_us, depth)` for every import."""
+    env = {**_DUMMY_ENV, **os.environ, "PYTHONPATH": str(REPO_ROOT)}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"Importing {module} failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    rows = measure(args.module)
+    by_name: Dict[str, int] = {name: cumulative for name, _, cumulative, _ in rows}
+    total_ms = by_name.get(args.module, 0) / 1000
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    top_level = [row for row in rows if row[3] <= 1]
+    for name, self_us, cumulative_us, depth in sorted(top_level, key=lambda r: r[2], reverse=True)[: args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {'  ' * depth}{name}")
+    print(f"\n{args.module}: {total_ms:.1f} ms total (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    eager = sorted({name for name in by_name if name.split(".")[0] in FORBIDDEN})
+    if eager:
+        roots = sorted({name.split(".")[0] for name in eager})
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(roots)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"FAIL: import time {total_ms:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Ingest throughput benchmark for vectorDB/data/generate_embeddings.py.
+
+Runs the pipeline's own helpers (iter_jsonl, text_input / ingredient_input,
+build_payload, stable_id, upsert_with_retry) stage by stage and reports docs/sec for
+  parse  - JSONL decode + text/ingredient inputs + payloads,
+  embed  - both model.encode calls, per batch size,
+  upsert - PointStruct build + upsert (wait=True), per batch size,
+plus the implied end-to-end rate of the sequential pipeline.
+
+Input is a JSONL file (default: a synthetic corpus from
+generate_synthetic_corpus.py). Qdrant runs in local in-process mode unless
+--qdrant-path (local on-disk) or --qdrant-url is given; the benchmark only
+touches the `recipes_ingest_bench` collection.
+
+  python benchmarks/ingest.py --docs 20000 --batch-sizes 32,64,128,256
+  python benchmarks/ingest.py --baseline benchmarks/results/ingest-<sha>.json --max-regression 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(REPO_ROOT / "vectorDB" / "data"))
+
+from benchmarks.report import load_results, write_report  # noqa: E402
+
+BENCH_COLLECTION = "recipes_ingest_bench"
+
+
+def bench_parse(path: Path, limit: int) -> tuple[List[Dict[str, Any]], List[str], List[str], float]:
+    from generate_embeddings import build_payload, ingredient_input, iter_jsonl, text_input
+
+    docs, texts, ings = [], [], []
+    started = time.perf_counter()
+    for _, doc in itertools.islice(iter_jsonl(path), limit):
+        texts.append(text_input(doc))
+        ings.append(ingredient_input(doc))
+        build_payload(doc)
+        docs.append(doc)
+    return docs, texts, ings, time.perf_counter() - started
+
+
+def bench_embed(model, texts: List[str], ings: List[str], batch_size: int) -> tuple[list, list, float]:
+    """Encode in pipeline-sized chunks, like upsert_batch does per batch."""
+    text_vecs, ing_vecs = [], []
+    started = time.perf_counter()
+    for start in range(0, len(texts), batch_size):
+        text_vecs.extend(model.encode(texts[start:start + batch_size], normalize_embeddings=True, batch_size=batch_size))
+        ing_vecs.extend(model.encode(ings[start:start + batch_size], normalize_embeddings=True, batch_size=batch_size))
+    return text_vecs, ing_vecs, time.perf_counter() - started
+
+
+def recreate_collection(client, dim: int) -> None:
+    from generate_embeddings import ING_VECTOR_NAME, TEXT_VECTOR_NAME
+    from qdrant_client.models import Distance, OptimizersConfigDiff, VectorParams
+
+    if client.collection_exists(BENCH_COLLECTION):
+        client.delete_collection(BENCH_COLLECTION)
+    # same layout as ensure_collection() in generate_embeddings.py
+    client.create_collection(
+        collection_name=BENCH_COLLECTION,
+        vectors_config={
+            TEXT_VECTOR_NAME: VectorParams(size=dim, distance=Distance.COSINE),
+            ING_VECTOR_NAME: VectorParams(size=dim, distance=Distance.COSINE),
+        },
+        optimizers_config=OptimizersConfigDiff(default_segment_number=2),
+    )
+
+
+def bench_upsert(client, docs: List[Dict[str, Any]], text_vecs: list, ing_vecs: list, batch_size: int) -> float:
+    from generate_embeddings import ING_VECTOR_NAME, TEXT_VECTOR_NAME, build_payload, stable_id, upsert_with_retry
+    from qdrant_client.models import PointStruct
+
+    recreate_collection(client, len(text_vecs[0]))
+    started = time.perf_counter()
+    for start in range(0, len(docs), batch_size):
+        points = []
+        for i in range(start, min(start + batch_size, len(docs))):
+            slug = (docs[i].get("slug") or "").strip()
+            if not slug:
+                continue
+            # vectors from the embed stage are reused cyclically when there are more docs than embeddings
+            points.append(PointStruct(
+                id=stable_id(slug),
+                vector={
+                    TEXT_VECTOR_NAME: text_vecs[i % len(text_vecs)].tolist(),
+                    ING_VECTOR_NAME: ing_vecs[i % len(ing_vecs)].tolist(),
+                },
+                payload=build_payload(docs[i]),
+            ))
+        if points:
+            client = upsert_with_retry(client, BENCH_COLLECTION, points)
+    return time.perf_counter() - started
+
+
+def make_qdrant_client(args: argparse.Namespace):
+    from qdrant_client import QdrantClient
+
+    if args.qdrant_url:
+        return QdrantClient(url=args.qdrant_url, check_compatibility=False)
+    if args.qdrant_path:
+        return QdrantClient(path=str(args.qdrant_path))
+    return QdrantClient(":memory:")
+
+
+def check_regressions(results: List[Dict[str, Any]], baseline_path: Path, max_regression: float) -> List[str]:
+    baseline = {(r["stage"], r["batch_size"]): r for r in load_results(baseline_path)}
+    failures = []
+    for r in results:
+        base = baseline.get((r["stage"], r["batch_size"]))
+        if not base:
+            continue
+        change = r["docs_per_sec"] / base["docs_per_sec"] - 1
+        print(f"  {r['stage']:<7} batch={r['batch_size']!s:<5} {change * 100:+6.1f}% vs baseline")
+        if change < -max_regression:
+            failures.append(f"{r['stage']} batch={r['batch_size']}: {change * 100:.1f}%")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jsonl", type=Path, help="input corpus (default: generate a synthetic one)")
+    parser.add_argument("--docs", type=int, default=20_000, help="docs to parse and upsert")
+    parser.add_argument("--embed-docs", type=int, default=1024, help="docs to embed per batch size (the slow stage)")
+    parser.add_argument("--batch-sizes", type=lambda s: [int(b) for b in s.split(",")], default=[32, 64, 128, 256])
+    parser.add_argument("--model", default=None, help="embedding model (default: the pipeline's EMBED_MODEL)")
+    parser.add_argument("--qdrant-path", type=Path, help="Qdrant local on-disk mode at this path")
+    parser.add_argument("--qdrant-url", help="Qdrant server URL")
+    parser.add_argument("--seed", type=int, default=7, help="seed for the synthetic corpus")
+    parser.add_argument("--out", type=Path, help="result JSON path (default benchmarks/results/ingest-<sha>.json)")
+    parser.add_argument("--baseline", type=Path, help="earlier result JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15,
+                        help="with --baseline, fail when any stage is this much slower (fraction)")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    import generate_embeddings
+
+    path: Optional[Path] = args.jsonl
+    if path is None:
+        from generate_synthetic_corpus import write_corpus
+
+        path = Path(tempfile.mkstemp(prefix="flavornet-corpus-", suffix=".jsonl")[1])
+        with path.open("w", encoding="utf-8") as f:
+            write_corpus(f, args.docs, args.seed)
+        print(f"Generated {args.docs} synthetic docs in {path}")
+
+    results: List[Dict[str, Any]] = []
+
+    docs, texts, ings, parse_s = bench_parse(path, args.docs)
+    results.append({"stage": "parse", "batch_size": None, "docs": len(docs), "seconds": round(parse_s, 3),
+                    "docs_per_sec": round(len(docs) / parse_s, 1)})
+
+    model_name = args.model or generate_embeddings.MODEL_NAME
+    model = SentenceTransformer(model_name)
+    model.encode(["warm-up"], normalize_embeddings=True)
+    client = make_qdrant_client(args)
+
+    n_embed = min(args.embed_docs, len(docs))
+    for batch_size in args.batch_sizes:
+        text_vecs, ing_vecs, embed_s = bench_embed(model, texts[:n_embed], ings[:n_embed], batch_size)
+        results.append({"stage": "embed", "batch_size": batch_size, "docs": n_embed, "seconds": round(embed_s, 3),
+                        "docs_per_sec": round(n_embed / embed_s, 1)})
+        upsert_s = bench_upsert(client, docs, text_vecs, ing_vecs, batch_size)
+        results.append({"stage": "upsert", "batch_size": batch_size, "docs": len(docs), "seconds": round(upsert_s, 3),
+                        "docs_per_sec": round(len(docs) / upsert_s, 1)})
+    if client.collection_exists(BENCH_COLLECTION):
+        client.delete_collection(BENCH_COLLECTION)
+    if args.jsonl is None:
+        path.unlink()
+
+    by_key = {(r["stage"], r["batch_size"]): r["docs_per_sec"] for r in results}
+    print(f"\n{'stage':<9} {'batch':>6} {'docs':>8} {'docs/sec':>11}")
+    for r in results:
+        print(f"{r['stage']:<9} {r['batch_size'] or '-':>6} {r['docs']:>8} {r['docs_per_sec']:>11.1f}")
+    print("\nSequential pipeline estimate (parse + embed + upsert per doc):")
+    for batch_size in args.batch_sizes:
+        per_doc = sum(1 / by_key[key] for key in (("parse", None), ("embed", batch_size), ("upsert", batch_size)))
+        print(f"  batch={batch_size:<5} {1 / per_doc:>9.1f} docs/sec")
+
+    out = write_report(
+        "ingest",
+        {
+            "jsonl": str(args.jsonl) if args.jsonl else f"synthetic(seed={args.seed})",
+            "docs": len(docs),
+            "embed_docs": n_embed,
+            "batch_sizes": args.batch_sizes,
+            "model": model_name,
+            "qdrant": args.qdrant_url or (str(args.qdrant_path) if args.qdrant_path else ":memory:"),
+        },
+        results,
+        args.out,
+    )
+    print(f"\nWrote {out}")
+
+    if args.baseline:
+        failures = check_regressions(results, args.baseline, args.max_regression)
+        if failures:
+            print(f"FAIL: ingest throughput regressed more than {args.max_regression:.0%}: {'; '.join(failures)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
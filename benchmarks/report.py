@@ -0,0 +1,48 @@
+"""Shared result format for the benchmark scripts: JSON tagged with the commit and machine."""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+
+
+def git_info() -> Dict[str, Any]:
+    def git(*args: str) -> str:
+        return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+
+    return {"sha": git("rev-parse", "HEAD") or None, "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def write_report(
+    benchmark: str,
+    params: Dict[str, Any],
+    results: List[Dict[str, Any]],
+    out: Optional[Path] = None,
+) -> Path:
+    """Write `results` to `out` (default benchmarks/results/<benchmark>-<sha>.json)."""
+    git = git_info()
+    report = {
+        "benchmark": benchmark,
+        "git": git,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": {"platform": platform.platform(), "cpus": os.cpu_count()},
+        "params": params,
+        "results": results,
+    }
+    out = Path(out or RESULTS_DIR / f"{benchmark}-{(git['sha'] or 'nogit')[:12]}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    return out
+
+
+def load_results(path: Path) -> List[Dict[str, Any]]:
+    return json.loads(Path(path).read_text())["results"]
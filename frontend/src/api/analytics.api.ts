@@ -0,0 +1,11 @@
+import { api } from "../utils/apiClient";
+
+export type AnalyticsEvent = {
+  event_type: "search" | "view" | "click" | string;
+  user_id?: number;
+  details?: Record<string, unknown>;
+};
+
+// Fire-and-forget: the backend buffers events and writes them in batches.
+export const trackEvents = (events: AnalyticsEvent[]) =>
+  api.post("/analytics/events", { events }).catch(() => undefined);
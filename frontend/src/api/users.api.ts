@@ -1,6 +1,7 @@
 import { api } from "../utils/apiClient";
 
-export const listUsers = () => api.get("/users");
+export const listUsers = (params?: { limit?: number; email?: string }) =>
+  api.get("/users", { params });
 export const getUserPrefs = (id: number) => api.get(`/users/${id}/prefs`);
 export const updateUserPrefs = (id: number, data: any) =>
   api.put(`/users/${id}/prefs`, data);
@@ -17,8 +17,8 @@ export default function Login() {
     setIsSubmitting(true);
     setError(null);
     try {
-      const response = await listUsers();
-      const users = Array.isArray(response.data) ? response.data : [];
+      const response = await listUsers({ email: email.trim() });
+      const users = Array.isArray(response.data?.data) ? response.data.data : [];
       const matched = users.find(
         (u: any) =>
           typeof u.email === "string" &&
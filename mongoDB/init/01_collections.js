@@ -4,7 +4,7 @@
 const DB_NAME = (typeof DB_NAME !== 'undefined') ? DB_NAME : 'appdb';
 const appdb = db.getSiblingDB(DB_NAME);
 
-// ----- Controlled vocabularies (mirror these in your Python pipeline) -----
+// ----- Controlled vocabularies (mirrored in app/core/vocabularies.py) -----
 const DIETARY   = ["vegan","vegetarian","pescatarian","halal","kosher","gluten-free","dairy-free","nut-free","egg-free","low-carb","low-fat"];
 const ALLERGENS = ["gluten","dairy","egg","peanut","tree-nut","soy","shellfish","fish","sesame"];
 const FLAVOURS  = ["spicy","sweet","sour","bitter","salty","umami","smoky","tangy","herby","garlicky","citrusy","creamy","rich","fresh"];
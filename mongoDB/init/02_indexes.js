@@ -16,6 +16,7 @@ dbx.recipes.createIndex({ dietary_tags: 1 },         { name: "dietary_tags" });
 dbx.recipes.createIndex({ allergen_tags: 1 },        { name: "allergen_tags" });
 dbx.recipes.createIndex({ flavour_tags: 1 },         { name: "flavour_tags" });
 dbx.recipes.createIndex({ technique_tags: 1 },       { name: "technique_tags" });
+dbx.recipes.createIndex({ topic_id: 1 },             { name: "topic_id" });  // set by vectorDB/BERTopic/assign_topics.py
 
 try { dbx.recipes.dropIndex("slug_unique"); } catch (e) {}
 dbx.recipes.createIndex({ slug: 1, source_url: 1 }, { name: "slug_source_unique", unique: true, sparse: true });
@@ -43,12 +43,22 @@ compose exec -T mongo mongosh -u "$ROOT_USER" -p "$ROOT_PASS" --authenticationDa
 echo "🔧  Creating indexes..."
 compose exec -T mongo mongosh -u "$ROOT_USER" -p "$ROOT_PASS" --authenticationDatabase admin --file "$INIT_DIR/02_indexes.js" --eval "DB_NAME='${DB_NAME}'"
 
-echo "🌱  Seeding sample recipes..."
-compose exec -T mongo mongoimport \
-  --username "$MONGO_INITDB_ROOT_USERNAME" \
-  --password "$MONGO_INITDB_ROOT_PASSWORD" \
-  --authenticationDatabase admin \
-  --db "$DB_NAME" --collection recipes \
-  --type json --file "$INIT_DIR/03_recipe_csv_sample.jsonl"
+echo "🌱  Loading recipes into Mongo, Qdrant and Postgres (single pass)..."
+JSONL_PATH="${JSONL_PATH:-$PROJECT_ROOT/mongoDB/init/03_recipe_csv_sample.jsonl}"
+if [ ! -f "$JSONL_PATH" ]; then
+  compose cp "mongo:$INIT_DIR/03_recipe_csv_sample.jsonl" "$JSONL_PATH"
+fi
+STATE_DIR="$PROJECT_ROOT/.catalog_load"
+mkdir -p "$STATE_DIR"
+compose up -d qdrant postgres >/dev/null
+# Runs in the backend image: it has the model stack, and the service names resolve there.
+compose run --rm --no-deps \
+  -v "$JSONL_PATH:/data/recipes.jsonl:ro" \
+  -v "$STATE_DIR:/state" \
+  -e MONGO_HOST=mongo -e MONGO_PORT=27017 \
+  backend python -m app.services.catalog_loader \
+  --jsonl /data/recipes.jsonl --sinks "${LOAD_SINKS:-mongo,qdrant,postgres}" \
+  --checkpoint /state/checkpoint.json --rejects /state/rejects.jsonl --restart
+echo "Rejected documents (if any): $STATE_DIR/rejects.jsonl"
 
 echo "✅ Mongo database rebuilt successfully!"
@@ -22,6 +22,9 @@ CREATE TABLE IF NOT EXISTS recipe_metadata (
     mongo_id VARCHAR(50),           -- links to MongoDB _id
     title VARCHAR(255),
     cuisine VARCHAR(100),
+    -- normalized lookup key (Mongo cuisines are kebab-case), indexed for exact matches;
+    -- same as recipe_repo.normalize_cuisine: each whitespace run becomes one '-'
+    cuisine_key VARCHAR(100) GENERATED ALWAYS AS (replace(btrim(regexp_replace(lower(cuisine), '\s+', ' ', 'g')), ' ', '-')) STORED,
     rating_avg DECIMAL(3,1),
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -33,4 +36,54 @@ CREATE TABLE IF NOT EXISTS analytics (
     event_type VARCHAR(50),
     event_details JSONB,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
\ No newline at end of file
+);
+
+-- ACTIVITY ROLLUPS (maintained incrementally by the analytics flusher)
+CREATE TABLE IF NOT EXISTS user_activity_rollup (
+    user_id INT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    event_count BIGINT NOT NULL DEFAULT 0,
+    last_activity TIMESTAMP NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS daily_activity_rollup (
+    activity_date DATE NOT NULL,
+    event_type VARCHAR(50) NOT NULL,
+    event_count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (activity_date, event_type)
+);
+
+-- TASTE VECTORS (decayed sum of the v_text vectors of recipes a user viewed / liked;
+-- folded in by the analytics flusher, see sql/queries/update_user_taste_from_stage.sql)
+CREATE TABLE IF NOT EXISTS user_taste (
+    user_id INT PRIMARY KEY REFERENCES users(user_id) ON DELETE CASCADE,
+    taste REAL[] NOT NULL,
+    weight DOUBLE PRECISION NOT NULL,
+    event_count BIGINT NOT NULL DEFAULT 0,
+    half_life_s DOUBLE PRECISION NOT NULL,
+    updated_at TIMESTAMP NOT NULL
+);
+
+-- Factor that decays a value from `since` to `until` (1 when until <= since).
+CREATE OR REPLACE FUNCTION taste_decay(since TIMESTAMP, until TIMESTAMP, half_life_s DOUBLE PRECISION)
+RETURNS DOUBLE PRECISION
+LANGUAGE sql IMMUTABLE AS $$
+    SELECT exp(-ln(2) * GREATEST(EXTRACT(EPOCH FROM until - since), 0) / half_life_s)
+$$;
+
+-- TOPICS AND FACET COUNTS (rebuilt by vectorDB/BERTopic/assign_topics.py)
+CREATE TABLE IF NOT EXISTS recipe_topics (
+    topic_id INT PRIMARY KEY,
+    label TEXT,
+    terms TEXT[] NOT NULL DEFAULT '{}'
+);
+
+-- One row per distinct (topic, cuisine, course, dietary tag set, allergen tag set);
+-- tag arrays are sorted, so equal sets share a row.
+CREATE TABLE IF NOT EXISTS recipe_facet_counts (
+    topic_id INT NOT NULL,
+    cuisine VARCHAR(100),
+    course VARCHAR(20),
+    dietary_tags TEXT[] NOT NULL,
+    allergen_tags TEXT[] NOT NULL,
+    recipe_count BIGINT NOT NULL
+);
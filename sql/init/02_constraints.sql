@@ -1,8 +1,12 @@
 -- Indexes for performance
 CREATE INDEX IF NOT EXISTS idx_user_email ON users(email);
+CREATE INDEX IF NOT EXISTS idx_user_created ON users(created_at DESC, user_id DESC);
+CREATE INDEX IF NOT EXISTS idx_user_email_lower ON users(lower(email));
 CREATE INDEX IF NOT EXISTS idx_userprefs_userid ON user_prefs(user_id);
 CREATE INDEX IF NOT EXISTS idx_recipe_cuisine ON recipe_metadata(cuisine);
 CREATE INDEX IF NOT EXISTS idx_recipe_rating ON recipe_metadata(rating_avg);
+CREATE INDEX IF NOT EXISTS idx_recipe_cuisine_key_rating ON recipe_metadata(cuisine_key, rating_avg DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_activity_rollup_recent ON user_activity_rollup(last_activity DESC, user_id DESC);
 
 -- Unique constraint to ensure no duplicate MongoDB IDs in recipe_metadata
 DO $$
@@ -18,3 +22,6 @@ BEGIN
     END IF;
 END
 $$;
+
+-- Popular-search scans for autocomplete (sql/queries/popular_searches.sql)
+CREATE INDEX IF NOT EXISTS idx_analytics_type_created ON analytics(event_type, created_at);
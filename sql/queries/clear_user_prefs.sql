@@ -0,0 +1,4 @@
+UPDATE user_prefs
+SET diet_type = '{}', allergies = '{}', dislikes = '{}', updated_at = CURRENT_TIMESTAMP
+WHERE user_id = :user_id
+RETURNING *;
@@ -0,0 +1,3 @@
+-- Full export, streamed through a server-side cursor; unordered so rows flow without a sort.
+SELECT user_id, email, created_at, diet_type, allergies, dislikes
+FROM user_profile_view;
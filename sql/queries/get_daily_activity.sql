@@ -0,0 +1,4 @@
+SELECT activity_date, event_type, event_count
+FROM daily_activity_rollup
+WHERE activity_date >= CURRENT_DATE - CAST(:days AS INT)
+ORDER BY activity_date DESC, event_type;
@@ -1,8 +1,12 @@
-SELECT 
+-- Keyset page over the per-user rollup (newest activity first).
+-- Pass the last row's (last_activity, user_id) to fetch the next page.
+SELECT
+    u.user_id,
     u.email,
-    COUNT(a.event_id) AS activity_count,
-    MAX(a.created_at) AS last_activity
-FROM users u
-LEFT JOIN analytics a ON u.user_id = a.user_id
-GROUP BY u.user_id, u.email
-ORDER BY last_activity DESC NULLS LAST;
\ No newline at end of file
+    r.event_count AS activity_count,
+    r.last_activity
+FROM user_activity_rollup r
+JOIN users u ON u.user_id = r.user_id
+WHERE (r.last_activity, r.user_id) < (CAST(:after_last_activity AS TIMESTAMP), CAST(:after_user_id AS INT))
+ORDER BY r.last_activity DESC, r.user_id DESC
+LIMIT :limit;
@@ -0,0 +1,17 @@
+-- Set-based load of a COPY-staged batch into users + user_prefs.
+-- Existing emails are skipped (and get no second prefs row).
+WITH batch AS (
+    SELECT DISTINCT ON (email) email, password_hash, diet_type, allergies, dislikes
+    FROM users_import_stage
+    ORDER BY email
+),
+new_users AS (
+    INSERT INTO users (email, password_hash)
+    SELECT email, password_hash FROM batch
+    ON CONFLICT (email) DO NOTHING
+    RETURNING user_id, email
+)
+INSERT INTO user_prefs (user_id, diet_type, allergies, dislikes)
+SELECT n.user_id, b.diet_type, b.allergies, b.dislikes
+FROM new_users n
+JOIN batch b ON b.email = n.email;
@@ -0,0 +1,6 @@
+-- Move a COPY-loaded batch from the session staging table into analytics.
+-- Events for unknown users are kept with a NULL user_id (same as ON DELETE SET NULL).
+INSERT INTO analytics (user_id, event_type, event_details, created_at)
+SELECT u.user_id, s.event_type, s.event_details, s.created_at
+FROM analytics_stage s
+LEFT JOIN users u ON u.user_id = s.user_id;
@@ -1,3 +1,3 @@
 INSERT INTO user_prefs (user_id, diet_type, allergies, dislikes)
-VALUES (:user_id, :diet_type, :allergies, :dislikes)
-RETURNING *;
\ No newline at end of file
+VALUES (:user_id, CAST(:diet_type AS TEXT[]), CAST(:allergies AS TEXT[]), CAST(:dislikes AS TEXT[]))
+RETURNING *;
@@ -0,0 +1,28 @@
+-- Add/remove preference values in one atomic statement (no read-modify-write race).
+-- Existing order is kept, new values are appended, duplicates are removed in SQL.
+UPDATE user_prefs p
+SET
+    diet_type = ARRAY(
+        SELECT v
+        FROM unnest(coalesce(p.diet_type, '{}') || CAST(:add_diet_type AS TEXT[])) WITH ORDINALITY AS t(v, i)
+        WHERE NOT (v = ANY(CAST(:remove_diet_type AS TEXT[])))
+        GROUP BY v
+        ORDER BY min(i)
+    ),
+    allergies = ARRAY(
+        SELECT v
+        FROM unnest(coalesce(p.allergies, '{}') || CAST(:add_allergies AS TEXT[])) WITH ORDINALITY AS t(v, i)
+        WHERE NOT (v = ANY(CAST(:remove_allergies AS TEXT[])))
+        GROUP BY v
+        ORDER BY min(i)
+    ),
+    dislikes = ARRAY(
+        SELECT v
+        FROM unnest(coalesce(p.dislikes, '{}') || CAST(:add_dislikes AS TEXT[])) WITH ORDINALITY AS t(v, i)
+        WHERE NOT (v = ANY(CAST(:remove_dislikes AS TEXT[])))
+        GROUP BY v
+        ORDER BY min(i)
+    ),
+    updated_at = CURRENT_TIMESTAMP
+WHERE p.user_id = :user_id
+RETURNING p.*;
@@ -0,0 +1,28 @@
+-- Apply the same add/remove patch to many users in one statement.
+UPDATE user_prefs p
+SET
+    diet_type = ARRAY(
+        SELECT v
+        FROM unnest(coalesce(p.diet_type, '{}') || CAST(:add_diet_type AS TEXT[])) WITH ORDINALITY AS t(v, i)
+        WHERE NOT (v = ANY(CAST(:remove_diet_type AS TEXT[])))
+        GROUP BY v
+        ORDER BY min(i)
+    ),
+    allergies = ARRAY(
+        SELECT v
+        FROM unnest(coalesce(p.allergies, '{}') || CAST(:add_allergies AS TEXT[])) WITH ORDINALITY AS t(v, i)
+        WHERE NOT (v = ANY(CAST(:remove_allergies AS TEXT[])))
+        GROUP BY v
+        ORDER BY min(i)
+    ),
+    dislikes = ARRAY(
+        SELECT v
+        FROM unnest(coalesce(p.dislikes, '{}') || CAST(:add_dislikes AS TEXT[])) WITH ORDINALITY AS t(v, i)
+        WHERE NOT (v = ANY(CAST(:remove_dislikes AS TEXT[])))
+        GROUP BY v
+        ORDER BY min(i)
+    ),
+    updated_at = CURRENT_TIMESTAMP
+FROM (SELECT DISTINCT unnest(CAST(:user_ids AS INT[])) AS user_id) AS targets
+WHERE p.user_id = targets.user_id
+RETURNING p.user_id;
@@ -0,0 +1,14 @@
+-- Search queries used by the most distinct users in the last N days (normalized like
+-- the search path does), skipping searches that returned nothing. Counting users, not
+-- events, keeps one user's repeated private query out of everyone's suggestions.
+SELECT lower(regexp_replace(btrim(event_details->>'query'), '\s+', ' ', 'g')) AS query,
+       COUNT(DISTINCT user_id) AS searches
+FROM analytics
+WHERE event_type = 'search'
+  AND created_at >= (now() AT TIME ZONE 'UTC') - make_interval(days => CAST(:days AS INT))
+  AND event_details->>'query' IS NOT NULL
+  AND COALESCE(event_details->>'results', '1') <> '0'
+GROUP BY 1
+HAVING COUNT(DISTINCT user_id) >= :min_count
+ORDER BY searches DESC
+LIMIT :limit;
@@ -0,0 +1,25 @@
+-- Recipes per facet value among those with every :diet tag and none of the :allergies,
+-- summed from the precomputed recipe_facet_counts (no scan of the recipes themselves).
+WITH matching AS (
+    SELECT topic_id, cuisine, course, dietary_tags, recipe_count
+    FROM recipe_facet_counts
+    WHERE dietary_tags @> CAST(:diet AS TEXT[])
+      AND NOT (allergen_tags && CAST(:allergies AS TEXT[]))
+),
+facets AS (
+    SELECT 'topic' AS facet, m.topic_id::TEXT AS value, t.label, SUM(m.recipe_count) AS count
+    FROM matching m
+    LEFT JOIN recipe_topics t ON t.topic_id = m.topic_id
+    GROUP BY m.topic_id, t.label
+    UNION ALL
+    SELECT 'cuisine', cuisine, NULL, SUM(recipe_count) FROM matching GROUP BY cuisine
+    UNION ALL
+    SELECT 'course', course, NULL, SUM(recipe_count) FROM matching GROUP BY course
+    UNION ALL
+    SELECT 'dietary_tag', tag, NULL, SUM(recipe_count)
+    FROM matching, unnest(dietary_tags) AS tag
+    GROUP BY tag
+)
+SELECT facet, value, label, count
+FROM facets
+ORDER BY facet, count DESC, value;
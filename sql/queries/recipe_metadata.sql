@@ -1,5 +1,5 @@
-SELECT title, cuisine, rating_avg
+SELECT mongo_id, title, cuisine, rating_avg
 FROM recipe_metadata
-WHERE cuisine ILIKE $1
-ORDER BY rating_avg DESC
-LIMIT 10;
\ No newline at end of file
+WHERE cuisine_key = :cuisine
+ORDER BY rating_avg DESC NULLS LAST
+LIMIT :limit;
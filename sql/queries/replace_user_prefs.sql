@@ -0,0 +1,8 @@
+UPDATE user_prefs
+SET 
+    diet_type = CAST(:diet_type AS TEXT[]),
+    allergies = CAST(:allergies AS TEXT[]),
+    dislikes = CAST(:dislikes AS TEXT[]),
+    updated_at = CURRENT_TIMESTAMP
+WHERE user_id = :user_id
+RETURNING *;
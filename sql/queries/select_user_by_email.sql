@@ -0,0 +1,4 @@
+-- Case-insensitive, like the login form's matching; served by idx_user_email_lower.
+SELECT user_id, email, created_at
+FROM users
+WHERE lower(email) = lower(:email);
@@ -0,0 +1,6 @@
+-- Taste vector with its weight decayed to now (timestamps are stored as UTC).
+SELECT taste,
+       weight * taste_decay(updated_at, (now() AT TIME ZONE 'UTC')::TIMESTAMP, half_life_s) AS weight,
+       event_count
+FROM user_taste
+WHERE user_id = :user_id;
@@ -1,3 +1,6 @@
+-- Keyset page, newest first. Pass the last row's (created_at, user_id) to fetch the next page.
 SELECT user_id, email, created_at
 FROM users
-ORDER BY created_at DESC;
\ No newline at end of file
+WHERE (created_at, user_id) < (CAST(:after_created_at AS TIMESTAMP), CAST(:after_user_id AS INT))
+ORDER BY created_at DESC, user_id DESC
+LIMIT :limit;
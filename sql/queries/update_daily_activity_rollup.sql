@@ -0,0 +1,8 @@
+-- Fold the staged analytics batch into the per-day rollup.
+INSERT INTO daily_activity_rollup AS r (activity_date, event_type, event_count)
+SELECT CAST(s.created_at AS DATE), s.event_type, COUNT(*)
+FROM analytics_stage s
+GROUP BY 1, 2
+ORDER BY 1, 2
+ON CONFLICT (activity_date, event_type) DO UPDATE
+SET event_count = r.event_count + EXCLUDED.event_count;
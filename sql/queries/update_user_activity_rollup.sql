@@ -0,0 +1,11 @@
+-- Fold the staged analytics batch into the per-user rollup.
+-- Rows are upserted in user_id order so concurrent flushers lock in the same order.
+INSERT INTO user_activity_rollup AS r (user_id, event_count, last_activity)
+SELECT u.user_id, COUNT(*), MAX(s.created_at)
+FROM analytics_stage s
+JOIN users u ON u.user_id = s.user_id
+GROUP BY u.user_id
+ORDER BY u.user_id
+ON CONFLICT (user_id) DO UPDATE
+SET event_count = r.event_count + EXCLUDED.event_count,
+    last_activity = GREATEST(r.last_activity, EXCLUDED.last_activity);
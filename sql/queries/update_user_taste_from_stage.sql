@@ -0,0 +1,27 @@
+-- Fold the staged taste increments (one row per user, decayed to its own updated_at)
+-- into user_taste. Both sides are decayed to the later of the two timestamps and added
+-- under the row lock: O(dim) per user and safe against concurrent flushers.
+INSERT INTO user_taste AS t (user_id, taste, weight, event_count, half_life_s, updated_at)
+SELECT s.user_id, s.taste, s.weight, s.event_count, s.half_life_s, s.updated_at
+FROM taste_stage s
+JOIN users u ON u.user_id = s.user_id
+ORDER BY s.user_id
+ON CONFLICT (user_id) DO UPDATE
+SET taste = CASE
+        -- another dimension means the embedding model changed: start over
+        WHEN cardinality(t.taste) <> cardinality(EXCLUDED.taste) THEN EXCLUDED.taste
+        ELSE ARRAY(
+            SELECT prev * taste_decay(t.updated_at, EXCLUDED.updated_at, EXCLUDED.half_life_s)
+                 + incr * taste_decay(EXCLUDED.updated_at, t.updated_at, EXCLUDED.half_life_s)
+            FROM unnest(t.taste, EXCLUDED.taste) WITH ORDINALITY AS x(prev, incr, i)
+            ORDER BY i
+        )::REAL[]
+    END,
+    weight = CASE
+        WHEN cardinality(t.taste) <> cardinality(EXCLUDED.taste) THEN EXCLUDED.weight
+        ELSE t.weight * taste_decay(t.updated_at, EXCLUDED.updated_at, EXCLUDED.half_life_s)
+           + EXCLUDED.weight * taste_decay(EXCLUDED.updated_at, t.updated_at, EXCLUDED.half_life_s)
+    END,
+    event_count = t.event_count + EXCLUDED.event_count,
+    half_life_s = EXCLUDED.half_life_s,
+    updated_at = GREATEST(t.updated_at, EXCLUDED.updated_at);
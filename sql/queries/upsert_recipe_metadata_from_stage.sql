@@ -0,0 +1,12 @@
+-- Merge a COPY-loaded batch from the session staging table into recipe_metadata.
+-- Unchanged rows are skipped so re-syncs do not rewrite the whole table.
+INSERT INTO recipe_metadata AS m (mongo_id, title, cuisine, rating_avg)
+SELECT DISTINCT ON (mongo_id) mongo_id, title, cuisine, rating_avg
+FROM recipe_metadata_stage
+ORDER BY mongo_id
+ON CONFLICT (mongo_id) DO UPDATE
+SET title = EXCLUDED.title,
+    cuisine = EXCLUDED.cuisine,
+    rating_avg = EXCLUDED.rating_avg
+WHERE (m.title, m.cuisine, m.rating_avg)
+    IS DISTINCT FROM (EXCLUDED.title, EXCLUDED.cuisine, EXCLUDED.rating_avg);
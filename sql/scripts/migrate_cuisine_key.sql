@@ -0,0 +1,13 @@
+-- One-off migration for databases created before cuisine_key collapsed whitespace runs
+-- (sql/init only runs on an empty data directory). Generated expressions cannot be
+-- altered in place, so the column is rebuilt; dropping it drops its index too.
+-- Rewrites recipe_metadata and locks it for the duration.
+-- Run: psql -v ON_ERROR_STOP=1 -f sql/scripts/migrate_cuisine_key.sql
+BEGIN;
+
+ALTER TABLE recipe_metadata DROP COLUMN IF EXISTS cuisine_key;
+ALTER TABLE recipe_metadata ADD COLUMN cuisine_key VARCHAR(100)
+    GENERATED ALWAYS AS (replace(btrim(regexp_replace(lower(cuisine), '\s+', ' ', 'g')), ' ', '-')) STORED;
+CREATE INDEX IF NOT EXISTS idx_recipe_cuisine_key_rating ON recipe_metadata(cuisine_key, rating_avg DESC NULLS LAST);
+
+COMMIT;
@@ -0,0 +1,21 @@
+-- One-off backfill: recompute both rollups from the full analytics history.
+-- Blocks concurrent flushes for the duration so no batch is counted twice.
+-- Run: psql -v ON_ERROR_STOP=1 -f sql/scripts/rebuild_activity_rollups.sql
+BEGIN;
+LOCK TABLE analytics IN SHARE ROW EXCLUSIVE MODE;
+
+TRUNCATE user_activity_rollup, daily_activity_rollup;
+
+INSERT INTO user_activity_rollup (user_id, event_count, last_activity)
+SELECT user_id, COUNT(*), MAX(created_at)
+FROM analytics
+WHERE user_id IS NOT NULL AND created_at IS NOT NULL
+GROUP BY user_id;
+
+INSERT INTO daily_activity_rollup (activity_date, event_type, event_count)
+SELECT CAST(created_at AS DATE), event_type, COUNT(*)
+FROM analytics
+WHERE created_at IS NOT NULL AND event_type IS NOT NULL
+GROUP BY 1, 2;
+
+COMMIT;
@@ -1,13 +1,33 @@
+"""
+Fit the recipe topic model.
+
+Draws a uniform sample of SAMPLE_SIZE recipes from the JSONL in one pass
+(reservoir sampling, so memory is O(sample) however large the file is). It then
+reuses the `v_text` embeddings already stored for them, so fitting costs only
+UMAP / HDBSCAN / c-TF-IDF and the sample is never re-encoded. The embeddings
+come from Qdrant, or from an exported vector directory when VECTORS_DIR is set
+(ids.npy + v_text.npy, see vectorDB/data/export_local_index.py).
+
+Env vars (all optional; Qdrant / model settings: see topic_data.py):
+  JSONL_PATH=mongoDB/init/03_recipe_csv_sample.jsonl
+  ARTIFACT_DIR=vectorDB/BERTartifact
+  SAMPLE_SIZE=100000
+  VECTORS_DIR=
+"""
+
 from bertopic import BERTopic
-from sentence_transformers import SentenceTransformer
 from sklearn.feature_extraction.text import CountVectorizer
 from pathlib import Path
 import json, random, os, warnings
 
+from topic_data import MODEL_NAME, iter_docs, load_embeddings, reservoir_sample, text_input
+
 # --- config ---
-JSONL = Path("/mongoDB/init/03_recipe_csv_sample.jsonl")
-SAMPLE_SIZE = 100_000
-ARTIFACT_DIR = Path("/vectorDB/BERTartifact")
+REPO_ROOT = Path(__file__).resolve().parents[2]
+JSONL = Path(os.getenv("JSONL_PATH", REPO_ROOT / "mongoDB/init/03_recipe_csv_sample.jsonl"))
+SAMPLE_SIZE = int(os.getenv("SAMPLE_SIZE", "100000"))
+ARTIFACT_DIR = Path(os.getenv("ARTIFACT_DIR", REPO_ROOT / "vectorDB/BERTartifact"))
+VECTORS_DIR = Path(os.environ["VECTORS_DIR"]) if os.getenv("VECTORS_DIR") else None
 ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
 
 # Optional: suppress the known hdbscan warnings you saw
@@ -15,39 +35,22 @@ with warnings.catch_warnings():
     warnings.filterwarnings("ignore", message="invalid escape sequence.*", category=SyntaxWarning)
 
 # Reproducibility
-random.seed(42)
-
-def iter_docs(path: Path):
-    with path.open("r", encoding="utf-8") as f:
-        for line in f:
-            s = line.strip()
-            if s:
-                yield json.loads(s)
-
-def text_of(doc: dict) -> str:
-    title = (doc.get("title") or "").strip()
-    steps = " ".join(doc.get("steps") or [])
-    return f"{title}. {steps}".strip()
-
-# 1) sample
-# 1) sample
-docs = [(d.get("slug") or "", text_of(d)) for d in iter_docs(JSONL)]
-# keep only docs that actually have a slug/text
-docs = [(s, t) for (s, t) in docs if s and t]
-random.shuffle(docs)
+rng = random.Random(42)
 
-if len(docs) > SAMPLE_SIZE:
-    docs = docs[:SAMPLE_SIZE]
+# 1) sample: one pass over the file, only the sample is kept
+# keep only docs that actually have a slug/text
+candidates = ((d.get("slug") or "", text_input(d)) for d in iter_docs(JSONL))
+docs = reservoir_sample(((s, t) for (s, t) in candidates if s and t), SAMPLE_SIZE, rng)
 
 slugs, texts = zip(*docs) if docs else ([], [])
 
-
-
 if not texts:
     raise SystemExit("No texts found — check JSONL path or data.")
 
-# 2) model & vectorizer
-st_model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+# 2) embeddings: the stored v_text vectors (same model and input text), not a re-encode
+embeddings = load_embeddings(slugs, texts, VECTORS_DIR)
+
+# 3) model & vectorizer
 vectorizer_model = CountVectorizer(
     ngram_range=(1, 2),
     stop_words="english",
@@ -55,16 +58,16 @@ vectorizer_model = CountVectorizer(
 )
 
 topic_model = BERTopic(
-    embedding_model=st_model,
+    embedding_model=MODEL_NAME,  # only used to transform new texts later; fitting uses `embeddings`
     vectorizer_model=vectorizer_model,
     low_memory=True,      # better for big corpora
     min_topic_size=300,   # broader, cleaner topics; reduce later for more granularity
     verbose=True
 )
 
-topics, probs = topic_model.fit_transform(list(texts))
+topics, probs = topic_model.fit_transform(list(texts), embeddings=embeddings)
 
-# 3) inspect + save
+# 4) inspect + save
 topic_info = topic_model.get_topic_info()
 print(topic_info.head(10))
 
@@ -81,4 +84,4 @@ for topic_id in topic_info["Topic"]:
 with (ARTIFACT_DIR / "topic_terms.json").open("w", encoding="utf-8") as f:
     json.dump(terms_json, f, ensure_ascii=False, indent=2)
 
-print(f"Saved to {ARTIFACT_DIR}/ (model, topic_info.csv, topic_terms.json)")
\ No newline at end of file
+print(f"Saved to {ARTIFACT_DIR}/ (model, topic_info.csv, topic_terms.json)")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Assign a topic to every recipe with the saved BERTopic model and rebuild the facet counts.
+
+Scrolls the Qdrant collection in chunks (payload + stored v_text vector). Nothing
+is re-encoded: the model only runs its UMAP / HDBSCAN prediction on the stored
+embeddings. For each chunk:
+  * Qdrant: `topic_id` is set in the payload in one batch request (one set-payload
+    operation per topic);
+  * Mongo: one unordered bulk_write, one UpdateMany({slug: {$in: ...}}) per topic,
+    running while the next chunk is predicted.
+Counts per (topic, cuisine, course, dietary tags, allergen tags) are accumulated
+from the payloads. At the end they replace Postgres `recipe_facet_counts`, and
+the labels from topic_terms.json replace `recipe_topics`, in one transaction.
+That table serves GET /recipes/facets.
+
+Usage:
+  python vectorDB/BERTopic/assign_topics.py [--chunk-size 5000] [--artifact-dir vectorDB/BERTartifact]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from bertopic import BERTopic
+from pymongo import UpdateMany
+from qdrant_client.models import PayloadSchemaType, SetPayload, SetPayloadOperation
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.core.config import settings  # noqa: E402
+from app.core.db import engine, raw_connection  # noqa: E402
+from app.core.mongo import get_mongo_database  # noqa: E402
+from app.core.qdrant import get_qdrant_client  # noqa: E402
+from app.repositories.recipe_repo import FacetCountRow, replace_facet_counts  # noqa: E402
+
+logger = logging.getLogger("assign_topics")
+
+TEXT_VECTOR_NAME = "v_text"
+FacetKey = Tuple[int, Optional[str], Optional[str], Tuple[str, ...], Tuple[str, ...]]
+
+
+def facet_key(payload: Dict[str, Any], topic_id: int) -> FacetKey:
+    cuisine = payload.get("cuisine")
+    course = payload.get("course")
+    return (
+        topic_id,
+        cuisine[:100] if isinstance(cuisine, str) else None,
+        course if isinstance(course, str) else None,
+        tuple(sorted(set(payload.get("dietary_tags") or []))),
+        tuple(sorted(set(payload.get("allergen_tags") or []))),
+    )
+
+
+def load_topic_labels(artifact_dir: Path) -> List[Tuple[int, Optional[str], List[str]]]:
+    """(topic_id, label, terms) rows from topic_terms.json; -1 is BERTopic's outlier topic."""
+    terms_by_topic = json.loads((artifact_dir / "topic_terms.json").read_text(encoding="utf-8"))
+    rows = [(-1, "outliers", [])]
+    for topic_id, terms in sorted(terms_by_topic.items(), key=lambda item: int(item[0])):
+        rows.append((int(topic_id), ", ".join(terms[:3]) or None, list(terms)))
+    return rows
+
+
+async def assign_topics(model: BERTopic, chunk_size: int) -> Counter:
+    client = get_qdrant_client()
+    collection = settings.QDRANT_COLLECTION
+    recipes = get_mongo_database().recipes
+    await asyncio.to_thread(
+        client.create_payload_index, collection, "topic_id", field_schema=PayloadSchemaType.INTEGER
+    )
+
+    counts: Counter = Counter()
+    pending: Optional[asyncio.Task] = None
+    offset = None
+    done = 0
+    started = time.perf_counter()
+    while True:
+        points, offset = await asyncio.to_thread(
+            client.scroll,
+            collection,
+            limit=chunk_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=[TEXT_VECTOR_NAME],
+        )
+        if not points:
+            break
+        vectors = np.asarray([p.vector[TEXT_VECTOR_NAME] for p in points], dtype=np.float32)
+        titles = [(p.payload or {}).get("title") or "" for p in points]
+        topics, _ = await asyncio.to_thread(lambda: model.transform(titles, embeddings=vectors))
+
+        ids_by_topic: Dict[int, List[int]] = defaultdict(list)
+        slugs_by_topic: Dict[int, List[str]] = defaultdict(list)
+        for point, topic in zip(points, topics):
+            topic_id = int(topic)
+            payload = point.payload or {}
+            ids_by_topic[topic_id].append(point.id)
+            if payload.get("slug"):
+                slugs_by_topic[topic_id].append(payload["slug"])
+            counts[facet_key(payload, topic_id)] += 1
+
+        await asyncio.to_thread(
+            client.batch_update_points,
+            collection,
+            [
+                SetPayloadOperation(set_payload=SetPayload(payload={"topic_id": topic_id}, points=ids))
+                for topic_id, ids in ids_by_topic.items()
+            ],
+        )
+        if pending is not None:
+            await pending
+        updates = [UpdateMany({"slug": {"$in": slugs}}, {"$set": {"topic_id": t}}) for t, slugs in slugs_by_topic.items()]
+        pending = asyncio.create_task(recipes.bulk_write(updates, ordered=False)) if updates else None
+
+        done += len(points)
+        logger.info("Assigned topics to %d recipes (%.0f/s)", done, done / (time.perf_counter() - started))
+        if offset is None:
+            break
+
+    if pending is not None:
+        await pending
+    return counts
+
+
+async def main(artifact_dir: Path, chunk_size: int) -> None:
+    model = BERTopic.load(str(artifact_dir / "bertopic_model"))
+    try:
+        counts = await assign_topics(model, chunk_size)
+        rows = [FacetCountRow(t, cuisine, course, list(diet), list(allergens), n)
+                for (t, cuisine, course, diet, allergens), n in counts.items()]
+        async with raw_connection() as conn:
+            async with conn.transaction():
+                await replace_facet_counts(conn, rows, load_topic_labels(artifact_dir))
+    finally:
+        await engine.dispose()
+    logger.info("Wrote %d facet count rows for %d recipes", len(rows), sum(counts.values()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--artifact-dir", type=Path, default=REPO_ROOT / "vectorDB/BERTartifact")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    asyncio.run(main(args.artifact_dir, args.chunk_size))
@@ -0,0 +1,120 @@
+# vectorDB/BERTopic/topic_data.py
+"""
+Input helpers shared by the topic scripts (BERTopic.py, assign_topics.py).
+
+- `iter_docs`: stream the recipe JSONL. `text_input` and `stable_id` come from
+  app.core.catalog, so the topic text is what `v_text` embeds (title + steps)
+  and point ids match the ingest.
+- `reservoir_sample`: uniform sample of k items in one pass with O(k) memory.
+- `load_embeddings`: the stored `v_text` vectors for a list of slugs, either
+  from an exported vector directory (ids.npy + v_text.npy, as written by
+  vectorDB/data/export_local_index.py) or fetched from Qdrant by `stable_id`.
+  Slugs with no stored vector are encoded with the model as a fallback.
+
+Env vars (all optional):
+  QDRANT_URL=http://localhost:6333
+  QDRANT_API_KEY=
+  QDRANT_COLLECTION=recipes
+  EMBED_MODEL=sentence-transformers/all-MiniLM-L6-v2
+"""
+
+import json
+import os
+import random
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.core.catalog import TEXT_VECTOR_NAME, stable_id, text_input  # noqa: E402
+
+QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
+QDRANT_API_KEY = os.getenv("QDRANT_API_KEY") or None
+COLLECTION = os.getenv("QDRANT_COLLECTION", "recipes")
+MODEL_NAME = os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+FETCH_BATCH = 1000
+
+T = TypeVar("T")
+
+
+def iter_docs(path: Path) -> Iterator[dict]:
+    with path.open("r", encoding="utf-8") as f:
+        for line in f:
+            s = line.strip()
+            if s:
+                yield json.loads(s)
+
+
+def reservoir_sample(items: Iterable[T], k: int, rng: random.Random) -> List[T]:
+    """Uniform sample of up to k items (Algorithm R): one pass, O(k) memory."""
+    sample: List[T] = []
+    for n, item in enumerate(items):
+        if n < k:
+            sample.append(item)
+        else:
+            j = rng.randint(0, n)
+            if j < k:
+                sample[j] = item
+    return sample
+
+
+def _from_directory(directory: Path, ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Rows for `ids` from an exported ids.npy / v_text.npy pair; returns (vectors, found mask)."""
+    stored_ids = np.load(directory / "ids.npy")
+    vectors = np.load(directory / "v_text.npy", mmap_mode="r")
+    if len(stored_ids) == 0:
+        return np.zeros((len(ids), vectors.shape[1]), dtype=np.float32), np.zeros(len(ids), dtype=bool)
+    order = np.argsort(stored_ids)
+    pos = np.searchsorted(stored_ids, ids, sorter=order)
+    pos = np.minimum(pos, len(stored_ids) - 1)
+    rows = order[pos]
+    found = stored_ids[rows] == ids
+    out = np.zeros((len(ids), vectors.shape[1]), dtype=np.float32)
+    out[found] = vectors[rows[found]]
+    return out, found
+
+
+def _from_qdrant(ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    from qdrant_client import QdrantClient
+
+    client = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, timeout=120.0, check_compatibility=False)
+    fetched: Dict[int, List[float]] = {}
+    for start in range(0, len(ids), FETCH_BATCH):
+        points = client.retrieve(
+            collection_name=COLLECTION,
+            ids=[int(i) for i in ids[start:start + FETCH_BATCH]],
+            with_vectors=[TEXT_VECTOR_NAME],
+            with_payload=False,
+        )
+        for p in points:
+            fetched[int(p.id)] = p.vector[TEXT_VECTOR_NAME]
+    dim = len(next(iter(fetched.values()))) if fetched else 0
+    out = np.zeros((len(ids), dim), dtype=np.float32)
+    found = np.zeros(len(ids), dtype=bool)
+    for row, point_id in enumerate(ids):
+        vector = fetched.get(int(point_id))
+        if vector is not None:
+            out[row] = vector
+            found[row] = True
+    return out, found
+
+
+def load_embeddings(slugs: Sequence[str], texts: Sequence[str], vectors_dir: Optional[Path] = None) -> np.ndarray:
+    """Stored v_text vectors for `slugs` (from `vectors_dir` or Qdrant); misses are encoded from `texts`."""
+    ids = np.fromiter((stable_id(s) for s in slugs), dtype=np.int64, count=len(slugs))
+    out, found = _from_directory(vectors_dir, ids) if vectors_dir else _from_qdrant(ids)
+    missing = np.flatnonzero(~found)
+    print(f"Reusing {int(found.sum())}/{len(slugs)} stored embeddings; encoding {len(missing)}")
+    if len(missing):
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(MODEL_NAME)
+        encoded = model.encode([texts[i] for i in missing], normalize_embeddings=True, show_progress_bar=True)
+        if out.shape[1] == 0:
+            out = np.zeros((len(slugs), encoded.shape[1]), dtype=np.float32)
+        out[missing] = encoded
+    return out
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Export the Qdrant recipe collection for the in-process vector index.
+
+Scrolls every point (v_text vector + payload) and writes the artifacts read
+by app/core/local_vectors.py:
+  meta.json, v_text.npy (float32, L2-normalized), ids.npy,
+  payload.jsonl, payload_offsets.npy
+
+Files are written to a temporary directory next to the target and swapped in
+at the end, so a running API never sees a half-written export.
+
+Usage:
+  python vectorDB/data/export_local_index.py --out data/local_vectors [--collection recipes] [--qdrant-url URL]
+Defaults come from the API settings (QDRANT_URL, QDRANT_COLLECTION, LOCAL_VECTOR_DIR).
+"""
+
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from qdrant_client import QdrantClient
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+
+from app.core.config import settings  # noqa: E402
+
+TEXT_VECTOR_NAME = "v_text"
+PAGE_SIZE = 1024
+
+
+def export(client: QdrantClient, collection: str, out: Path) -> int:
+    info = client.get_collection(collection)
+    vectors_config = info.config.params.vectors
+    dim = vectors_config[TEXT_VECTOR_NAME].size
+    count = client.count(collection, exact=True).count
+
+    tmp = out.with_name(out.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    vectors = open_memmap(tmp / "v_text.npy", mode="w+", dtype=np.float32, shape=(count, dim))
+    ids = np.empty(count, dtype=np.int64)
+    offsets = np.zeros(count + 1, dtype=np.int64)
+
+    row = 0
+    offset = None
+    with (tmp / "payload.jsonl").open("wb") as payloads:
+        while True:
+            points, offset = client.scroll(
+                collection,
+                limit=PAGE_SIZE,
+                offset=offset,
+                with_payload=True,
+                with_vectors=[TEXT_VECTOR_NAME],
+            )
+            for point in points:
+                if row >= count:
+                    raise RuntimeError(f"{collection} grew during the export; re-run it")
+                vector = np.asarray(point.vector[TEXT_VECTOR_NAME], dtype=np.float32)
+                vectors[row] = vector / max(float(np.linalg.norm(vector)), 1e-12)
+                ids[row] = int(point.id)
+                line = json.dumps(point.payload or {}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                payloads.write(line + b"\n")
+                offsets[row + 1] = offsets[row] + len(line) + 1
+                row += 1
+            print(f"\rexported {row}/{count}", end="", flush=True)
+            if offset is None:
+                break
+    print()
+
+    if row != count:
+        raise RuntimeError(f"{collection}: scrolled {row} points, expected {count}; re-run the export")
+    vectors.flush()
+    del vectors
+    np.save(tmp / "ids.npy", ids)
+    np.save(tmp / "payload_offsets.npy", offsets)
+    meta = {"model": settings.EMBEDDING_MODEL_NAME, "dimension": dim, "count": count, "collection": collection}
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2))
+
+    if out.exists():
+        shutil.rmtree(out)
+    tmp.rename(out)
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", type=Path, default=Path(settings.LOCAL_VECTOR_DIR) if settings.LOCAL_VECTOR_DIR else None)
+    parser.add_argument("--collection", default=settings.QDRANT_COLLECTION)
+    parser.add_argument("--qdrant-url", default=settings.QDRANT_URL)
+    args = parser.parse_args()
+    if args.out is None:
+        parser.error("--out is required when LOCAL_VECTOR_DIR is not set")
+
+    client = QdrantClient(url=args.qdrant_url, api_key=settings.QDRANT_API_KEY, timeout=120.0)
+    count = export(client, args.collection, args.out)
+    print(f"Wrote {count} points to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,8 @@ Reads:  init/03_recipe_csv_sample.jsonl
 Writes: Qdrant collection with two named vectors:
         - v_text         : embedding of title + steps
         - v_ingredients  : embedding of ingredient_tags (bag)
+        payload from app.core.catalog.build_payload, including the `mongo_id`
+        the catalog loader gives the document (kept when the JSONL has an `_id`)
 
 Env vars (all optional):
   QDRANT_HOST=localhost
@@ -20,9 +22,11 @@ Env vars (all optional):
   CKPT_FILE=.qdrant_ingest.ckpt
 """
 
-import os, json, sys, hashlib, time
+import os, sys, time
 from pathlib import Path
-from typing import Dict, Any, Iterable, List
+from typing import Dict, Any, Iterable, List, Tuple
+
+from bson import json_util
 
 from tqdm import tqdm
 from sentence_transformers import SentenceTransformer
@@ -35,6 +39,20 @@ from qdrant_client.models import (
     PointStruct,
 )
 
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT))
+
+# Same embedding inputs, point ids, payload and Mongo _ids as the catalog loader / sync worker
+from app.core.catalog import (  # noqa: E402
+    ING_VECTOR_NAME,
+    TEXT_VECTOR_NAME,
+    build_payload,
+    ingredient_input,
+    recipe_id,
+    stable_id,
+    text_input,
+)
+
 # ---------------------- Config ----------------------
 HOST = os.getenv("QDRANT_HOST", "127.0.0.1")        # force IPv4 to avoid ::1 issues
 PORT = int(os.getenv("QDRANT_PORT", "6333"))
@@ -47,9 +65,6 @@ JSONL_PATH = Path(os.getenv("JSONL_PATH", "/Users/Lorena/Developer/FlavorNet/mon
 BATCH_SIZE = int(os.getenv("BATCH_SIZE", "128"))
 CKPT_FILE = Path(os.getenv("CKPT_FILE", ".qdrant_ingest.ckpt"))
 
-TEXT_VECTOR_NAME = "v_text"
-ING_VECTOR_NAME  = "v_ingredients"
-
 
 # ---------------------- Helpers ----------------------
 class QdrantUnavailable(RuntimeError):
@@ -60,11 +75,6 @@ class QdrantUnavailable(RuntimeError):
         self.last_error = last_error
 
 
-def stable_id(slug: str) -> int:
-    """Deterministic positive int id."""
-    h = hashlib.sha256((slug or "").encode("utf-8")).hexdigest()
-    return int(h[:15], 16)
-
 def make_client(use_grpc: bool = True) -> QdrantClient:
     """Create a Qdrant client; prefer gRPC when available."""
     return QdrantClient(
@@ -77,38 +87,16 @@ def make_client(use_grpc: bool = True) -> QdrantClient:
         check_compatibility=False,  # your client/server versions differ
     )
 
-def build_text_input(doc: Dict[str, Any]) -> str:
-    title = (doc.get("title") or "").strip()
-    steps = " ".join(doc.get("steps") or [])
-    return f"{title}. {steps}".strip()
-
-def build_ing_input(doc: Dict[str, Any]) -> str:
-    tags = doc.get("ingredient_tags") or []
-    return " ".join(tags)
-
-def build_payload(doc: Dict[str, Any]) -> Dict[str, Any]:
-    rating = (doc.get("rating") or {}).get("value")
-    return {
-        "title": doc.get("title"),
-        "slug": doc.get("slug"),
-        "dietary_tags": doc.get("dietary_tags") or [],
-        "allergen_tags": doc.get("allergen_tags") or [],
-        "flavour_tags": doc.get("flavour_tags") or [],
-        "technique_tags": doc.get("technique_tags") or [],
-        "ingredient_tags": doc.get("ingredient_tags") or [],
-        "cuisine": doc.get("cuisine"),
-        "course": doc.get("course"),
-        "rating_value": rating,
-        "source_url": doc.get("source_url"),
-    }
-
-def iter_jsonl(path: Path) -> Iterable[Dict[str, Any]]:
+def iter_jsonl(path: Path) -> Iterable[Tuple[int, Dict[str, Any]]]:
+    """(line number, document) pairs; documents get the `_id` the catalog loader gives them."""
     with path.open("r", encoding="utf-8") as f:
-        for line in f:
+        for line_no, line in enumerate(f, start=1):
             s = line.strip()
             if not s:
                 continue
-            yield json.loads(s)
+            doc = json_util.loads(s)
+            doc.setdefault("_id", recipe_id(doc, line_no))
+            yield line_no, doc
 
 def count_lines(path: Path) -> int:
     with path.open("r", encoding="utf-8") as f:
@@ -345,13 +333,13 @@ def main() -> None:
     total = read_ckpt()
 
     with tqdm(total=total_lines, unit="doc", initial=total) as pbar:
-        for idx, doc in enumerate(iter_jsonl(JSONL_PATH), start=1):
+        for idx, (_, doc) in enumerate(iter_jsonl(JSONL_PATH), start=1):
             # resume support: skip already-processed lines
             if idx <= total:
                 continue
 
-            to_embed_text.append(build_text_input(doc))
-            to_embed_ing.append(build_ing_input(doc))
+            to_embed_text.append(text_input(doc))
+            to_embed_ing.append(ingredient_input(doc))
             docs_cache.append(doc)
 
             if len(docs_cache) >= BATCH_SIZE:
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Write a synthetic recipe corpus as JSONL (one document per line).
+
+Documents follow the `recipes` validator in mongoDB/init/01_collections.js
+(controlled vocabularies, kebab-case slugs / cuisines / ingredient tags), so
+the output can be fed to mongoimport, generate_embeddings.py or
+benchmarks/ingest.py in place of the real multi-GB file.
+
+Distributions are shaped after the real data rather than uniform:
+  * ingredient popularity is Zipf-like (salt and onion everywhere, saffron rare);
+  * ingredients per recipe ~ N(9, 3) clipped to 2..30;
+  * steps per recipe ~ lognormal (median 6), step length ~ lognormal (median 16 words);
+  * tag counts are skewed towards 0-2 per vocabulary;
+  * ratings cluster around 4.3 and rating counts are long-tailed.
+
+Usage:
+  python vectorDB/data/generate_synthetic_corpus.py --count 100000 --out /tmp/recipes.jsonl [--seed 7]
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, TextIO
+
+# ---------------------- Vocabularies (mirror 01_collections.js) ----------------------
+DIETARY = ["vegan", "vegetarian", "pescatarian", "halal", "kosher", "gluten-free", "dairy-free", "nut-free",
+           "egg-free", "low-carb", "low-fat"]
+ALLERGENS = ["gluten", "dairy", "egg", "peanut", "tree-nut", "soy", "shellfish", "fish", "sesame"]
+FLAVOURS = ["spicy", "sweet", "sour", "bitter", "salty", "umami", "smoky", "tangy", "herby", "garlicky",
+            "citrusy", "creamy", "rich", "fresh"]
+TECHNIQUE = ["grill", "roast", "bake", "fry", "deep-fry", "stir-fry", "braise", "stew", "steam", "poach",
+             "sous-vide", "marinate", "pickle", "ferment"]
+COURSES = ["breakfast", "starter", "main", "side", "dessert", "drink", "snack", None]
+COURSE_WEIGHTS = [8, 10, 40, 12, 15, 4, 8, 3]
+
+# Roughly by frequency in scraped recipe data; weights fall off as 1/rank^1.1 below.
+CUISINES = ["american", "italian", "mexican", "indian", "chinese", "french", "thai", "japanese", "greek",
+            "middle-eastern", "spanish", "korean", "vietnamese", "british", "german", "moroccan",
+            "caribbean", "turkish", "ethiopian", "peruvian"]
+INGREDIENTS = [
+    "salt", "onion", "garlic", "olive-oil", "butter", "black-pepper", "sugar", "egg", "flour", "water",
+    "milk", "tomato", "lemon", "carrot", "chicken-breast", "parsley", "potato", "cheddar", "heavy-cream",
+    "vegetable-oil", "soy-sauce", "ginger", "cumin", "paprika", "rice", "celery", "bell-pepper", "basil",
+    "cilantro", "lime", "honey", "ground-beef", "spinach", "mushroom", "vanilla-extract", "baking-powder",
+    "parmesan", "chili-flakes", "coriander", "cinnamon", "oregano", "thyme", "rosemary", "bacon",
+    "shrimp", "salmon", "tofu", "chickpeas", "black-beans", "lentils", "coconut-milk", "yogurt",
+    "mozzarella", "feta", "zucchini", "eggplant", "cucumber", "avocado", "corn", "peas", "broccoli",
+    "cauliflower", "cabbage", "kale", "sweet-potato", "pumpkin", "apple", "banana", "strawberry",
+    "blueberry", "orange", "maple-syrup", "brown-sugar", "cocoa-powder", "dark-chocolate", "almond",
+    "walnut", "peanut-butter", "sesame-oil", "sesame-seeds", "rice-vinegar", "fish-sauce", "oyster-sauce",
+    "hoisin-sauce", "miso", "gochujang", "curry-powder", "garam-masala", "turmeric", "cardamom", "clove",
+    "nutmeg", "bay-leaf", "dill", "mint", "scallion", "shallot", "leek", "pork-shoulder", "lamb",
+    "chorizo", "anchovy", "tuna", "cod", "mussels", "quinoa", "couscous", "bulgur", "pasta", "noodles",
+    "tortilla", "bread", "breadcrumbs", "pine-nuts", "capers", "olives", "sun-dried-tomato", "saffron",
+    "tahini", "harissa", "sumac", "za-atar", "star-anise", "lemongrass", "galangal", "kaffir-lime-leaf",
+]
+UNITS = ["g", "kg", "ml", "l", "tsp", "tbsp", "cup", "pinch", None]
+VERBS = ["Chop", "Dice", "Slice", "Mix", "Whisk", "Stir", "Heat", "Simmer", "Bake", "Roast", "Fry", "Season",
+         "Fold", "Pour", "Drain", "Blend", "Marinate", "Grill", "Toss", "Serve"]
+FILLER = ["the", "until", "golden", "and", "tender", "with", "a", "pinch", "of", "over", "medium", "heat",
+          "for", "about", "minutes", "gently", "evenly", "then", "remaining", "mixture", "in", "large", "pan",
+          "bowl", "oven", "soft", "fragrant", "combined", "smooth", "thick", "hot", "warm", "lightly"]
+DISHES = ["stew", "curry", "salad", "soup", "bake", "pie", "tart", "bowl", "stir-fry", "tacos", "pasta",
+          "risotto", "casserole", "skillet", "roast", "cake", "cookies", "bread", "noodles", "skewers"]
+
+# Which allergen a common ingredient implies (keeps tags consistent with ingredients).
+INGREDIENT_ALLERGENS = {
+    "flour": "gluten", "bread": "gluten", "pasta": "gluten", "noodles": "gluten", "breadcrumbs": "gluten",
+    "couscous": "gluten", "bulgur": "gluten", "tortilla": "gluten", "butter": "dairy", "milk": "dairy",
+    "cheddar": "dairy", "heavy-cream": "dairy", "parmesan": "dairy", "yogurt": "dairy", "mozzarella": "dairy",
+    "feta": "dairy", "egg": "egg", "peanut-butter": "peanut", "almond": "tree-nut", "walnut": "tree-nut",
+    "pine-nuts": "tree-nut", "soy-sauce": "soy", "tofu": "soy", "miso": "soy", "shrimp": "shellfish",
+    "mussels": "shellfish", "salmon": "fish", "tuna": "fish", "cod": "fish", "anchovy": "fish",
+    "fish-sauce": "fish", "sesame-oil": "sesame", "sesame-seeds": "sesame", "tahini": "sesame",
+}
+
+
+def zipf_weights(n: int, s: float = 1.1) -> List[float]:
+    return [1.0 / (rank ** s) for rank in range(1, n + 1)]
+
+
+INGREDIENT_WEIGHTS = zipf_weights(len(INGREDIENTS))
+CUISINE_WEIGHTS = zipf_weights(len(CUISINES), 0.8)
+
+
+# ---------------------- Sampling helpers ----------------------
+def sample_distinct(rng: random.Random, population: Sequence[str], weights: Sequence[float], k: int) -> List[str]:
+    """Weighted sample of `k` distinct items."""
+    chosen: Dict[str, None] = {}
+    while len(chosen) < k:
+        for item in rng.choices(population, weights=weights, k=k - len(chosen)):
+            chosen[item] = None
+    return list(chosen)
+
+
+def skewed_count(rng: random.Random, limit: int, p: float = 0.55) -> int:
+    """Geometric-ish count in 0..limit: most recipes carry few tags."""
+    n = 0
+    while n < limit and rng.random() > p:
+        n += 1
+    return n
+
+
+def make_step(rng: random.Random, ingredients: List[str]) -> str:
+    words = max(3, int(rng.lognormvariate(math.log(16), 0.5)))
+    body = [rng.choice(FILLER if rng.random() < 0.8 else ingredients).replace("-", " ") for _ in range(words - 1)]
+    return f"{rng.choice(VERBS)} {' '.join(body)}."
+
+
+def make_recipe(i: int, rng: random.Random, now: datetime) -> Dict[str, Any]:
+    cuisine = rng.choices(CUISINES, weights=CUISINE_WEIGHTS)[0]
+    n_ingredients = min(max(int(rng.gauss(9, 3)), 2), 30)
+    ingredient_tags = sample_distinct(rng, INGREDIENTS, INGREDIENT_WEIGHTS, n_ingredients)
+    n_steps = min(max(int(rng.lognormvariate(math.log(6), 0.45)), 1), 40)
+    dish = rng.choice(DISHES)
+    title = f"{cuisine.replace('-', ' ').title()} {ingredient_tags[min(1, len(ingredient_tags) - 1)].replace('-', ' ')} {dish}"
+    slug = f"{title.lower().replace(' ', '-')}-{i}"
+
+    ingredients = []
+    for name in ingredient_tags:
+        unit = rng.choice(UNITS)
+        qty = round(rng.uniform(0.25, 4), 2) if unit else None
+        raw = " ".join(str(part) for part in (qty, unit, name.replace("-", " ")) if part is not None)
+        ingredients.append({"name": name.replace("-", " "), "qty": qty, "unit": unit, "raw": raw})
+
+    allergens = sorted({INGREDIENT_ALLERGENS[n] for n in ingredient_tags if n in INGREDIENT_ALLERGENS})
+    dietary = rng.sample(DIETARY, skewed_count(rng, 3))
+    prep = int(rng.lognormvariate(math.log(15), 0.6))
+    cook = int(rng.lognormvariate(math.log(30), 0.8))
+    created = now - timedelta(days=rng.uniform(0, 3 * 365))
+    updated = created + timedelta(days=rng.uniform(0, (now - created).days or 1))
+
+    return {
+        "title": title,
+        "slug": slug,
+        "ingredients": ingredients,
+        "steps": [make_step(rng, ingredient_tags) for _ in range(n_steps)],
+        "tags": [cuisine, dish] + dietary,
+        "dietary_tags": dietary,
+        "allergen_tags": allergens,
+        "flavour_tags": rng.sample(FLAVOURS, skewed_count(rng, 4)),
+        "technique_tags": rng.sample(TECHNIQUE, skewed_count(rng, 3)),
+        "ingredient_tags": ingredient_tags,
+        "cuisine": cuisine,
+        "course": rng.choices(COURSES, weights=COURSE_WEIGHTS)[0],
+        "tags_provenance": {"version": "synthetic-1", "methods": ["rules"]},
+        "cuisine_confidence": round(rng.uniform(0.5, 1.0), 3),
+        "cuisine_method": ["rules"],
+        "author": f"author-{rng.randint(1, 5000)}",
+        "source_url": f"https://example.invalid/recipes/{slug}",
+        "servings": rng.choice([1, 2, 2, 4, 4, 4, 6, 8]),
+        "times": {"prep_min": prep, "cook_min": cook, "total_min": prep + cook},
+        "nutrition": {"calories": int(rng.lognormvariate(math.log(450), 0.4))},
+        "rating": {
+            "value": round(min(max(rng.gauss(4.3, 0.45), 1.0), 5.0), 2),
+            "count": int(10 * (rng.paretovariate(1.2) - 1)),
+        },
+        "images": [],
+        # mongoimport reads extended JSON dates
+        "created_at": {"$date": created.isoformat(timespec="milliseconds").replace("+00:00", "Z")},
+        "updated_at": {"$date": updated.isoformat(timespec="milliseconds").replace("+00:00", "Z")},
+    }
+
+
+def write_corpus(out: TextIO, count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for i in range(count):
+        out.write(json.dumps(make_recipe(i, rng, now), separators=(",", ":")))
+        out.write("\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--count", type=int, default=10_000)
+    parser.add_argument("--out", type=Path, help="output .jsonl (default: stdout)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.out is None:
+        write_corpus(sys.stdout, args.count, args.seed)
+        return
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    with args.out.open("w", encoding="utf-8") as f:
+        write_corpus(f, args.count, args.seed)
+    print(f"Wrote {args.count} recipes to {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -8,10 +8,11 @@ from sentence_transformers import SentenceTransformer
 st = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
 qvec = st.encode(["creamy baked pasta"], normalize_embeddings=True)[0].tolist()
 
-hits = c.search(
+hits = c.query_points(
     collection_name="recipes",
-    query_vector=("v_text", qvec),
+    query=qvec,
+    using="v_text",
     limit=5
-)
+).points
 for h in hits:
     print(round(h.score, 4), h.payload.get("title"), h.payload.get("dietary_tags"))
\ No newline at end of file